@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import time
+
+import translationCache
+
+try:
+    import clingo
+except ImportError:
+    clingo = None
+
+# encodings of the ASP approaches, see Dockerfile
+ENCODINGS = {
+    "asp_simple": "/tools/sequential-horizon.simple.asp",
+    "asp_general": "/tools/sequential-horizon.general.asp",
+}
+
+
+def available():
+    """Returns whether the clingo Python API is installed (pip install clingo)."""
+    return clingo is not None
+
+
+class ClingoSession:
+    """
+    A session of the clingo Python API that solves an encoding and a translated domain for increasing horizons.
+
+    Only encodings written for incremental solving, i.e. declaring the subprograms base, step(t) and check(t) with
+    an external atom query(t) in check(t) (the convention of clingo's incmode), are solved multi-shot: they are
+    grounded one time step at a time, such that the ground program of all smaller horizons is reused. Encodings with
+    a fixed horizon constant, as the sequential-horizon encodings, are parsed, grounded and solved from scratch in a
+    new clingo control for every horizon, just like a run of the clingo binary.
+    """
+
+    def __init__(self, encodingPath, instancePath):
+        if clingo is None:
+            raise RuntimeError("The clingo Python API is not installed (pip install clingo)")
+        with open(encodingPath) as f:
+            self.encoding = f.read()
+        with open(instancePath) as f:
+            self.instance = f.read()
+        self.incremental = "#program step(" in self.encoding
+        self.control = None
+        self.groundedHorizon = -1
+
+    def _newControl(self, arguments):
+        self.control = clingo.Control(arguments)
+        # added separately, such that the instance is part of the base program even if the encoding ends in another one
+        self.control.add("base", [], self.encoding)
+        self.control.add("base", [], self.instance)
+
+    def _ground(self, horizon):
+        if not self.incremental:
+            self._newControl(["-c", f"horizon={horizon}"])
+            self.control.ground([("base", [])])
+            return
+
+        if horizon < self.groundedHorizon:
+            raise ValueError(f"Horizon {horizon} is smaller than the already grounded horizon {self.groundedHorizon}")
+        if self.control is None:
+            self._newControl([])
+        while self.groundedHorizon < horizon:
+            t = self.groundedHorizon + 1
+            if t == 0:
+                parts = [("base", []), ("check", [clingo.Number(0)])]
+            else:
+                self.control.release_external(clingo.Function("query", [clingo.Number(t - 1)]))
+                parts = [("step", [clingo.Number(t)]), ("check", [clingo.Number(t)])]
+            self.control.ground(parts)
+            self.groundedHorizon = t
+        self.control.assign_external(clingo.Function("query", [clingo.Number(horizon)]), True)
+
+    def solve(self, horizon, timeout=None):
+        """
+        Grounds the program for the given horizon (if not done yet) and solves it. Grounding cannot be interrupted,
+        hence the timeout only applies to solving.
+
+        :param horizon: the horizon, for incremental encodings at least the horizon of the previous call
+        :param timeout: timeout of solving in seconds, None for no timeout
+        :return: a tuple (satisfiable, groundTime, solveTime), satisfiable is None if solving timed out
+        """
+        start = time.perf_counter()
+        self._ground(horizon)
+        groundTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with self.control.solve(async_=True) as handle:
+            if handle.wait() if timeout is None else handle.wait(max(timeout, 0)):
+                satisfiable = handle.get().satisfiable
+            else:
+                handle.cancel()
+                satisfiable = None
+        solveTime = time.perf_counter() - start
+        return satisfiable, groundTime, solveTime
+
+
+def findMinimalHorizon(approach, domainPath, maxHorizon, timeoutLimit, minHorizon=1):
+    """
+    Solves an ASP approach for the horizons minHorizon, minHorizon + 1, ..., maxHorizon in a single session (see
+    ClingoSession) until the first satisfiable horizon is found.
+
+    :param approach: "asp_simple" or "asp_general"
+    :param domainPath: Path to the PDDL domain file
+    :param maxHorizon: largest horizon that is solved
+    :param timeoutLimit: timeout in seconds for all horizons together (grounding is not interrupted)
+    :param minHorizon: smallest horizon that is solved
+    :return: a dict with the fields domainPath, approach, status ("success" or "timeout"), horizon (the minimal
+        satisfiable horizon, -1 if there is none up to maxHorizon), horizons (satisfiable, groundTime and solveTime
+        of every solved horizon), translateTime (see translationCache.translate), groundTime and solveTime (summed
+        over all horizons, in seconds), and runtime (groundTime + solveTime)
+    """
+    if approach not in ENCODINGS:
+        raise ValueError(f"The provided approach \"{approach}\" is not an ASP approach.")
+
+    (instancePath, translateTime, _) = translationCache.translate(domainPath, "plasp")
+    session = ClingoSession(ENCODINGS[approach], instancePath)
+    result = {
+        "domainPath": domainPath,
+        "approach": approach,
+        "status": "success",
+        "horizon": -1,
+        "horizons": [],
+        "translateTime": translateTime,
+        "groundTime": 0.0,
+        "solveTime": 0.0,
+    }
+    deadline = time.perf_counter() + timeoutLimit
+    for horizon in range(minHorizon, maxHorizon + 1):
+        satisfiable, groundTime, solveTime = session.solve(horizon, deadline - time.perf_counter())
+        result["horizons"].append({"horizon": horizon, "satisfiable": satisfiable, "groundTime": groundTime,
+                                   "solveTime": solveTime})
+        result["groundTime"] += groundTime
+        result["solveTime"] += solveTime
+        if satisfiable:
+            result["horizon"] = horizon
+            break
+        if satisfiable is None or time.perf_counter() >= deadline:
+            result["status"] = "timeout"
+            break
+    result["runtime"] = result["groundTime"] + result["solveTime"]
+    return result
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -1,126 +1,374 @@
 #!/usr/bin/env python3
+import json
 import os
+import select
 import signal
-import subprocess
-import re
-import tempfile
+import sys
+import time
 
-def parseWallClock(output):
-    return re.findall(r"\s*Elapsed \(wall clock\) time \(h:mm:ss or m:ss\): (.*?)\s*\n", output)[0]
+import processRunner
+import translationCache
+from reversible import STRATEGIES, SearchStats, search
 
+# approaches whose domain is translated before it is solved by an external solver (see processCommand)
+TRANSLATED_APPROACHES = ("asp_simple", "asp_general", "qasp")
 
-def parseSetSize(output):
-    return re.findall(r"\s*Maximum resident set size \(kbytes\): (.*?)\s*\n", output)[0]
 
+def _searchInChild(approach, domainPath, reversibleActionName, horizon, cacheDir, closedList, memoryLimit, preprocess):
+    import reversible
+    from domainCache import loadCachedDomain
 
-def benchmark(approach, domainPath, reversibleActionName, horizon, timeoutLimit):
-    if approach == "bfs" or approach == "dfs":
-        try:
-            command = f"/usr/bin/time -v python3 ./reversible.py {domainPath} {reversibleActionName} {approach} {horizon} True"
-            with tempfile.TemporaryFile() as tempf:
-                process = subprocess.Popen(command, stdout=tempf, stderr=tempf, shell=True, preexec_fn=os.setsid)
-                try:
-                    process.wait(timeout=timeoutLimit)
-                except subprocess.TimeoutExpired:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    print(f"TimeoutError after {timeoutLimit} seconds")
-                    return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-                
-                tempf.seek(0)
-                output = tempf.read().decode('utf-8')
-                print(output)
-                wallClock = parseWallClock(output)
-                setSize = parseSetSize(output)
-                process.terminate()
-                print(f"Time: {wallClock} sec., Memory: {int(setSize)/1014:.2f} MB.")
-                return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, wallClock, setSize)
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-        
-    elif approach == "asp_simple":
-        c1 = f"/tools/plasp translate {domainPath} > {domainPath}.lp"
-        subprocess.run(c1, text=True, capture_output=True, shell=True)
+    stats = reversible.SearchStats()
+    start = time.perf_counter()
+    domain = loadCachedDomain(domainPath, cacheDir=cacheDir)
+    stats.parseTime = time.perf_counter() - start
 
-        c2 = f"/usr/bin/time -v /tools/clingo /tools/sequential-horizon.simple.asp -c horizon={horizon} {domainPath}.lp"
-        try:
-            with tempfile.TemporaryFile() as tempf:
-                process = subprocess.Popen(c2, stdout=tempf, stderr=tempf, shell=True, preexec_fn=os.setsid)
-                try:
-                    process.wait(timeout=timeoutLimit)
-                except subprocess.TimeoutExpired:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    print(f"TimeoutError after {timeoutLimit} seconds")
-                    return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-                
-                tempf.seek(0)
-                output = tempf.read().decode('utf-8')
-                print(output)
-                wallClock = parseWallClock(output)
-                setSize = parseSetSize(output)
-                process.terminate()
-                return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, wallClock, setSize)
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-        
-    elif approach == "asp_general":
-        c1 = f"/tools/plasp translate {domainPath} > {domainPath}.lp"
-        subprocess.run(c1, text=True, capture_output=True, shell=True)
+    actionIndex = domain.actionIndex(reversibleActionName)
+    if actionIndex == -1:
+        raise ValueError(f"Could not find action \"{reversibleActionName}\" in domain {domainPath}")
+
+    state = next(reversible.search(domain, actionIndex, approach, maxPathLimit=horizon, stats=stats,
+                                   closedList=closedList, memoryLimit=memoryLimit, preprocess=preprocess), None)
+
+    measurement = stats.toDict()
+    measurement["reversible"] = state is not None
+    measurement["planLength"] = -1 if state is None else state.depth
+    return measurement
 
-        c2 = f"/usr/bin/time -v /tools/clingo /tools/sequential-horizon.general.asp -c horizon={horizon} {domainPath}.lp"
+
+def _measureInChild(function, args, timeoutLimit):
+    """
+    Calls function(*args) in a forked child, which is killed once the timeout is reached.
+
+    :return: a tuple (measurement, timedOut, rusage), where measurement is the JSON serializable return value of the
+        function (None on timeouts and errors) and rusage is the resource usage of the child reported by os.wait4
+    """
+    readFd, writeFd = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
         try:
-            with tempfile.TemporaryFile() as tempf:
-                process = subprocess.Popen(c2, stdout=tempf, stderr=tempf, shell=True, preexec_fn=os.setsid)
-                try:
-                    process.wait(timeout=timeoutLimit)
-                except subprocess.TimeoutExpired:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    print(f"TimeoutError after {timeoutLimit} seconds")
-                    return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-                
-                tempf.seek(0)
-                output = tempf.read().decode('utf-8')
-                print(output)
-                wallClock = parseWallClock(output)
-                setSize = parseSetSize(output)
-                return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, wallClock, setSize)
-        except Exception as e:
+            os.close(readFd)
+            measurement = function(*args)
+            with os.fdopen(writeFd, "w") as w:
+                w.write(json.dumps(measurement))
+        except BaseException as e:
             print(f"An error occurred: {str(e)}")
-            return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-        
+        finally:
+            os._exit(0)
+
+    os.close(writeFd)
+    output = b""
+    deadline = time.perf_counter() + timeoutLimit
+    timedOut = False
+    with os.fdopen(readFd, "rb") as r:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                timedOut = True
+                break
+            ready, _, _ = select.select([r], [], [], remaining)
+            if ready:
+                chunk = os.read(r.fileno(), 65536)
+                if not chunk:
+                    break
+                output += chunk
+
+    if timedOut:
+        os.kill(pid, signal.SIGKILL)
+    _, status, rusage = os.wait4(pid, 0)
+
+    if timedOut or status != 0 or not output:
+        return None, timedOut, rusage
+    return json.loads(output), False, rusage
+
+
+def benchmarkInProcess(approach, domainPath, reversibleActionName, horizon, timeoutLimit, cacheDir=None,
+                       closedList="exact", memoryLimit=-1, preprocess=False):
+    """
+    Measures the search approaches (dfs, bfs, gbfs, astar, bidirectional) without starting a new interpreter: the search runs in a forked child,
+    which is killed once the timeout is reached. Parse and search time are measured with time.perf_counter within
+    the child, its peak RSS is obtained from the rusage reported by os.wait4. As the child is forked, its RSS also
+    includes the memory of the benchmarking process itself.
+
+    :param approach: one of the search strategies of reversible.search
+    :param domainPath: Path to the PDDL domain file
+    :param reversibleActionName: name of the action to be reversed
+    :param horizon: maxPathLimit of the search, -1 for no limit
+    :param timeoutLimit: timeout in seconds
+    :param cacheDir: folder of the compiled domain cache, None to always parse the domain
+    :param closedList: closed list of the search, "exact", "fingerprint", or "bloom" (see reversible.search)
+    :param memoryLimit: memory limit of the search in MB, -1 for no limit
+    :param preprocess: whether irrelevant and unreachable actions are removed before the search
+        (see reversible.preprocessActions)
+    :return: a dict with the fields domainPath, approach, reversibleActionName, horizon, timeoutLimit,
+        status ("success", "budgetExhausted", "timeout", or "error"), reversible, planLength, runtime (parseTime +
+        searchTime in seconds), setSize (peak RSS in kbytes), and all fields of reversible.SearchStats (counters and
+        phase timings). For timeouts and errors the measured values are -1.
+    """
+    result = {field: -1 for field in SearchStats().toDict()}
+    result.update({
+        "domainPath": domainPath,
+        "approach": approach,
+        "reversibleActionName": reversibleActionName,
+        "horizon": horizon,
+        "timeoutLimit": timeoutLimit,
+        "status": "error",
+        "reversible": None,
+        "planLength": -1,
+        "runtime": -1,
+        "setSize": -1,
+        "budgetExhausted": False
+    })
+
+    measurement, timedOut, rusage = _measureInChild(_searchInChild, (approach, domainPath, reversibleActionName, horizon,
+                                                                     cacheDir, closedList, memoryLimit, preprocess),
+                                                    timeoutLimit)
+    if timedOut:
+        print(f"TimeoutError after {timeoutLimit} seconds")
+        result["status"] = "timeout"
+        return result
+    if measurement is None:
+        return result
+
+    result.update(measurement)
+    result["status"] = "budgetExhausted" if result["budgetExhausted"] else "success"
+    result["runtime"] = result["parseTime"] + result["searchTime"]
+    result["setSize"] = rusage.ru_maxrss
+    print(f"Time: {result['runtime']:.6f} sec. (parse: {result['parseTime']:.6f} sec., search: {result['searchTime']:.6f} sec.), "
+          f"Memory: {result['setSize']/1024:.2f} MB, Expanded: {result['expanded']}.")
+    print(json.dumps(result))
+    if result["budgetExhausted"]:
+        print(f"Search aborted, because the memory budget of {memoryLimit} MB is exhausted")
+    return result
+
+
+def benchmarkModel(approach, name, domain, reversibleActionName="del-all", horizon=-1, closedList="exact", memoryLimit=-1,
+                   preprocess=False, compileTime=0.0):
+    """
+    Measures a search approach on a compiled domain held in memory (see the compiled models of domainGenerator,
+    e.g. domainGenerator.singlePathModel), without writing, parsing, or forking. As there is no timeout, this is
+    meant for sweeps over many small domains, where I/O and parsing would dominate the search itself.
+
+    :param approach: one of the search strategies of reversible.search
+    :param name: name of the domain, which is copied to the result
+    :param domain: the compiled domain
+    :param reversibleActionName: name of the action to be reversed
+    :param horizon: maxPathLimit of the search, -1 for no limit
+    :param closedList: closed list of the search, "exact", "fingerprint", or "bloom" (see reversible.search)
+    :param memoryLimit: memory limit of the search in MB, -1 for no limit
+    :param preprocess: whether irrelevant and unreachable actions are removed before the search
+        (see reversible.preprocessActions)
+    :param compileTime: seconds spent on generating the compiled domain, which is reported as compileTime
+    :return: a dict with the fields name, approach, reversibleActionName, horizon, status ("success" or
+        "budgetExhausted"), reversible, planLength, runtime (compileTime + searchTime in seconds), and all fields of
+        reversible.SearchStats
+    """
+    actionIndex = domain.actionIndex(reversibleActionName)
+    if actionIndex == -1:
+        raise ValueError(f"Could not find action \"{reversibleActionName}\" in domain {name}")
+
+    stats = SearchStats()
+    stats.compileTime = compileTime
+    state = next(search(domain, actionIndex, approach, maxPathLimit=horizon, stats=stats, closedList=closedList,
+                        memoryLimit=memoryLimit, preprocess=preprocess), None)
+
+    result = stats.toDict()
+    result.update({
+        "name": name,
+        "approach": approach,
+        "reversibleActionName": reversibleActionName,
+        "horizon": horizon,
+        "status": "budgetExhausted" if stats.budgetExhausted else "success",
+        "reversible": None if state is None and stats.budgetExhausted else state is not None,
+        "planLength": -1 if state is None else state.depth,
+        "runtime": stats.compileTime + stats.searchTime
+    })
+    return result
+
+
+def sweep(approach, domain, start, limit, step=1, horizon=-1, closedList="exact", memoryLimit=-1, preprocess=False):
+    """
+    Generates the domains of domainGenerator.generateStandardDomains as compiled models in memory and measures the
+    search approach on each of them (see benchmarkModel), without touching the file system. One result is printed
+    per domain as a JSON line.
+
+    :param approach: one of the search strategies of reversible.search
+    :param domain: domain type ("singlePath", "multiplePaths", or "multiplePathsDeadEnds")
+    :param start: start value of argument i
+    :param limit: limit of argument i
+    :param step: step increment of argument i
+    :param horizon: maxPathLimit of the search, -1 for no limit
+    :param closedList: closed list of the search, "exact", "fingerprint", or "bloom" (see reversible.search)
+    :param memoryLimit: memory limit of the search in MB, -1 for no limit
+    :param preprocess: whether irrelevant and unreachable actions are removed before the search
+    """
+    import domainGenerator
+
+    models = domainGenerator.generateStandardModels(start, limit, step, domain)
+    while True:
+        generationStart = time.perf_counter()
+        model = next(models, None)
+        compileTime = time.perf_counter() - generationStart
+        if model is None:
+            return
+        (name, compiledDomain) = model
+        result = benchmarkModel(approach, name, compiledDomain, horizon=horizon, closedList=closedList,
+                                memoryLimit=memoryLimit, preprocess=preprocess, compileTime=compileTime)
+        print(json.dumps(result), flush=True)
+
+
+def benchmarkClingoApi(approach, domainPath, maxHorizon, timeoutLimit, minHorizon=1):
+    """
+    Measures an ASP approach (asp_simple or asp_general) with the clingo Python API instead of the clingo binary:
+    the translated domain is solved for the horizons minHorizon, ..., maxHorizon in a forked child (see
+    aspBackend.findMinimalHorizon), which is killed once the timeout is reached. Pass minHorizon=maxHorizon to solve
+    a single horizon only, as the clingo binary does. Besides the runtime, the time spent grounding and solving is
+    reported.
+
+    :param approach: "asp_simple" or "asp_general"
+    :param domainPath: Path to the PDDL domain file
+    :param maxHorizon: largest horizon that is solved
+    :param timeoutLimit: timeout in seconds
+    :param minHorizon: smallest horizon that is solved
+    :return: the dict of aspBackend.findMinimalHorizon with the additional field setSize (peak RSS in kbytes), status
+        is "error" if the clingo Python API is not installed or the child failed. For timeouts and errors runtime,
+        translateTime, groundTime, solveTime, and setSize are -1.
+    """
+    import aspBackend
+
+    result = {
+        "domainPath": domainPath,
+        "approach": approach,
+        "status": "error",
+        "horizon": -1,
+        "horizons": [],
+        "translateTime": -1,
+        "groundTime": -1,
+        "solveTime": -1,
+        "runtime": -1,
+        "setSize": -1
+    }
+    if not aspBackend.available():
+        print("The clingo Python API is not installed (pip install clingo)")
+        return result
+
+    measurement, timedOut, rusage = _measureInChild(aspBackend.findMinimalHorizon,
+                                                    (approach, domainPath, maxHorizon, timeoutLimit, minHorizon),
+                                                    timeoutLimit)
+    if timedOut:
+        print(f"TimeoutError after {timeoutLimit} seconds")
+        result["status"] = "timeout"
+        return result
+    if measurement is None:
+        return result
+
+    result.update(measurement)
+    result["setSize"] = rusage.ru_maxrss
+    print(f"Time: {result['runtime']:.6f} sec. (ground: {result['groundTime']:.6f} sec., solve: {result['solveTime']:.6f} sec.), "
+          f"Memory: {result['setSize']/1024:.2f} MB, Horizon: {result['horizon']}.")
+    print(json.dumps(result))
+    return result
+
+
+def processCommand(approach, domainPath, reversibleActionName, horizon, closedList="exact", memoryLimit=-1,
+                   preprocess=False):
+    """
+    Returns the command measuring an approach on a domain in a process of its own (see benchmark), translating the
+    domain first for the ASP approaches.
+
+    :return: a tuple (command, successCodes, memoryCodes, translateTime) of the command as list of arguments, the
+        exit codes of successful runs and of runs that ran out of memory (see processRunner.runProcess), and the
+        translation time in seconds (None for the search strategies)
+    """
+    if approach in STRATEGIES:
+        command = ["python3", "./reversible.py", domainPath, reversibleActionName, approach, str(horizon), "True",
+                   f"--closedList={closedList}", f"--memoryLimit={memoryLimit}", f"--preprocess={preprocess}"]
+        return command, (0,), (), None
+    elif approach == "asp_simple" or approach == "asp_general":
+        (instancePath, translateTime, _) = translationCache.translate(domainPath, "plasp")
+        encoding = "simple" if approach == "asp_simple" else "general"
+        command = ["/tools/clingo", f"/tools/sequential-horizon.{encoding}.asp", "-c", f"horizon={horizon}",
+                   instancePath]
+        return command, processRunner.CLINGO_SUCCESS_CODES, processRunner.CLINGO_MEMORY_CODES, translateTime
     elif approach == "qasp":
-        c1 = f"python3 /tools/run-pddl-horizon.py {domainPath} {horizon} > {domainPath}.qasp"
-        subprocess.run(c1, text=True, capture_output=True, shell=True)
+        (instancePath, translateTime, _) = translationCache.translate(domainPath, "qasp", horizon)
+        command = ["java", "-jar", "/tools/qasp-0.1.2.jar", "-mn", "1", instancePath]
+        return command, (0,), (), translateTime
+    raise ValueError(f"The provided approach \"{approach}\" is not valid.")
 
-        c2 = f"/usr/bin/time -v java -jar /tools/qasp-0.1.2.jar -mn 1 {domainPath}.qasp"
-        try:
-            with tempfile.TemporaryFile() as tempf:
-                process = subprocess.Popen(c2, stdout=tempf, stderr=tempf, shell=True, preexec_fn=os.setsid)
-                try:
-                    process.wait(timeout=timeoutLimit)
-                except subprocess.TimeoutExpired:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    print(f"TimeoutError after {timeoutLimit} seconds")
-                    return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
-                
-                tempf.seek(0)
-                output = tempf.read().decode('utf-8')
-                # retrieve plan from output
-                plan = re.findall(r'occurs\("(.*?)",', output)
-                # print(output.split("\n")[0])
-                # print(f"Plan: {'->'.join(plan[1:])}")
-                wallClock = parseWallClock(output)
-                setSize = parseSetSize(output)
-                process.terminate()
-                return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, wallClock, setSize)
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1)
 
-    else:
+def benchmark(approach, domainPath, reversibleActionName, horizon, timeoutLimit, inProcess=False, closedList="exact",
+              memoryLimit=-1, preprocess=False, processMemoryLimit=-1, cpuTimeLimit=-1, killGracePeriod=5,
+              outputPath=None):
+    """
+    Measures a single approach on a single domain, the search strategies in a new interpreter (or in a forked child
+    if inProcess, see benchmarkInProcess), the ASP approaches with the clingo binary and the qasp solver.
+    The domain translations of the ASP approaches are cached (see translationCache.translate), the processes are run
+    and measured by processRunner.runProcess.
+
+    :param processMemoryLimit: address space limit in MB of the measured process, -1 for no limit
+    :param cpuTimeLimit: CPU time limit in seconds of the measured process, -1 for no limit
+    :param killGracePeriod: seconds between SIGTERM and SIGKILL once the timeout is reached
+    :param outputPath: file the output of the measured process is streamed to instead of being printed
+    :return: a tuple (domainPath, approach, reversibleActionName, horizon, timeoutLimit, wallClock, setSize,
+        translateTime), where wallClock is the runtime in seconds and setSize the peak RSS in kbytes (both -1 on
+        timeouts and crashes, wallClock is -1 as well if the memory limit or budget is exhausted), and translateTime
+        is the time in seconds spent on translating the domain (None for the search strategies)
+    """
+    translateTime = None
+    if approach in STRATEGIES and inProcess:
+        result = benchmarkInProcess(approach, domainPath, reversibleActionName, horizon, timeoutLimit,
+                                    closedList=closedList, memoryLimit=memoryLimit, preprocess=preprocess)
+        runtime = result["runtime"] if result["status"] == "success" else -1
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, runtime, result["setSize"], translateTime)
+
+    if approach not in STRATEGIES and approach not in TRANSLATED_APPROACHES:
         print(f"The provided approach \"{approach}\" is not valid.")
+        return
+
+    try:
+        (command, successCodes, memoryCodes, translateTime) = processCommand(
+            approach, domainPath, reversibleActionName, horizon, closedList, memoryLimit, preprocess)
+        result = processRunner.runProcess(command, timeoutLimit, memoryLimit=processMemoryLimit,
+                                          cpuTimeLimit=cpuTimeLimit, killGracePeriod=killGracePeriod,
+                                          outputPath=outputPath, successCodes=successCodes, memoryCodes=memoryCodes)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1, translateTime)
+
+    if result.output is not None:
+        print(result.output)
+    if result.status == "timeout":
+        print(f"TimeoutError after {timeoutLimit} seconds")
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1, translateTime)
+    if result.status == "crash":
+        print(f"The process exited with code {result.returncode}")
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, -1, translateTime)
+
+    print(f"Time: {result.wallTime:.6f} sec., Memory: {result.maxRss/1024:.2f} MB.")
+    if result.status == "memoryOut":
+        print(f"The process exceeded the memory limit of {processMemoryLimit} MB")
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, result.maxRss, translateTime)
+    if approach in STRATEGIES and _outputContains(result, "memory budget"):
+        return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, -1, result.maxRss, translateTime)
+    return (domainPath, approach, reversibleActionName, horizon, timeoutLimit, result.wallTime, result.maxRss,
+            translateTime)
+
+
+def _outputContains(result, text):
+    if result.output is not None:
+        return text in result.output
+    with open(result.outputPath, errors="replace") as f:
+        return any(text in line for line in f)
+
 
 if __name__ == "__main__":
     import fire
-    fire.Fire(benchmark)
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        fire.Fire(sweep, command=sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "clingoApi":
+        fire.Fire(benchmarkClingoApi, command=sys.argv[2:])
+    else:
+        fire.Fire(benchmark)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import platform
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+import experiments
+from domainCache import contentHash
+
+DEFAULT_SUITE_FOLDER = "./experiments/suite"
+
+
+def _gitRevision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples, confidence=0.95, resamples=2000):
+    """
+    Summarizes repeated measurements by their median, interquartile range, and a bootstrap confidence interval of
+    the median (seeded, such that the same samples always yield the same interval).
+
+    :param samples: the measured values
+    :param confidence: confidence level of the interval
+    :param resamples: number of bootstrap resamples
+    :return: a dict with the fields n, median, q1, q3, iqr, ciLow, and ciHigh (all None if there are no samples)
+    """
+    if not samples:
+        return {"n": 0, "median": None, "q1": None, "q3": None, "iqr": None, "ciLow": None, "ciHigh": None}
+    values = np.asarray(samples, dtype=float)
+    (q1, median, q3) = np.percentile(values, [25, 50, 75])
+    medians = np.median(np.random.default_rng(0).choice(values, (resamples, len(values))), axis=1)
+    (ciLow, ciHigh) = np.percentile(medians, [50 * (1 - confidence), 50 * (1 + confidence)])
+    return {"n": len(values), "median": float(median), "q1": float(q1), "q3": float(q3), "iqr": float(q3 - q1),
+            "ciLow": float(ciLow), "ciHigh": float(ciHigh)}
+
+
+@lru_cache(maxsize=None)
+def _mannWhitneyCount(n1, n2, u):
+    """Number of orderings of n1 + n2 distinct values for which the first sample has the Mann-Whitney statistic u."""
+    if u < 0 or u > n1 * n2:
+        return 0
+    if n1 == 0 or n2 == 0:
+        return 1
+    # the largest value belongs either to the first sample (and beats all n2 values of the second) or to the second
+    return _mannWhitneyCount(n1 - 1, n2, u - n2) + _mannWhitneyCount(n1, n2 - 1, u)
+
+
+def mannWhitneyU(first, second):
+    """
+    Two-sided Mann-Whitney U test of whether the values of two samples tend to be larger than the other's, which
+    does not assume normally distributed runtimes. The p-value is exact for small samples without ties and
+    approximated by the normal distribution (with tie correction) otherwise.
+
+    :return: a tuple (u, p) of the statistic of the first sample and the p-value
+    """
+    (n1, n2) = (len(first), len(second))
+    values = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+    ranks = [0.0] * len(values)
+    tieCorrection = 0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tieCorrection += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    u = sum(rank for rank, (_, sample) in zip(ranks, values) if sample == 0) - n1 * (n1 + 1) / 2
+
+    if tieCorrection == 0 and n1 * n2 <= 2500:
+        total = math.comb(n1 + n2, n1)
+        lower = sum(_mannWhitneyCount(n1, n2, k) for k in range(0, int(u) + 1)) / total
+        upper = sum(_mannWhitneyCount(n1, n2, k) for k in range(int(u), n1 * n2 + 1)) / total
+        return u, min(1.0, 2 * min(lower, upper))
+
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tieCorrection / (n * (n - 1))))
+    if sigma == 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / sigma
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def holm(pValues):
+    """
+    Holm-Bonferroni adjustment of the p-values of several tests, such that rejecting every test whose adjusted
+    p-value is below alpha keeps the probability of any false rejection (family-wise error rate) below alpha.
+
+    :return: the adjusted p-values in the order of pValues
+    """
+    adjusted = [1.0] * len(pValues)
+    largest = 0.0
+    for rank, i in enumerate(sorted(range(len(pValues)), key=lambda i: pValues[i])):
+        largest = max(largest, min(1.0, (len(pValues) - rank) * pValues[i]))
+        adjusted[i] = largest
+    return adjusted
+
+
+def run(domainsFolder="./domains", pattern="*.pddl", approaches=("dfs", "bfs"), warmup=1, repetitions=5,
+        timeout=120, inProcess=True, closedList="exact", memoryLimit=-1, preprocess=False, output=None,
+        baseline=None, alpha=0.05, minEffect=0.05):
+    """
+    Measures every approach on every matching domain repeatedly (see experiments.runExperiment): the first warmup
+    runs are discarded, the following repetitions runs are summarized by median, IQR, and a confidence interval of
+    the median (see summarize). The samples are written to a JSON file together with the git revision, such that
+    the file can serve as baseline of a later run (see compare).
+
+    :param domainsFolder: folder of the PDDL domains
+    :param pattern: glob pattern of the domain files within the folder
+    :param approaches: approaches that are measured
+    :param warmup: number of discarded runs per domain and approach
+    :param repetitions: number of measured runs per domain and approach
+    :param timeout: timeout in seconds of every run
+    :param inProcess: whether the search strategies are measured in a forked child (see benchmark.benchmarkInProcess)
+    :param closedList: closed list of the search strategies (see reversible.search)
+    :param memoryLimit: memory limit of the search strategies in MB, -1 for no limit
+    :param preprocess: whether the search strategies remove irrelevant and unreachable actions first
+    :param output: path of the JSON file the results are written to, by default a new file in experiments/suite
+    :param baseline: path of the results of a previous run, which the new results are compared with
+    :param alpha: significance level of the comparison with the baseline
+    :param minEffect: minimal relative change of the median runtime that is flagged as slowdown or speedup
+    :return: the path of the written results
+    """
+    if isinstance(approaches, str):
+        approaches = approaches.split(",")
+    if repetitions < 1:
+        raise ValueError(f"At least one measured repetition is required, not {repetitions}")
+    if warmup < 0:
+        raise ValueError(f"The number of warm-up runs must not be negative, not {warmup}")
+    if output is None:
+        output = f"{DEFAULT_SUITE_FOLDER}/suite-{time.time()}.json"
+
+    results = {
+        "revision": _gitRevision(),
+        "started": time.time(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "settings": {"warmup": warmup, "repetitions": repetitions, "timeout": timeout, "inProcess": inProcess,
+                     "closedList": closedList, "memoryLimit": memoryLimit, "preprocess": preprocess},
+        "measurements": {}
+    }
+    for path in sorted(str(path) for path in Path(domainsFolder).glob(pattern)):
+        domainHash = contentHash(path)
+        for approach in approaches:
+            runtimes = []
+            setSizes = []
+            failures = 0
+            for repetition in range(warmup + repetitions):
+                (horizon, runtime, setSize, _) = experiments.runExperiment(
+                    path, approach, timeout, inProcess, closedList, memoryLimit, preprocess)
+                if repetition < warmup:
+                    continue
+                if runtime == -1:
+                    failures += 1
+                else:
+                    runtimes.append(runtime)
+                    setSizes.append(setSize)
+            # keyed by the content of the domain, such that renamed domains are still compared with each other
+            results["measurements"][f"{domainHash}:{approach}"] = {
+                "path": path,
+                "approach": approach,
+                "horizon": horizon,
+                "failures": failures,
+                "runtimes": runtimes,
+                "setSizes": setSizes,
+                "runtime": summarize(runtimes),
+                "setSize": summarize(setSizes)
+            }
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'approach':<14}{'median (s)':>12}{'IQR (s)':>12}{'95% CI of median (s)':>26}{'failures':>10}  domain")
+    for measurement in results["measurements"].values():
+        summary = measurement["runtime"]
+        if summary["n"] == 0:
+            print(f"{measurement['approach']:<14}{'-':>12}{'-':>12}{'-':>26}{measurement['failures']:>10}  "
+                  f"{measurement['path']}")
+            continue
+        interval = f"[{summary['ciLow']:.4f}, {summary['ciHigh']:.4f}]"
+        print(f"{measurement['approach']:<14}{summary['median']:>12.4f}{summary['iqr']:>12.4f}{interval:>26}"
+              f"{measurement['failures']:>10}  {measurement['path']}")
+    print(f"Results written to {output}")
+
+    if baseline is not None:
+        compare(baseline, output, alpha, minEffect)
+    return output
+
+
+def compare(baseline, current, alpha=0.05, minEffect=0.05):
+    """
+    Compares the runtimes of two runs of the suite (see run) for every domain and approach measured by both. A
+    change is flagged as slowdown or speedup if the Mann-Whitney U test rejects equal runtimes and the median
+    runtime changed by more than minEffect (relative), everything else is attributed to noise. As a suite consists
+    of many comparisons, the p-values are adjusted by the Holm-Bonferroni method (see holm) before they are compared
+    with the significance level alpha, such that noise is unlikely to be flagged anywhere in the suite. Runs that
+    failed (timed out or exhausted their memory) more often than in the baseline are flagged as new failures.
+
+    :param baseline: path of the results of the baseline run
+    :param current: path of the results of the current run
+    :param alpha: significance level of the whole suite
+    :param minEffect: minimal relative change of the median runtime that is flagged
+    :return: a list of dicts with the fields path, approach, baselineMedian, currentMedian, ratio (current median
+        divided by baseline median), p, adjustedP, baselineFailures, currentFailures, and verdict ("newFailures",
+        "slowdown", "speedup", "unchanged", or "failed" if one of the runs has no successful measurement)
+    """
+    with open(baseline) as f:
+        baselineResults = json.load(f)
+    with open(current) as f:
+        currentResults = json.load(f)
+    print(f"Comparing {current} (revision {currentResults['revision']}) with baseline {baseline} "
+          f"(revision {baselineResults['revision']})")
+
+    comparisons = []
+    for key, measurement in currentResults["measurements"].items():
+        if key not in baselineResults["measurements"]:
+            continue
+        before = baselineResults["measurements"][key]["runtimes"]
+        after = measurement["runtimes"]
+        comparison = {
+            "path": measurement["path"],
+            "approach": measurement["approach"],
+            "baselineMedian": float(np.median(before)) if before else None,
+            "currentMedian": float(np.median(after)) if after else None,
+            "ratio": None,
+            "p": None,
+            "adjustedP": None,
+            "baselineFailures": baselineResults["measurements"][key]["failures"],
+            "currentFailures": measurement["failures"],
+            "verdict": "failed"
+        }
+        if before and after:
+            (_, p) = mannWhitneyU(after, before)
+            ratio = comparison["currentMedian"] / comparison["baselineMedian"] \
+                if comparison["baselineMedian"] > 0 else math.inf
+            comparison.update({"ratio": ratio, "p": p})
+        comparisons.append(comparison)
+
+    tested = [comparison for comparison in comparisons if comparison["p"] is not None]
+    for comparison, adjustedP in zip(tested, holm([comparison["p"] for comparison in tested])):
+        comparison["adjustedP"] = adjustedP
+        comparison["verdict"] = "unchanged"
+        if adjustedP < alpha and comparison["ratio"] > 1 + minEffect:
+            comparison["verdict"] = "slowdown"
+        elif adjustedP < alpha and comparison["ratio"] < 1 - minEffect:
+            comparison["verdict"] = "speedup"
+    for comparison in comparisons:
+        # a run that fails where the baseline succeeded is a regression, whatever the runtimes of the other runs
+        if comparison["currentFailures"] > comparison["baselineFailures"]:
+            comparison["verdict"] = "newFailures"
+
+        ratio = "-" if comparison["ratio"] is None else f"{comparison['ratio']:.3f}"
+        p = "-" if comparison["adjustedP"] is None else f"{comparison['adjustedP']:.4f}"
+        failures = f"{comparison['baselineFailures']}->{comparison['currentFailures']}"
+        print(f"{comparison['verdict']:<12}{comparison['approach']:<14}{ratio:>8}{p:>10}{failures:>10}  "
+              f"{comparison['path']}")
+
+    regressions = [comparison for comparison in comparisons if comparison["verdict"] in ("slowdown", "newFailures")]
+    speedups = [comparison for comparison in comparisons if comparison["verdict"] == "speedup"]
+    print(f"{len(regressions)} regressions and {len(speedups)} speedups in {len(comparisons)} comparisons")
+    return comparisons
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from functools import lru_cache
+
+import domainCompiler
+import domainLoader
+from domainCompiler import CompiledDomain, bitIndices
+from domainLoader import loadDomain
+
+DEFAULT_CACHE_DIR = "./cache/domains"
+DEFAULT_MAX_CACHE_SIZE = 1024 * 1024 * 1024  # bytes
+DEFAULT_MAX_CACHE_AGE = 30 * 24 * 60 * 60  # seconds
+
+# file layout (all integers little endian):
+#   header:  magic, format version, number of fluents, number of actions, size of the string block
+#   strings: fluents (atoms joined by " ") followed by action names, all separated by "\n"
+#   kinds:   one byte per mask (pre, add and del mask of every action), 0 = dense bytes, 1 = sparse bit indices
+#   offsets: 3 * number of actions + 1 unsigned 64 bit offsets of the masks relative to the start of the data block
+#   data:    the masks, either as little endian integer bytes or as an array of unsigned 32 bit bit indices
+_MAGIC = b"RVDC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIQ")
+_DENSE = 0
+_SPARSE = 1
+
+
+def _littleEndian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def contentHash(domainPathStr):
+    """Returns the SHA-256 hex digest of the content of the given file."""
+    h = hashlib.sha256()
+    with open(domainPathStr, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def compilerHash():
+    """
+    Returns a hash of the file format version and of the sources of the modules that determine how a domain is
+    compiled (domainLoader and domainCompiler), such that any change of the compilation invalidates the cache.
+    """
+    h = hashlib.sha256(str(_VERSION).encode())
+    for module in (domainLoader, domainCompiler):
+        with open(module.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def cachePath(domainPathStr, cacheDir=DEFAULT_CACHE_DIR):
+    """Returns the path of the cache file of a domain, keyed by the content of the domain and compilerHash."""
+    return os.path.join(cacheDir, f"{contentHash(domainPathStr)}-{compilerHash()}.rvdc")
+
+
+def writeCompiledDomain(domain, path):
+    """
+    Writes the fluent table, action names and action masks of a compiled domain to the given file.
+    The file is written to a temporary file first and then moved into place, such that concurrent readers never
+    see a partially written file.
+
+    :param domain: the compiled domain
+    :param path: path of the cache file
+    """
+    strings = "\n".join([" ".join(fluent) for fluent in domain.fluents] + domain.actionNames).encode("utf-8")
+
+    kinds = bytearray()
+    offsets = array("Q", [0])
+    chunks = []
+    for i in range(len(domain.actionNames)):
+        for mask in (domain.preMasks[i], domain.addMasks[i], domain.delMasks[i]):
+            dense = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+            indices = bitIndices(mask)
+            if len(dense) <= 4 * len(indices):
+                kinds.append(_DENSE)
+                chunk = dense
+            else:
+                kinds.append(_SPARSE)
+                chunk = _littleEndian(array("I", indices)).tobytes()
+            chunks.append(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tempPath = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(domain.fluents), len(domain.actionNames), len(strings)))
+            f.write(strings)
+            f.write(kinds)
+            f.write(_littleEndian(offsets).tobytes())
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tempPath, path)
+    except BaseException:
+        os.unlink(tempPath)
+        raise
+
+
+def readCompiledDomain(path):
+    """
+    Reads a compiled domain written by writeCompiledDomain. The file is memory-mapped, such that only the
+    string table and the masks themselves are copied.
+
+    :param path: path of the cache file
+    :return: the compiled domain
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, numFluents, numActions, stringsSize = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a compiled domain of version {_VERSION}")
+
+        position = _HEADER.size
+        strings = mm[position:position + stringsSize].decode("utf-8").split("\n") if stringsSize else []
+        position += stringsSize
+        fluents = [tuple(fluent.split(" ")) for fluent in strings[:numFluents]]
+        actionNames = strings[numFluents:]
+
+        numMasks = 3 * numActions
+        kinds = mm[position:position + numMasks]
+        position += numMasks
+        offsets = array("Q")
+        offsets.frombytes(mm[position:position + 8 * (numMasks + 1)])
+        _littleEndian(offsets)
+        position += 8 * (numMasks + 1)
+
+        masks = []
+        for i in range(numMasks):
+            chunk = mm[position + offsets[i]:position + offsets[i + 1]]
+            if kinds[i] == _DENSE:
+                masks.append(int.from_bytes(chunk, "little"))
+            else:
+                indices = _littleEndian(array("I", chunk))
+                if len(indices) <= 8:
+                    mask = 0
+                    for index in indices:
+                        mask |= 1 << index
+                else:
+                    dense = bytearray((max(indices) >> 3) + 1)
+                    for index in indices:
+                        dense[index >> 3] |= 1 << (index & 7)
+                    mask = int.from_bytes(dense, "little")
+                masks.append(mask)
+
+    return CompiledDomain(fluents, actionNames, masks[0::3], masks[1::3], masks[2::3])
+
+
+def evict(cacheDir=DEFAULT_CACHE_DIR, maxCacheSize=DEFAULT_MAX_CACHE_SIZE, maxCacheAge=DEFAULT_MAX_CACHE_AGE,
+          suffixes=(".rvdc",), minCacheAge=0):
+    """
+    Removes cache files that have not been used for more than maxCacheAge seconds and then removes the least
+    recently used cache files until the total size of the cache does not exceed maxCacheSize bytes. Cache files
+    used within the last minCacheAge seconds are never removed, even if the cache stays larger than maxCacheSize.
+
+    :param cacheDir: folder of the cache
+    :param maxCacheSize: maximal total size of the cache in bytes, -1 for no limit
+    :param maxCacheAge: maximal age of a cache file in seconds, -1 for no limit
+    :param suffixes: file name suffixes of the cache files, other files in the folder are ignored
+    :param minCacheAge: seconds since their last use during which cache files are kept in any case
+    """
+    if not os.path.isdir(cacheDir):
+        return
+
+    now = time.time()
+    entries = []
+    for name in os.listdir(cacheDir):
+        if not name.endswith(tuple(suffixes)):
+            continue
+        path = os.path.join(cacheDir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if maxCacheAge != -1 and now - stat.st_mtime > maxCacheAge:
+            _remove(path)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    if maxCacheSize == -1:
+        return
+    totalSize = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        if totalSize <= maxCacheSize or now - mtime < minCacheAge:
+            break
+        _remove(path)
+        totalSize -= size
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def loadCachedDomain(domainPathStr, cacheDir=DEFAULT_CACHE_DIR, maxCacheSize=DEFAULT_MAX_CACHE_SIZE,
+                     maxCacheAge=DEFAULT_MAX_CACHE_AGE):
+    """
+    Drop-in replacement for domainLoader.loadDomain that keeps a persistent cache of compiled domains keyed by the
+    content hash of the domain file and the version of the compilation (see cachePath). On a cache hit the domain is
+    not parsed at all. The cache is only an optimization: if it cannot be written (e.g. as the folder is read-only
+    or the disk is full), a warning is printed and the freshly compiled domain is returned anyway.
+
+    :param domainPathStr: Path to the PDDL domain file
+    :param cacheDir: folder of the cache, None to disable the cache
+    :param maxCacheSize: maximal total size of the cache in bytes, -1 for no limit
+    :param maxCacheAge: maximal age of an unused cache file in seconds, -1 for no limit
+    :return: the compiled domain
+    """
+    if cacheDir is None:
+        return loadDomain(domainPathStr)
+
+    path = cachePath(domainPathStr, cacheDir)
+    try:
+        domain = readCompiledDomain(path)
+    except (OSError, ValueError, struct.error):
+        domain = None
+    if domain is not None:
+        try:
+            # the modification time is used as last access time for the eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return domain
+
+    domain = loadDomain(domainPathStr)
+    try:
+        writeCompiledDomain(domain, path)
+        evict(cacheDir, maxCacheSize, maxCacheAge)
+    except OSError as e:
+        print(f"Warning: could not write the compiled domain cache {path}: {e}", file=sys.stderr)
+    return domain
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+
+def pre_a(action):
+    # return action.negative_preconditions.union(action.positive_preconditions)
+    return action.positive_preconditions
+
+
+def del_a(action):
+    return action.del_effects
+
+
+def add_a(action):
+    return action.add_effects
+
+
+def bitIndices(mask):
+    """Returns the indices of all bits set in the given mask in ascending order."""
+    if mask & (mask - 1) == 0:
+        # empty mask or a single bit, which is the case for most preconditions and effects
+        return [mask.bit_length() - 1] if mask else []
+    digits = bin(mask)[:1:-1]
+    indices = []
+    i = digits.find("1")
+    while i != -1:
+        indices.append(i)
+        i = digits.find("1", i + 1)
+    return indices
+
+
+def popCount(mask):
+    """Returns the number of bits set in the given mask."""
+    return bin(mask).count("1")
+
+
+class CompiledAction:
+    """Lightweight stand-in for a parsed action, as returned by CompiledDomain.action."""
+
+    def __init__(self, name, positive_preconditions, add_effects, del_effects):
+        self.name = name
+        self.positive_preconditions = positive_preconditions
+        self.negative_preconditions = frozenset()
+        self.add_effects = add_effects
+        self.del_effects = del_effects
+
+
+class CompiledDomain:
+    """
+    Bitset representation of a STRIPS domain as it is used by the reversibility search.
+
+    Every fluent of the domain is mapped to a bit index, such that a set of fluents is represented by a single
+    (arbitrarily large) Python integer. Every action is turned into three such masks, one for each of pre_a, add_a
+    and del_a. Actions are identified by their position in the domain, which is the position of the action in the
+    list the domain was compiled from.
+    """
+
+    def __init__(self, fluents, actionNames, preMasks, addMasks, delMasks, actions=None):
+        """
+        :param fluents: list of fluents, the fluent at position i is represented by bit i
+        :param actionNames: list of action names
+        :param preMasks: list of precondition masks, one per action
+        :param addMasks: list of add effect masks, one per action
+        :param delMasks: list of delete effect masks, one per action
+        :param actions: optional list of the action objects the domain was compiled from
+        """
+        self.fluents = fluents
+        self.fluentIndex = {fluent: i for i, fluent in enumerate(fluents)}
+        self.actionNames = actionNames
+        self.preMasks = preMasks
+        self.addMasks = addMasks
+        self.delMasks = delMasks
+        self.actions = actions
+
+        # fluent -> actions index: bit a of preconditionIndex[f] is set if fluent f is in pre_a of action a
+        self.preconditionIndex = [0] * len(fluents)
+        for a, preMask in enumerate(preMasks):
+            for f in bitIndices(preMask):
+                self.preconditionIndex[f] |= 1 << a
+        self.allActionsMask = (1 << len(actionNames)) - 1
+        # fluent -> actions index of add_a, only built once it is needed (see achievingActions)
+        self.achieverIndex = None
+
+    def blockedActions(self, mask):
+        """Returns the mask of all actions that have at least one fluent of the given mask in their preconditions."""
+        blocked = 0
+        for f in bitIndices(mask):
+            blocked |= self.preconditionIndex[f]
+        return blocked
+
+    def achievingActions(self, mask):
+        """Returns the mask of all actions that have at least one fluent of the given mask in their add effects."""
+        if self.achieverIndex is None:
+            self.achieverIndex = [0] * len(self.fluents)
+            for a, addMask in enumerate(self.addMasks):
+                for f in bitIndices(addMask):
+                    self.achieverIndex[f] |= 1 << a
+        achieving = 0
+        for f in bitIndices(mask):
+            achieving |= self.achieverIndex[f]
+        return achieving
+
+    def encode(self, fluents):
+        """Returns the mask of the given set of fluents."""
+        mask = 0
+        for fluent in fluents:
+            mask |= 1 << self.fluentIndex[fluent]
+        return mask
+
+    def decode(self, mask):
+        """Returns the set of fluents of the given mask."""
+        return {self.fluents[i] for i in bitIndices(mask)}
+
+    def action(self, actionIndex):
+        """Returns the action object the domain was compiled from, or a CompiledAction decoded from its masks
+        if no action objects are available."""
+        if self.actions is not None:
+            return self.actions[actionIndex]
+        return CompiledAction(
+            self.actionNames[actionIndex],
+            frozenset(self.decode(self.preMasks[actionIndex])),
+            frozenset(self.decode(self.addMasks[actionIndex])),
+            frozenset(self.decode(self.delMasks[actionIndex]))
+        )
+
+    def actionIndex(self, actionName):
+        """Returns the index of the action with the given name or -1 if there is no such action."""
+        for i, name in enumerate(self.actionNames):
+            if name == actionName:
+                return i
+        return -1
+
+
+def compileDomain(actions):
+    """
+    Compiles the actions of a parsed domain (as returned by PDDL_Parser.parse_domain) into a CompiledDomain.
+    Bit indices are assigned in the order in which fluents are first encountered, so compiling the same
+    list of actions always leads to the same domain.
+
+    :param actions: all actions present in the domain
+    :return: the compiled domain
+    """
+    fluents = []
+    fluentIndex = {}
+
+    def mask(fluentSet):
+        m = 0
+        for fluent in sorted(fluentSet):
+            if fluent not in fluentIndex:
+                fluentIndex[fluent] = len(fluents)
+                fluents.append(fluent)
+            m |= 1 << fluentIndex[fluent]
+        return m
+
+    preMasks = []
+    addMasks = []
+    delMasks = []
+    for action in actions:
+        preMasks.append(mask(pre_a(action)))
+        addMasks.append(mask(add_a(action)))
+        delMasks.append(mask(del_a(action)))
+
+    return CompiledDomain(
+        fluents,
+        [action.name for action in actions],
+        preMasks,
+        addMasks,
+        delMasks,
+        actions=list(actions)
+    )
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
+import functools
+from collections import deque
 import networkx as nx
 import random
 
+from domainCompiler import CompiledAction, compileDomain
+
 global domain_id
 domain_id = 0
 
@@ -12,27 +16,51 @@ def generate_domain_id():
 
     return str(domain_id).zfill(4)
 
+# buffer size of the files the domains are written to
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def joinLines(parts):
+    """Yields the given strings separated by newlines, the streaming counterpart of "\n".join(parts)."""
+    first = True
+    for part in parts:
+        if not first:
+            yield "\n"
+        first = False
+        yield part
+
+
+def writeDomain(filename, domain):
+    """
+    Writes a PDDL domain, as yielded piece by piece by the domain functions, to the given file. Only a single action
+    is held in memory at once, the file itself is written in chunks of WRITE_BUFFER_SIZE bytes.
+
+    :param filename: path of the PDDL file
+    :param domain: iterable over the strings the domain consists of
+    """
+    with open(filename, "w", buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(domain)
+
+
 def singlePath(i):
     """
     Generates a PDDL domain where there exists only a single reverse plan for action del-all of length i.
 
     :param i: length of the single reverse plan
-    :return: the PDDL doamin in string format
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
     """
 
     predicates = [f"(f{j})" for j in range(0, i+1)]
 
     not_predicates = [f"(not {p})" for p in predicates]
 
-    newline = "\n"
-
-    actions = [f"""
+    actions = (f"""
     (:action add-f{j}
     :precondition (f{j-1})
     :effect (f{j}))
-    """ for j in range(1, i+1)]
+    """ for j in range(1, i+1))
 
-    domain = f"""
+    yield f"""
     (define (domain singlePath-{i})
     (:requirements :strips)
     (:predicates {" ".join(predicates)})
@@ -45,34 +73,32 @@ def singlePath(i):
     (:action add-f0
     :effect (f0))
 
-    {newline.join(actions)}
+    """
+    yield from joinLines(actions)
+    yield """
     )
     """
 
-    return domain
-
 
 def multiplePaths(i):
     """
     Generates a PDDL domain with multiple reverse plans for action del-all of length 0.5 * i * (i+1).
 
     :param i: length of the single reverse plan
-    :return: the PDDL doamin in string format
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
     """
 
     predicates = [f"(f{j})" for j in range(0, i+1)]
 
     not_predicates = [f"(not {p})" for p in predicates]
 
-    newline = "\n"
-
-    actions = [f"""
+    actions = (f"""
     (:action add-f{j}
     :precondition (f{j-1})
     :effect (and (f{j}) {' '.join([f'(not (f{i}))' for i in range(j)])}))
-    """ for j in range(1, i+1)]
+    """ for j in range(1, i+1))
 
-    domain = f"""
+    yield f"""
     (define (domain multiplePaths-{i})
     (:requirements :strips)
     (:predicates {" ".join(predicates)})
@@ -84,10 +110,10 @@ def multiplePaths(i):
     (:action add-f0
     :effect (f0))
 
-    {newline.join(actions)})
     """
-
-    return domain
+    yield from joinLines(actions)
+    yield """)
+    """
 
 
 def multiplePathsDeadEnds(i):
@@ -95,22 +121,20 @@ def multiplePathsDeadEnds(i):
     Generates a PDDL domain with multiple reverse plans and possible dead ends for action del-all of length 0.5 * i * (i+1).
 
     :param i: length of the single reverse plan
-    :return: the PDDL domain in string format
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
     """
 
     predicates = [f"(f{j})" for j in range(0, i+1)]
 
     not_predicates = [f"(not {p})" for p in predicates]
 
-    newline = "\n"
-
-    actions = [f"""
+    actions = (f"""
     (:action add-f{j}
     :precondition (f{j-1})
     :effect (and (f{j}) {' '.join([f'(not (f{i}))' for i in range(j)])}))
-    """ for j in range(1, i+1)]
+    """ for j in range(1, i+1))
 
-    domain = f"""
+    yield f"""
     (define (domain deadEnds-{i})
     (:requirements :strips)
     (:predicates {" ".join(predicates + ["(token)"])})
@@ -122,83 +146,90 @@ def multiplePathsDeadEnds(i):
     (:action add-f0
     :effect (f0))
 
-    {newline.join(actions)}
+    """
+    yield from joinLines(actions)
+    yield """
 
     (:action consume
     :precondition (token)
     :effect (not (token))))
     """
 
-    return domain
-
 
-def generalized(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end):
+def generalizedActions(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end, goal):
     """
-    Generates a PDDL domain with a fixed number of plans of length i leading to the same goal state,
-    and a fixed number of plans of length i leading to a dead end.
+    Generates the actions of a generalized domain (see generalized), first all plans leading to the goal state,
+    then all plans leading to a dead end.
 
-    :param num_plans_success: number of plans leading to the goal state
-    :param length_plans_success: length of the plans leading to the goal state
-    :param num_plans_dead_end: number of plans leading to a dead end
-    :param length_plans_dead_end: length of the plans leading to a dead end
-    :return: the PDDL domain in string format
+    :return: a generator, which yields the PDDL actions in string format one by one
     """
 
-    total_states = num_plans_success * (length_plans_success-1) + num_plans_dead_end * length_plans_dead_end + 2
-    print(f"total_states: {total_states}")
-
-    predicates = [f"(f{j})" for j in range(0, total_states)]
-    not_predicates = [f"(not {p})" for p in predicates]
-
-    predicates += ["(f-init)"]
-
-    newline = "\n"
-
-    goal = f"(f{total_states-1})"
     next_state = 1
 
-    actions = []
-
     for _ in range(num_plans_success):
-        actions.append(f"""
+        yield f"""
     (:action add-f0-f{next_state}
     :precondition (f0)
     :effect (and (f{next_state}) (not (f0))))
-        """)
+        """
 
         for _ in range(1,length_plans_success-1):
             next_state += 1
-            actions.append(f"""
+            yield f"""
     (:action add-f{next_state-1}-f{next_state}
     :precondition (f{next_state-1})
     :effect (and (f{next_state}) (not (f{next_state-1}))))
-            """)
+            """
 
-        actions.append(f"""
+        yield f"""
     (:action add-f{next_state}-goal
     :precondition (f{next_state})
     :effect (and {goal} (not (f{next_state}))))
-        """)
+        """
         next_state += 1
 
     # then generate all plans leading to a dead end
     for _ in range(num_plans_dead_end):
-        actions.append(f"""
+        yield f"""
     (:action add-f0-f{next_state}
     :precondition (f0)
     :effect (and (f{next_state}) (not (f0))))
-        """)
+        """
 
         for _ in range(1,length_plans_dead_end):
             next_state += 1
-            actions.append(f"""
+            yield f"""
     (:action add-f{next_state-1}-f{next_state}
     :precondition (f{next_state-1})
     :effect (and (f{next_state}) (not (f{next_state-1}))))
-            """)
+            """
         next_state += 1
 
-    domain = f"""
+
+def generalized(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end):
+    """
+    Generates a PDDL domain with a fixed number of plans of length i leading to the same goal state,
+    and a fixed number of plans of length i leading to a dead end.
+
+    :param num_plans_success: number of plans leading to the goal state
+    :param length_plans_success: length of the plans leading to the goal state
+    :param num_plans_dead_end: number of plans leading to a dead end
+    :param length_plans_dead_end: length of the plans leading to a dead end
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
+    """
+
+    total_states = num_plans_success * (length_plans_success-1) + num_plans_dead_end * length_plans_dead_end + 2
+    print(f"total_states: {total_states}")
+
+    predicates = [f"(f{j})" for j in range(0, total_states)]
+    not_predicates = [f"(not {p})" for p in predicates]
+
+    predicates += ["(f-init)"]
+
+    goal = f"(f{total_states-1})"
+    actions = generalizedActions(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end, goal)
+
+    yield f"""
     (define (domain generalized-{num_plans_success}-{length_plans_success}-{num_plans_dead_end}-{length_plans_dead_end})
     (:requirements :strips)
     (:predicates {" ".join(predicates)})
@@ -211,30 +242,56 @@ def generalized(num_plans_success, length_plans_success, num_plans_dead_end, len
     :precondition (f-init)
     :effect (and (f0) (not (f-init))))
 
-    {newline.join(actions)}
+    """
+    yield from joinLines(actions)
+    yield """
     )
         
     """
 
-    return domain
 
+@functools.lru_cache(maxsize=4)
+def barabasiAlbertGraph(n, m):
+    """
+    Generates the (undirected) Barabasi-Albert graph with n nodes, where every new node is linked to m nodes.
+    The graph is seeded and cached, such that all domains of the same (n, m) share the same graph, which must
+    therefore not be modified.
+    """
+
+    seed = random.seed(246)
 
-def barabasiAlbertLongestShortestPath(n, m):
+    return nx.barabasi_albert_graph(m=m, n=n, seed=seed)
+
+
+def barabasiAlbertLongestShortestPath(n, m, domainId=None):
     """
     Generates ten PDDL domains based on Barabasi-Albert graph with the provided parameters. Only the ten node pairs with highest hop distance are considered.
 
     :param i: length of the single reverse plan
-    :return: the PDDL domain in string format
+    :param domainId: id of the domain (see generate_domain_id), None to take the next one
+    :return: a pair of the name of the domain and a generator, which yields the PDDL domain in string format piece
+        by piece (see writeDomain)
     """
 
-    seed = random.seed(246)
+    G, node_a, node_b, path_length = barabasiAlbertLongestShortestPathNodes(n, m)
+
+    if domainId is None:
+        domainId = generate_domain_id()
+    domain = barabasiAlbertLongestShortestPathDomain(G, m, n, node_a, node_b, path_length)
+    return (f"{domainId}-barabasiAlbertLongestShortestPath-{m}-{n}-{node_a}-{node_b}-{path_length}", domain)
+
+
+def barabasiAlbertLongestShortestPathNodes(n, m):
+    """
+    Determines the nodes of the barabasiAlbertLongestShortestPath domain: node 0 and the node with the longest
+    shortest path from it.
+
+    :return: a (G, node_a, node_b, path_length) tuple, where G is the (undirected, shared) Barabasi-Albert graph
+    """
 
-    G = nx.barabasi_albert_graph(m=m, n=n, seed=seed)
-    G = nx.to_directed(G)
-    # clone graph to remove inverse edges
-    G = G.copy()
-    # only keep one edge for every two nodes, e.g., edge (u,v) only have one edge u->v or v->u.
-    G.remove_edges_from([(u,v) for (u,v) in G.edges if u > v])
+    G = barabasiAlbertGraph(n, m)
+    # only keep one edge for every two nodes, e.g., edge (u,v) only have one edge u->v or v->u:
+    # the domain only contains the edges u->v with u < v (see barabasiAlbertLongestShortestPathDomain)
 
     # sort nodes by out degree
     # sorted_nodes = sorted(G.out_degree, key=lambda x: x[1], reverse=True)
@@ -243,11 +300,28 @@ def barabasiAlbertLongestShortestPath(n, m):
     # node_a = sorted_nodes[0][0]
     node_a = 0
 
-    shortest_paths = nx.single_source_shortest_path(G, node_a)
-    longest_shortest_path = sorted(shortest_paths.values(), key=len, reverse=True)[:1][0]
+    # a single BFS along the kept edges, node_b is the first node in BFS order with the largest distance
+    distances = {node_a: 0}
+    queue = deque([node_a])
+    while queue:
+        u = queue.popleft()
+        for v in G.adj[u]:
+            if u < v and v not in distances:
+                distances[v] = distances[u] + 1
+                queue.append(v)
+    node_b = max(distances, key=distances.get)
+    path_length = distances[node_b]
 
-    path_length = len(longest_shortest_path) - 1
-    node_b = longest_shortest_path[-1]
+    return (G, node_a, node_b, path_length)
+
+
+def barabasiAlbertLongestShortestPathDomain(G, m, n, node_a, node_b, path_length):
+    """
+    Generates the PDDL domain of barabasiAlbertLongestShortestPath for a path from node_a to node_b, which only
+    contains the edges u->v with u < v of the (undirected) graph G.
+
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
+    """
 
     node_a_pred = f"(f{node_a})"
     node_b_pred = f"(f{node_b})"
@@ -257,15 +331,13 @@ def barabasiAlbertLongestShortestPath(n, m):
 
     predicates +=  ["(f-init)"]
 
-    newline = "\n"
-
-    actions = [f"""
+    actions = (f"""
     (:action add-f{u}-f{v}
     :precondition (f{u})
     :effect (and (f{v}) (not (f{u}))))
-    """ for (u, v) in G.edges]
+    """ for u in G for v in G.adj[u] if u < v)
 
-    domain = f"""
+    yield f"""
     (define (domain barabasiAlbert_{m}-{n}-{node_a}-{node_b}-{path_length})
     (:requirements :strips :negative-preconditions)
     (:predicates {" ".join(predicates)})
@@ -279,24 +351,53 @@ def barabasiAlbertLongestShortestPath(n, m):
     :precondition (f-init)
     :effect (and {node_a_pred} (not (f-init))))
 
-    {newline.join(actions)}
+    """
+    yield from joinLines(actions)
+    yield """
     )
     """
-    return (f"{generate_domain_id()}-barabasiAlbertLongestShortestPath-{m}-{n}-{node_a}-{node_b}-{path_length}", domain)
 
 
-def barabasiAlbertDegree(n, m):
+def barabasiAlbertDegree(n, m, domainIds=None):
     """
     Generates a PDDL domain based on Barabasi-Albert graphs. Multiple test instances are returned for a domain. Only the ten node pairs with highest hop distance are considered.
 
     :param i: length of the single reverse plan
-    :return: the PDDL domain in string format
+    :param domainIds: ids of the domains (see generate_domain_id), one per node pair (see barabasiAlbertDegreeNodePairs),
+        None to take the next ones
+    :return: a generator, which yields pairs of the name of a domain and a generator, which yields the PDDL domain
+        in string format piece by piece (see writeDomain)
     """
 
-    seed = random.seed(246)
+    G, node_pairs = barabasiAlbertDegreeNodePairs(n, m)
+    if domainIds is None:
+        domainIds = [generate_domain_id() for _ in node_pairs]
+
+    # the predicates and actions are the same for all node pairs and therefore only built once
+    predicates = [f"(f{j})" for j in G.nodes]
+    not_predicates = " ".join(f"(not {p})" for p in predicates)
+    # every undirected edge results in an action for both of its directions (as in nx.to_directed)
+    actions = "\n".join(f"""
+        (:action add-f{u}-f{v}
+        :precondition (f{u})
+        :effect (and (f{v}) (not (f{u}))))
+        """ for u in G for v in G.adj[u])
 
-    G = nx.barabasi_albert_graph(m=m, n=n, seed=seed)
-    G = nx.to_directed(G)
+    for domainId, (node_a, node_b, path_length) in zip(domainIds, node_pairs):
+        domain = barabasiAlbertDegreeDomain(predicates, not_predicates, actions, m, n, node_a, node_b, path_length)
+        yield (f"{domainId}-barabasiAlbertDegree-{m}-{n}-{node_a}-{node_b}-{path_length}", domain)
+
+
+def barabasiAlbertDegreeNodePairs(n, m):
+    """
+    Determines the node pairs of the barabasiAlbertDegree domains: the most connected node and the (at most ten)
+    most connected nodes that are not its neighbours.
+
+    :return: a pair of the (undirected, shared) Barabasi-Albert graph and a list of (node_a, node_b, path_length)
+        triples
+    """
+
+    G = barabasiAlbertGraph(n, m)
 
     # sort nodes by degree
     sorted_nodes = sorted(G.degree, key=lambda x: x[1], reverse=True)
@@ -304,52 +405,300 @@ def barabasiAlbertDegree(n, m):
     # start at most connected node
     node_a = sorted_nodes[0][0]
     
+    # a single BFS from node_a instead of a shortest path search per candidate node
+    distances = nx.single_source_shortest_path_length(G, node_a)
+
     node_pairs = []
     for i in range(1, len(sorted_nodes)):
         node_b = sorted_nodes[i][0]
-        shortest_path_length = nx.shortest_path_length(G, node_a, node_b)
+        shortest_path_length = distances[node_b]
         if shortest_path_length > 1:
             node_pairs.append((node_a, node_b, shortest_path_length))
             if len(node_pairs) == 10:
                 break
 
-    for node_a, node_b, path_length in node_pairs:
+    return (G, node_pairs)
 
-        node_a_pred = f"(f{node_a})"
-        node_b_pred = f"(f{node_b})"
 
-        predicates = [f"(f{j})" for j in G.nodes]
-        not_predicates = [f"(not {p})" for p in predicates]
+def barabasiAlbertDegreeDomain(predicates, not_predicates, actions, m, n, node_a, node_b, path_length):
+    """
+    Generates a PDDL domain of barabasiAlbertDegree for a path from node_a to node_b.
 
-        newline = "\n"
+    :param predicates: list of the predicates of all nodes
+    :param not_predicates: the negated predicates of all nodes, separated by spaces
+    :param actions: the actions of all edges in string format, separated by newlines
+    :return: a generator, which yields the PDDL domain in string format piece by piece (see writeDomain)
+    """
 
-        actions = [f"""
-        (:action add-f{u}-f{v}
-        :precondition (f{u})
-        :effect (and (f{v}) (not (f{u}))))
-        """ for (u, v) in G.edges]
+    node_a_pred = f"(f{node_a})"
+    node_b_pred = f"(f{node_b})"
 
-        domain = f"""
+    yield f"""
         (define (domain barabasiAlbert_{m}-{n}-{node_a}-{node_b}-{path_length})
         (:requirements :strips :negative-preconditions)
         (:predicates {" ".join(predicates)})
 
         (:action del-all
         :precondition (and {node_b_pred} {" ".join([f"(not {p})" for p in predicates if p != node_b_pred])})
-        :effect (and {" ".join(not_predicates)})
+        :effect (and {not_predicates})
         )
 
         (:action add-f{node_a}
         :effect {node_a_pred})
 
-        {newline.join(actions)}
+        """
+    yield actions
+    yield """
         )
         """
 
-        yield (f"{generate_domain_id()}-barabasiAlbertDegree-{m}-{n}-{node_a}-{node_b}-{path_length}", domain)
+
+# Compiled models: the same domains as above, directly as compiled action models (see domainCompiler.CompiledDomain)
+# instead of PDDL text. A model is identical to the domain obtained by domainLoader.loadDomain from the PDDL file,
+# such that sweeps can be generated and solved in memory without writing and parsing files (see
+# benchmark.benchmarkModel).
+
+def _modelAction(name, pre=(), add=(), dele=()):
+    """Returns a CompiledAction on the given predicate names, e.g. _modelAction("add-f1", ["f0"], ["f1"])."""
+    return CompiledAction(
+        name,
+        frozenset((p,) for p in pre),
+        frozenset((p,) for p in add),
+        frozenset((p,) for p in dele)
+    )
+
+
+def singlePathModel(i):
+    """
+    Compiled counterpart of singlePath.
+
+    :param i: length of the single reverse plan
+    :return: the compiled domain
+    """
+    fluents = [f"f{j}" for j in range(0, i+1)]
+    actions = [_modelAction("del-all", pre=fluents, dele=fluents), _modelAction("add-f0", add=["f0"])]
+    actions += [_modelAction(f"add-f{j}", pre=[f"f{j-1}"], add=[f"f{j}"]) for j in range(1, i+1)]
+    return compileDomain(actions)
+
+
+def multiplePathsModel(i):
+    """
+    Compiled counterpart of multiplePaths.
+
+    :param i: length of the single reverse plan
+    :return: the compiled domain
+    """
+    fluents = [f"f{j}" for j in range(0, i+1)]
+    actions = [_modelAction("del-all", pre=fluents, dele=fluents), _modelAction("add-f0", add=["f0"])]
+    actions += [_modelAction(f"add-f{j}", pre=[f"f{j-1}"], add=[f"f{j}"], dele=fluents[:j]) for j in range(1, i+1)]
+    return compileDomain(actions)
+
+
+def multiplePathsDeadEndsModel(i):
+    """
+    Compiled counterpart of multiplePathsDeadEnds.
+
+    :param i: length of the single reverse plan
+    :return: the compiled domain
+    """
+    fluents = [f"f{j}" for j in range(0, i+1)]
+    actions = [_modelAction("del-all", pre=fluents + ["token"], dele=fluents), _modelAction("add-f0", add=["f0"])]
+    actions += [_modelAction(f"add-f{j}", pre=[f"f{j-1}"], add=[f"f{j}"], dele=fluents[:j]) for j in range(1, i+1)]
+    actions.append(_modelAction("consume", pre=["token"], dele=["token"]))
+    return compileDomain(actions)
+
+
+def generalizedModel(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end):
+    """
+    Compiled counterpart of generalized (the negative preconditions of del-all are not part of the model, see
+    domainCompiler.pre_a).
+
+    :return: the compiled domain
+    """
+    total_states = num_plans_success * (length_plans_success-1) + num_plans_dead_end * length_plans_dead_end + 2
+    goal = f"f{total_states-1}"
+
+    def step(u, v):
+        return _modelAction(f"add-{u}-{v}", pre=[u], add=[v], dele=[u])
+
+    actions = [
+        _modelAction("del-all", pre=[goal], add=["f-init"], dele=[f"f{j}" for j in range(0, total_states)]),
+        _modelAction("add-f0", pre=["f-init"], add=["f0"], dele=["f-init"])
+    ]
+    next_state = 1
+    for _ in range(num_plans_success):
+        actions.append(step("f0", f"f{next_state}"))
+        for _ in range(1, length_plans_success-1):
+            next_state += 1
+            actions.append(step(f"f{next_state-1}", f"f{next_state}"))
+        actions.append(_modelAction(f"add-f{next_state}-goal", pre=[f"f{next_state}"], add=[goal], dele=[f"f{next_state}"]))
+        next_state += 1
+    for _ in range(num_plans_dead_end):
+        actions.append(step("f0", f"f{next_state}"))
+        for _ in range(1, length_plans_dead_end):
+            next_state += 1
+            actions.append(step(f"f{next_state-1}", f"f{next_state}"))
+        next_state += 1
+    return compileDomain(actions)
+
+
+def barabasiAlbertLongestShortestPathModel(n, m):
+    """
+    Compiled counterpart of barabasiAlbertLongestShortestPath.
+
+    :return: a pair of the name of the domain (without a domain id) and the compiled domain
+    """
+    G, node_a, node_b, path_length = barabasiAlbertLongestShortestPathNodes(n, m)
+    actions = [
+        _modelAction("del-all", pre=[f"f{node_b}"], add=["f-init"], dele=[f"f{j}" for j in G.nodes]),
+        _modelAction(f"add-f{node_a}", pre=["f-init"], add=[f"f{node_a}"], dele=["f-init"])
+    ]
+    actions += [_modelAction(f"add-f{u}-f{v}", pre=[f"f{u}"], add=[f"f{v}"], dele=[f"f{u}"])
+                for u in G for v in G.adj[u] if u < v]
+    return (f"barabasiAlbertLongestShortestPath-{m}-{n}-{node_a}-{node_b}-{path_length}", compileDomain(actions))
+
+
+def barabasiAlbertDegreeModels(n, m):
+    """
+    Compiled counterpart of barabasiAlbertDegree.
+
+    :return: a generator, which yields pairs of the name of a domain (without a domain id) and the compiled domain
+    """
+    G, node_pairs = barabasiAlbertDegreeNodePairs(n, m)
+    edges = [_modelAction(f"add-f{u}-f{v}", pre=[f"f{u}"], add=[f"f{v}"], dele=[f"f{u}"]) for u in G for v in G.adj[u]]
+    for node_a, node_b, path_length in node_pairs:
+        actions = [
+            _modelAction("del-all", pre=[f"f{node_b}"], dele=[f"f{j}" for j in G.nodes]),
+            _modelAction(f"add-f{node_a}", add=[f"f{node_a}"])
+        ]
+        yield (f"barabasiAlbertDegree-{m}-{n}-{node_a}-{node_b}-{path_length}", compileDomain(actions + edges))
 
 
-def generateStandardDomains(folder, start, limit, step, domain):
+def generateStandardModels(start, limit, step, domain):
+    """
+    In-memory counterpart of generateStandardDomains.
+
+    :param start: start value of argument i
+    :param limit: limit of argument i
+    :param step: step increment of argument i
+    :param domain: domain type to be created ("singlePath", "multiplePaths", or "multiplePathsDeadEnds")
+    :return: a generator, which yields pairs of the name of a domain (without a domain id) and the compiled domain
+    """
+    modelFunctions = {"singlePath": singlePathModel, "multiplePaths": multiplePathsModel,
+                      "multiplePathsDeadEnds": multiplePathsDeadEndsModel}
+    if domain not in modelFunctions:
+        raise ValueError(f"The provided domain \"{domain}\" does not have a corresponding model function.")
+    for i in range(start, limit+1, step):
+        yield (f"{domain}-{i}", modelFunctions[domain](i))
+
+
+STANDARD_DOMAIN_FUNCTIONS = [singlePath, multiplePaths, multiplePathsDeadEnds]
+
+
+class DomainPlanner:
+    """
+    Plans the generation of a sweep of domains and generates them in a pool of worker processes.
+
+    The ids of the domains (see generate_domain_id) are assigned up front, in the order in which the domains are
+    added to the planner. Hence, the generated files and their names are the same as if the domains had been
+    generated one after another, no matter how many worker processes are used and in which order they finish.
+    """
+
+    def __init__(self, folder):
+        """
+        :param folder: folder in which the PDDL domains shall be written to
+        """
+        self.folder = folder
+        # (domain ids, domain type, arguments) triples
+        self.tasks = []
+
+    def standardDomains(self, start, limit, step, domain):
+        """Adds the domains of generateStandardDomains."""
+        if limit >= 1000:
+            print("The limit is only supported up to a value of 999.")
+            return
+        if domain not in [f.__name__ for f in STANDARD_DOMAIN_FUNCTIONS]:
+            print(f"The provided domain \"{domain}\" does not have a corresponding domain function.")
+            return
+        for i in range(start, limit+1, step):
+            self.tasks.append(([generate_domain_id()], domain, (i,)))
+
+    def generalizedDomain(self, num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end):
+        """Adds the domain of generateGeneralizedDomain."""
+        self.tasks.append(([generate_domain_id()], "generalized",
+                           (num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end)))
+
+    def barabasiAlbertDomains(self, n, m, domain):
+        """Adds the domains of generateBarabasiAlbertDomains."""
+        if domain == "barabasiAlbertLongestShortestPath":
+            self.tasks.append(([generate_domain_id()], domain, (n, m)))
+        if domain == "barabasiAlbertDegree":
+            # the number of domains depends on the graph, which therefore has to be built already
+            _, node_pairs = barabasiAlbertDegreeNodePairs(n, m)
+            self.tasks.append(([generate_domain_id() for _ in node_pairs], domain, (n, m)))
+
+    def run(self, processes=1):
+        """
+        Generates all planned domains.
+
+        :param processes: number of worker processes, 1 generates all domains in the current process
+        """
+        from pathlib import Path
+        Path(self.folder).mkdir(parents=True, exist_ok=True)
+
+        tasks = [(self.folder, task) for task in self.tasks]
+        self.tasks = []
+        if processes <= 1:
+            for task in tasks:
+                _generatePlannedDomain(task)
+            return
+
+        import multiprocessing
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            for _ in pool.imap_unordered(_generatePlannedDomain, tasks):
+                pass
+
+
+def _generatePlannedDomain(task):
+    folder, (domainIds, domain, args) = task
+
+    if domain in [f.__name__ for f in STANDARD_DOMAIN_FUNCTIONS]:
+        (i,) = args
+        domainFunction = [f for f in STANDARD_DOMAIN_FUNCTIONS if f.__name__ == domain][0]
+        filename = f"{folder}/{domainIds[0]}-{domain}-{i}.pddl"
+        writeDomain(filename, domainFunction(i))
+        print(f"Generating {domain} domain for input i = {i} ... done ... and saved as file \"{filename}\"")
+
+    elif domain == "generalized":
+        (num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end) = args
+        path_length = length_plans_success
+        domain_name = f"{domainIds[0]}-generalized-{num_plans_success}-{length_plans_success}-{num_plans_dead_end}-{length_plans_dead_end}-{path_length}"
+        print(f"Generating {domain_name} domain ... ")
+
+        filename = f"{folder}/{domain_name}.pddl"
+        writeDomain(filename, generalized(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end))
+        print(f"and saved as file \"{filename}\"")
+
+    elif domain == "barabasiAlbertLongestShortestPath":
+        (n, m) = args
+        (test_case_name, test_case) = barabasiAlbertLongestShortestPath(n, m, domainId=domainIds[0])
+        print(f"Generating {test_case_name} domain ... ")
+
+        filename = f"{folder}/{test_case_name}.pddl"
+        writeDomain(filename, test_case)
+        print(f"and saved as file \"{filename}\"")
+
+    elif domain == "barabasiAlbertDegree":
+        (n, m) = args
+        for (test_case_name, test_case) in barabasiAlbertDegree(n, m, domainIds=domainIds):
+            print(f"Generating {test_case_name} domain ... ")
+
+            filename = f"{folder}/{test_case_name}.pddl"
+            writeDomain(filename, test_case)
+            print(f"and saved as file \"{filename}\"")
+
+
+def generateStandardDomains(folder, start, limit, step, domain, processes=1):
     """
     Generates domains for the specified domain name using the provided domain function following the range for the i value.
     Start and limit specify the upper and lower bound of the argument i for the to be generated domains, step the increment at each step.
@@ -360,32 +709,12 @@ def generateStandardDomains(folder, start, limit, step, domain):
     :param limit: limit of argument i
     :param step: step increment of argument i
     :param domain: domain type to be created ("singlePath", "multiplePaths", or "multiplePathsDeadEnds")
+    :param processes: number of worker processes generating the domains (see DomainPlanner)
     """
 
-    from pathlib import Path
-    Path(folder).mkdir(parents=True, exist_ok=True)
-
-    if limit >= 1000:
-        print("The limit is only supported up to a value of 999.")
-        return
-    domainFunctions = [singlePath, multiplePaths, multiplePathsDeadEnds]
-    
-    if domain not in [f.__name__ for f in domainFunctions]:
-        print(f"The provided domain \"{domain}\" does not have a corresponding domain function.")
-        return
-    domainFunction = [f for f in domainFunctions if f.__name__ == domain][0]
-
-    for i in range(start, limit+1, step):
-        print(f"Generating {domain} domain for input i = {i} ... ", end="")
-        domainString = domainFunction(i)
-        print(f"done ... ", end="")
-
-        filename = f"{folder}/{generate_domain_id()}-{domain}-{i}.pddl"
-        with open(filename, "w") as f:
-            f.write(domainString)
-            f.close()
-        print(f"and saved as file \"{filename}\"", end="")
-        print("")
+    planner = DomainPlanner(folder)
+    planner.standardDomains(start, limit, step, domain)
+    planner.run(processes)
 
 
 def generateGeneralizedDomain(folder, num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end):
@@ -398,23 +727,9 @@ def generateGeneralizedDomain(folder, num_plans_success, length_plans_success, n
     :param length_plans_dead_end: length of the plans leading to a dead end
     """
 
-    from pathlib import Path
-    Path(folder).mkdir(parents=True, exist_ok=True)
-
-    path_length = length_plans_success
-
-    domain_name = f"{generate_domain_id()}-generalized-{num_plans_success}-{length_plans_success}-{num_plans_dead_end}-{length_plans_dead_end}-{path_length}"
-
-    print(f"Generating {domain_name} domain ... ")
-
-    domain = generalized(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end)
-
-    filename = f"{folder}/{domain_name}.pddl"
-    with open(filename, "w") as f:
-        f.write(domain)
-        f.close()
-    print(f"and saved as file \"{filename}\"", end="")
-    print("")
+    planner = DomainPlanner(folder)
+    planner.generalizedDomain(num_plans_success, length_plans_success, num_plans_dead_end, length_plans_dead_end)
+    planner.run()
 
 
 def generateBarabasiAlbertDomains(folder, n, m, domain):
@@ -427,34 +742,9 @@ def generateBarabasiAlbertDomains(folder, n, m, domain):
     :param domain: domain type to be created ("barabasiAlbertLongestShortestPath" or "barabasiAlbertDegree")
     """
 
-    from pathlib import Path
-    Path(folder).mkdir(parents=True, exist_ok=True)
-
-    if domain == "barabasiAlbertLongestShortestPath":
-         # generate a barabasiAlbertLongestShortestPath domain
-
-        (test_case_name, test_case) = barabasiAlbertLongestShortestPath(n, m)
-        print(f"Generating {test_case_name} domain ... ")
-
-        filename = f"{folder}/{test_case_name}.pddl"
-        with open(filename, "w") as f:
-            f.write(test_case)
-            f.close()
-        print(f"and saved as file \"{filename}\"", end="")
-        print("")
-
-    if domain == "barabasiAlbertDegree":
-         # generate barabasiAlbertDegree domains (multiple test cases per domain, currently 2)
-
-        for (test_case_name, test_case) in barabasiAlbertDegree(n, m):
-            print(f"Generating {test_case_name} domain ... ")
-
-            filename = f"{folder}/{test_case_name}.pddl"
-            with open(filename, "w") as f:
-                f.write(test_case)
-                f.close()
-            print(f"and saved as file \"{filename}\"", end="")
-            print("")
+    planner = DomainPlanner(folder)
+    planner.barabasiAlbertDomains(n, m, domain)
+    planner.run()
 
     
 if __name__ == "__main__":
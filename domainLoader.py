@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import time
+
+from domainCompiler import CompiledDomain
+
+SUPPORTED_REQUIREMENTS = [":strips", ":negative-preconditions"]
+
+_TOKEN = re.compile(r"[()]|[^\s()]+")
+
+
+def tokenize(f):
+    """
+    Streaming tokenizer for PDDL files: yields the (lower case) tokens of the given file handle line by line,
+    such that the file is never held in memory as a whole. Comments (starting with ";") are dropped.
+
+    :param f: file handle opened in text mode
+    :return: a generator, which yields the tokens of the file
+    """
+    for line in f:
+        comment = line.find(";")
+        if comment != -1:
+            line = line[:comment]
+        yield from _TOKEN.findall(line.lower())
+
+
+def _expect(tokens, expected):
+    token = next(tokens, None)
+    if token != expected:
+        raise ValueError(f"Expected \"{expected}\" but found \"{token}\"")
+
+
+def _skipGroup(tokens):
+    """Skips the remainder of a group whose opening parenthesis has already been consumed."""
+    depth = 1
+    for token in tokens:
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                return
+    raise ValueError("Missing close parentheses")
+
+
+def _parseAtom(tokens, name):
+    """Parses an atom whose opening parenthesis and predicate name have already been consumed."""
+    atom = [name]
+    for token in tokens:
+        if token == ")":
+            return tuple(atom)
+        if token == "(":
+            raise ValueError(f"Unexpected nested expression in atom \"{name}\"")
+        atom.append(token)
+    raise ValueError("Missing close parentheses")
+
+
+def _parseLiteral(tokens, first, positive, negative):
+    """Parses a literal whose opening parenthesis and first token have already been consumed."""
+    if first == "not":
+        _expect(tokens, "(")
+        negative.add(_parseAtom(tokens, next(tokens)))
+        _expect(tokens, ")")
+    else:
+        positive.add(_parseAtom(tokens, first))
+
+
+def _parseLiterals(tokens, positive, negative):
+    """Parses a single literal or a conjunction of literals into the given positive and negative sets."""
+    _expect(tokens, "(")
+    first = next(tokens)
+    if first == ")":
+        return
+    if first != "and":
+        _parseLiteral(tokens, first, positive, negative)
+        return
+    for token in tokens:
+        if token == ")":
+            return
+        if token != "(":
+            raise ValueError(f"Expected \"(\" but found \"{token}\"")
+        _parseLiteral(tokens, next(tokens), positive, negative)
+    raise ValueError("Missing close parentheses")
+
+
+def loadDomain(domainPathStr):
+    """
+    Loads a PDDL domain of the STRIPS subset emitted by domainGenerator.py (":strips", ":negative-preconditions")
+    and directly builds its compiled representation. The resulting domain is identical to the one obtained by
+    domainCompiler.compileDomain from the actions parsed by PDDL_Parser.parse_domain, except that no action
+    objects are kept (see CompiledDomain.action).
+
+    :param domainPathStr: Path to the PDDL domain file
+    :return: the compiled domain
+    """
+    fluents = []
+    fluentIndex = {}
+
+    def mask(fluentSet):
+        m = 0
+        for fluent in sorted(fluentSet):
+            if fluent not in fluentIndex:
+                fluentIndex[fluent] = len(fluents)
+                fluents.append(fluent)
+            m |= 1 << fluentIndex[fluent]
+        return m
+
+    actionNames = []
+    knownActionNames = set()
+    preMasks = []
+    addMasks = []
+    delMasks = []
+
+    with open(domainPathStr) as f:
+        tokens = tokenize(f)
+        _expect(tokens, "(")
+        _expect(tokens, "define")
+
+        for token in tokens:
+            if token == ")":
+                break
+            if token != "(":
+                raise ValueError(f"Expected \"(\" but found \"{token}\"")
+
+            section = next(tokens)
+            if section == "domain":
+                next(tokens)
+                _expect(tokens, ")")
+
+            elif section == ":requirements":
+                for requirement in tokens:
+                    if requirement == ")":
+                        break
+                    if requirement not in SUPPORTED_REQUIREMENTS:
+                        raise ValueError(f"Requirement {requirement} not supported")
+
+            elif section == ":predicates":
+                _skipGroup(tokens)
+
+            elif section == ":action":
+                name = next(tokens)
+                if name in knownActionNames:
+                    raise ValueError(f"Action {name} redefined")
+                knownActionNames.add(name)
+
+                pre, negativePre, add, dele = set(), set(), set(), set()
+                for keyword in tokens:
+                    if keyword == ")":
+                        break
+                    if keyword == ":parameters":
+                        _expect(tokens, "(")
+                        _skipGroup(tokens)
+                    elif keyword == ":precondition":
+                        _parseLiterals(tokens, pre, negativePre)
+                    elif keyword == ":effect":
+                        _parseLiterals(tokens, add, dele)
+                    else:
+                        raise ValueError(f"{keyword} is not supported in action {name}")
+
+                actionNames.append(name)
+                preMasks.append(mask(pre))
+                addMasks.append(mask(add))
+                delMasks.append(mask(dele))
+
+            else:
+                raise ValueError(f"{section} is not supported in domain {domainPathStr}")
+        else:
+            raise ValueError("Missing close parentheses")
+
+    return CompiledDomain(fluents, actionNames, preMasks, addMasks, delMasks)
+
+
+def _importPDDLParser():
+    sys.path.append("../tools/")
+    from PDDL import PDDL_Parser
+    return PDDL_Parser
+
+
+def _loadWithPDDLParser(domainPathStr, compiled):
+    PDDL_Parser = _importPDDLParser()
+    parser = PDDL_Parser()
+    parser.parse_domain(domainPathStr)
+    if compiled:
+        from domainCompiler import compileDomain
+        compileDomain(parser.actions)
+
+
+_LOADERS = {
+    "none": lambda domainPathStr: None,
+    "PDDL_Parser": lambda domainPathStr: _loadWithPDDLParser(domainPathStr, False),
+    "PDDL_Parser+compileDomain": lambda domainPathStr: _loadWithPDDLParser(domainPathStr, True),
+    "loadDomain": loadDomain,
+}
+
+
+def _measure(loaderName, domainPathStr):
+    """Runs the given loader in a forked child and returns its load time (seconds) and peak RSS (kbytes)."""
+    readFd, writeFd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(readFd)
+            # import outside of the measured time span, as loadDomain does not need an import at all
+            if loaderName.startswith("PDDL_Parser"):
+                _importPDDLParser()
+            start = time.perf_counter()
+            _LOADERS[loaderName](domainPathStr)
+            elapsed = time.perf_counter() - start
+            os.write(writeFd, str(elapsed).encode())
+        except Exception as e:
+            print(e)
+        finally:
+            os._exit(0)
+
+    os.close(writeFd)
+    with os.fdopen(readFd) as r:
+        output = r.read()
+    _, status, rusage = os.wait4(pid, 0)
+    if status != 0 or not output:
+        raise RuntimeError(f"Loader {loaderName} failed on {domainPathStr}")
+    return (float(output), rusage.ru_maxrss)
+
+
+def benchmark(domainPathStr, repetitions=3):
+    """
+    Compares load time and peak RSS of loadDomain with PDDL_Parser.parse_domain (with and without the subsequent
+    compilation). Every measurement runs in a freshly forked child; the "none" loader measures the baseline
+    RSS of such a child, which has to be subtracted to obtain the memory required for loading.
+
+    :param domainPathStr: Path to the PDDL domain file
+    :param repetitions: number of measurements per loader, the best one is reported
+    """
+    for loaderName in _LOADERS:
+        measurements = [_measure(loaderName, domainPathStr) for _ in range(repetitions)]
+        loadTime = min(m[0] for m in measurements)
+        setSize = min(m[1] for m in measurements)
+        print(f"{loaderName:<28} Time: {loadTime:.4f} sec., Memory: {setSize/1024:.2f} MB.")
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 
+import aspBackend
 import benchmark
 from pathlib import Path
 import datetime
+import os
 import time
 import domainGenerator
 import numpy as np
+import resultStore
+import scheduler
 
 
 def domainTypeFromDomainFileName(filename):
@@ -41,133 +45,229 @@ def horizonFromDomainFileName(filename):
         return int(filename.split("-")[-1].split(".")[0]) + 1
     
 
-if __name__ == "__main__":
+def horizonFromApproach(path, approach):
+    # we do not want to give our approaches an edge by aborting early
+    # only asp and qasp should know the horizon
+    if approach == "asp_simple" or approach == "asp_general" or approach == "qasp":
+        return horizonFromDomainFileName(path)
+    else:
+        return -1
 
-    # specify the used approach
-    approaches = [
-        "dfs",
-        "bfs",
-        "asp_simple",
-        "asp_general",
-        "qasp"
-    ]
 
-    # specify domains of which types are created and evaluated
-    domain_types = [
-        "singlePath",
-        "multiplePaths",
-        "multiplePathsDeadEnds",
-        "generalized",
-        "barabasiAlbertLongestShortestPath"
-    ]
+def runExperiment(path, approach, timeout, inProcess, closedList="exact", memoryLimit=-1, preprocess=False,
+                  clingoApiAsp=False, processMemoryLimit=-1):
+    """
+    Runs the benchmark of a single approach on a single domain.
 
-    domains_folder = "domains"
+    :return: the horizon, the runtime in seconds, the maximum resident set size in MB (runtime -1 on timeouts
+        and if the memory budget of the search is exhausted), and the search statistics (see resultStore.STATS_COLUMNS,
+        only available for the search strategies measured in process, and the translation time of the ASP approaches)
+    """
+    print(f"***************** Processing {path} using {approach} approach *****************\n")
+
+    horizon = horizonFromApproach(path, approach)
+
+    print(f"Horizon = {horizon}\n")
+    stats = {}
+    if inProcess and approach in benchmark.STRATEGIES:
+        result = benchmark.benchmarkInProcess(
+            approach, path, "del-all", horizon, timeout, closedList=closedList, memoryLimit=memoryLimit,
+            preprocess=preprocess
+        )
+        wall_clock = result["runtime"] if result["status"] == "success" else -1
+        set_size = result["setSize"]
+        if result["status"] in ("success", "budgetExhausted"):
+            stats = {field: result[field] for field in resultStore.STATS_COLUMNS if field in result}
+    elif clingoApiAsp and approach in aspBackend.ENCODINGS and aspBackend.available():
+        # a single horizon, as with the clingo binary
+        result = benchmark.benchmarkClingoApi(approach, path, horizon, timeout, minHorizon=horizon)
+        wall_clock = result["runtime"] if result["status"] == "success" else -1
+        set_size = result["setSize"]
+        if result["status"] == "success":
+            stats = {field: result[field] for field in ("translateTime", "groundTime", "solveTime")}
+    else:
+        (domain_path, approach, reversible_action_name, horizon, timeout_limit, wall_clock, set_size, translate_time) = benchmark.benchmark(
+            approach, path, "del-all", horizon, timeout, inProcess=inProcess, closedList=closedList, memoryLimit=memoryLimit,
+            preprocess=preprocess, processMemoryLimit=processMemoryLimit
+        )
+        if translate_time is not None:
+            stats = {"translateTime": translate_time}
+
+    if type(wall_clock) == str:
+        strptime = datetime.datetime.strptime(wall_clock, r'%M:%S.%f')
+        csv_runtime = (strptime.minute * 60) + strptime.second + \
+            (strptime.microsecond / 1000000)
+    elif type(wall_clock) == float:
+        csv_runtime = wall_clock
+    else:
+        csv_runtime = -1
+    csv_set_size = int(set_size) / 1024
 
+    return (horizon, csv_runtime, csv_set_size, stats)
+
+
+def generateDomains(domains_folder, domain_types, processes=1):
+    """
+    Removes all files from the domains folder and generates the domains of the given types.
+    The domains are generated by a pool of processes, but named as if they were generated one after another
+    (see domainGenerator.DomainPlanner).
+    """
     [f.unlink() for f in Path(domains_folder).glob("*") if f.is_file()]
 
+    planner = domainGenerator.DomainPlanner(domains_folder)
+
     ##### Generate singlePath domains
     if "singlePath" in domain_types:
-        domainGenerator.generateStandardDomains(domains_folder, 10, 500, 10, "singlePath")
+        planner.standardDomains(10, 500, 10, "singlePath")
 
     ##### Generate multiplePaths domains
     if "multiplePaths" in domain_types:
-        domainGenerator.generateStandardDomains(domains_folder, 1, 50, 1, "multiplePaths")
+        planner.standardDomains(1, 50, 1, "multiplePaths")
 
     ##### Generate multiplePathsDeadEnds domains
     if "multiplePathsDeadEnds" in domain_types:    
-        domainGenerator.generateStandardDomains(domains_folder, 1, 50, 1, "multiplePathsDeadEnds")
+        planner.standardDomains(1, 50, 1, "multiplePathsDeadEnds")
 
     ##### Generate generalized domains
     if "generalized" in domain_types:
 
-        domainGenerator.generateGeneralizedDomain(domains_folder, 1,  4,  20, 4)
-        domainGenerator.generateGeneralizedDomain(domains_folder, 6,  10,  4, 10)
-        domainGenerator.generateGeneralizedDomain(domains_folder, 10,  4,  2, 2)
+        planner.generalizedDomain(1,  4,  20, 4)
+        planner.generalizedDomain(6,  10,  4, 10)
+        planner.generalizedDomain(10,  4,  2, 2)
 
         step_range = np.arange(5.0, 100.1, 5.0)
         for factor in step_range:
             # Scenario 1
-            domainGenerator.generateGeneralizedDomain(domains_folder, 1,  4,  int(20*factor), 4)
+            planner.generalizedDomain(1,  4,  int(20*factor), 4)
             # Scenario 2
-            domainGenerator.generateGeneralizedDomain(domains_folder, int(6*factor),  10,  int(4*factor), 10)
+            planner.generalizedDomain(int(6*factor),  10,  int(4*factor), 10)
             # Scenario 3
-            domainGenerator.generateGeneralizedDomain(domains_folder, 10,  4,  int(2*factor), int(2*factor))
+            planner.generalizedDomain(10,  4,  int(2*factor), int(2*factor))
 
     ##### Generate barabasiAlbertLongestShortestPath domains
     if "barabasiAlbertLongestShortestPath" in domain_types:
         for n in range(2000, 6001, 200):
             # m = 1
-            domainGenerator.generateBarabasiAlbertDomains(domains_folder, n, 1, "barabasiAlbertLongestShortestPath")
+            planner.barabasiAlbertDomains(n, 1, "barabasiAlbertLongestShortestPath")
             # m = 5
-            domainGenerator.generateBarabasiAlbertDomains(domains_folder, n, 5, "barabasiAlbertLongestShortestPath")
+            planner.barabasiAlbertDomains(n, 5, "barabasiAlbertLongestShortestPath")
             # m = n-1
-            domainGenerator.generateBarabasiAlbertDomains(domains_folder, n, n-1, "barabasiAlbertLongestShortestPath")
+            planner.barabasiAlbertDomains(n, n-1, "barabasiAlbertLongestShortestPath")
 
-    timestamp = time.time()
+    planner.run(processes)
+
+
+if __name__ == "__main__":
 
-    #### Generate experiment csv files and write domain_type specific headers
-    Path("./experiments/").mkdir(parents=True, exist_ok=True)
+    # specify the used approach
+    approaches = [
+        "dfs",
+        "bfs",
+        "gbfs",
+        "astar",
+        "bidirectional",
+        "asp_simple",
+        "asp_general",
+        "qasp"
+    ]
+
+    # specify domains of which types are created and evaluated
+    domain_types = [
+        "singlePath",
+        "multiplePaths",
+        "multiplePathsDeadEnds",
+        "generalized",
+        "barabasiAlbertLongestShortestPath"
+    ]
 
-    for approach in approaches:
-        if "barabasiAlbertLongestShortestPath" in domain_types:
-            domain_types.remove("barabasiAlbertLongestShortestPath")
-            domain_types.append("barabasiAlbertLongestShortestPath-1")
-            domain_types.append("barabasiAlbertLongestShortestPath-5")
-            domain_types.append("barabasiAlbertLongestShortestPath-max")
-        for domain_type in domain_types:
-            with open(f"./experiments/{domain_type}-{approach}-{timestamp}.csv", "a+") as f:
-                if domain_type == "singlePath" or domain_type == "multiplePaths" or domain_type == "multiplePathsDeadEnds":
-                    f.write("approach,domain_type,horizon,i,path,runtime_seconds,set_size_mb\n")
+    domains_folder = "domains"
+    # number of processes generating the domains in parallel (the names of the domains do not depend on it)
+    generation_processes = os.cpu_count()
 
-                elif domain_type == "generalized":
-                    f.write("approach,domain_type,horizon,num_plans_success,length_plans_success,length_plans_dead_end,num_plans_dead_end,domain_size,path,runtime_seconds,set_size_mb\n")
+    # results are kept in a SQLite store (see resultStore.py), such that an interrupted run can be resumed:
+    # already generated domains are reused and experiments whose results are already stored are not run again
+    resume = True
+    store = resultStore.ResultStore()
 
-                elif "barabasiAlbertLongestShortestPath" in domain_type or domain_type == "barabasiAlbertDegree":
-                    f.write("approach,domain_type,horizon,m,n,node_a,node_b,domain_size,path,runtime_seconds,set_size_mb\n")
+    existing_domains = sorted(Path(domains_folder).glob("*.pddl"))
+    if resume and store.knowsDomains(existing_domains):
+        print(f"Reusing {len(existing_domains)} previously generated domains")
+    else:
+        generateDomains(domains_folder, domain_types, generation_processes)
+        store.registerDomains(sorted(Path(domains_folder).glob("*.pddl")), domainTypeFromDomainFileName)
+
+    timestamp = time.time()
 
     #### Run experiments
     timeout = 120
-    pathlist = Path(f"./{domains_folder}/").glob(f'*.pddl')
+    # measure the search strategies (dfs, bfs, gbfs, astar, bidirectional) in a forked child instead of a new interpreter (see benchmark.benchmarkInProcess)
+    inProcess = True
+    # number of experiments that are run in parallel, whether each of them is pinned to a dedicated CPU,
+    # and the grace period after the timeout until an experiment is killed together with all its child processes
+    concurrency = 1
+    pinCpus = False
+    killGracePeriod = 30
+    # closed list and memory limit (MB, -1 for no limit) of the search strategies, see reversible.search; e.g. use
+    # "fingerprint" with a memory limit below the RAM of the worker to record an exhausted budget instead of an OOM kill
+    closedList = "exact"
+    memoryLimit = -1
+    # remove irrelevant and unreachable actions before the search strategies start (see reversible.preprocessActions),
+    # which drops reverse plans containing the removed actions
+    preprocess = False
+    # measure asp_simple and asp_general with the clingo Python API instead of the clingo binary, if it is installed,
+    # which reports ground and solve time separately (see benchmark.benchmarkClingoApi)
+    clingoApiAsp = False
+    # address space limit (MB, -1 for no limit) of the measured clingo, qasp and reversible.py processes, such that a
+    # runaway process fails on its own instead of pushing the machine into swap (see processRunner.runProcess)
+    processMemoryLimit = -1
 
-    for path in pathlist:
-        path = str(path)
+    # stored results are only reused by runs with the same settings
+    settings = {"inProcess": inProcess, "closedList": closedList, "memoryLimit": memoryLimit, "preprocess": preprocess,
+                "clingoApiAsp": clingoApiAsp, "processMemoryLimit": processMemoryLimit}
 
+    pathlist = sorted(str(path) for path in Path(f"./{domains_folder}/").glob(f'*.pddl'))
+
+    jobs = []
+    for path in pathlist:
         for approach in approaches:
             domain_type = domainTypeFromDomainFileName(path)
-            result_file_path = f"./experiments/{domain_type}-{approach}-{timestamp}.csv"
-
             # skip domain if run on previous domain already timed out
             # Attention: use only for singlePath, multiplePath, multiplePathsDeadEnds, and generalized as only these will definitely become more difficult
-            if domain_type == "singlePath" or domain_type == "multiplePaths" or domain_type == "multiplePathsDeadEnds":
-                with open(result_file_path) as f:
-                    # find out whether there was timeout
-                    if "-1" in f.readlines()[-1].split(",")[-2]:
-                        print("Skipped a domain due to previous timeout!")
-                        continue
-
-            print(f"***************** Processing {path} using {approach} approach *****************\n")
-
-            # we do not want to give our approaches an edge by aborting early
-            # only asp and qasp should know the horizon
-            if approach == "asp_simple" or approach == "asp_general" or approach == "qasp":
-                horizon = horizonFromDomainFileName(path)
-            else:
-                horizon = -1
-
-            print(f"Horizon = {horizon}\n")
-            (domain_path, approach, reversible_action_name, horizon, timeout_limit, wall_clock, set_size) = benchmark.benchmark(
-                approach, path, "del-all", horizon, timeout
-            )
-
-            if type(wall_clock) == str:
-                strptime = datetime.datetime.strptime(wall_clock, r'%M:%S.%f')
-                csv_runtime = (strptime.minute * 60) + strptime.second + \
-                    (strptime.microsecond / 1000000)
-            else:
-                csv_runtime = -1
-            csv_set_size = int(set_size) / 1024
-            csv_generator_arguments = ",".join(path.split(".pddl")[0].split("-")[2:])
-
-            # append results
-            with open(result_file_path, "a+") as f:
-                f.write(f"{approach},{domain_type},{horizon},{csv_generator_arguments},{path},{csv_runtime},{csv_set_size}\n")
+            stopSeriesOnFailure = domain_type == "singlePath" or domain_type == "multiplePaths" or domain_type == "multiplePathsDeadEnds"
+            horizon = horizonFromApproach(path, approach)
+            stored = store.result(path, approach, horizon, timeout, settings) if resume else None
+            cachedResult = None if stored is None else (horizon, stored[1], stored[2], stored[3])
+            jobs.append(scheduler.Job((path, approach, timeout, inProcess, closedList, memoryLimit, preprocess, clingoApiAsp, processMemoryLimit), (domain_type, approach), stopSeriesOnFailure, cachedResult))
+
+    results = scheduler.runJobs(
+        jobs,
+        runExperiment,
+        lambda result: result[1] == -1,
+        concurrency=concurrency,
+        hardTimeout=timeout + killGracePeriod,
+        pinCpus=pinCpus
+    )
+    for job, status, result in results:
+        (path, approach) = job.args[:2]
+        domain_type = domainTypeFromDomainFileName(path)
+
+        if status == "skipped":
+            print(f"Skipped {path} using {approach} approach due to previous timeout!")
+            continue
+        if status == "cached":
+            print(f"Reusing stored result of {path} using {approach} approach")
+            continue
+        if status == "done":
+            (horizon, csv_runtime, csv_set_size, stats) = result
+        else:
+            print(f"Processing {path} using {approach} approach failed ({status}): {result}")
+            (horizon, csv_runtime, csv_set_size, stats) = (horizonFromApproach(path, approach), -1, -1 / 1024, {})
+
+        store.addResult(path, approach, horizon, timeout, domain_type, status, csv_runtime, csv_set_size, stats,
+                        settings)
+
+    #### Export experiment csv files, one per domain type and approach
+    # (can also be done on demand while the experiments are still running: python3 ./resultStore.py exportCsv)
+    for filename in store.exportCsv("./experiments", timestamp, settings):
+        print(f"Results written to {filename}")
+    store.close()
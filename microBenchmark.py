@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import tracemalloc
+
+import numpy as np
+
+import domainGenerator
+from reversible import SEARCH_PHASES, SearchStats, search
+
+# domain families with the function building the compiled domain of a size and the default sizes
+FAMILIES = {
+    "singlePath": (domainGenerator.singlePathModel, (25, 50, 100, 200, 400, 800)),
+    "multiplePaths": (domainGenerator.multiplePathsModel, (4, 6, 8, 10, 12)),
+    "multiplePathsDeadEnds": (domainGenerator.multiplePathsDeadEndsModel, (4, 6, 8, 10, 12)),
+    # scenario 1 of the experiments: one plan to the goal and a growing number of dead ends
+    "generalized": (lambda size: domainGenerator.generalizedModel(1, 4, size, 4), (25, 50, 100, 200, 400, 800)),
+    "barabasiAlbertLongestShortestPath": (
+        lambda size: domainGenerator.barabasiAlbertLongestShortestPathModel(size, 1)[1], (250, 500, 1000, 2000, 4000)),
+    "barabasiAlbertDegree": (
+        lambda size: next(domainGenerator.barabasiAlbertDegreeModels(size, 1))[1], (125, 250, 500, 1000)),
+}
+
+# local scaling exponent above which the growth is no longer considered linear
+NONLINEAR_EXPONENT = 1.25
+
+
+def measure(domain, strategy="bfs", repetitions=3, reversibleActionName="del-all"):
+    """
+    Measures the search for a reverse plan of an action in a compiled domain: the time of reversible.search and the
+    time of its phases (see reversible.SEARCH_PHASES), timed by the search itself in a separate run, both as minimum
+    over the repetitions, and the peak of the memory allocated during the search (traced by tracemalloc in a
+    further run).
+
+    :return: a dict with the fields actions, fluents, searchTime, expanded, generated, peakAllocated (bytes), and
+        the time of every phase (see reversible.SEARCH_PHASES)
+    """
+    actionIndex = domain.actionIndex(reversibleActionName)
+    result = {"actions": len(domain.actionNames), "fluents": len(domain.fluents), "searchTime": math.inf}
+    result.update({phase: math.inf for phase in SEARCH_PHASES})
+    for _ in range(repetitions):
+        stats = SearchStats()
+        next(search(domain, actionIndex, strategy, stats=stats), None)
+        result["searchTime"] = min(result["searchTime"], stats.searchTime)
+        result["expanded"] = stats.expanded
+        result["generated"] = stats.generated
+
+        # the timing of the phases slows the search down, hence the search time is measured without it
+        stats = SearchStats()
+        next(search(domain, actionIndex, strategy, stats=stats, timePhases=True), None)
+        for phase in SEARCH_PHASES:
+            result[phase] = min(result[phase], stats.phaseTimes[phase])
+
+    tracemalloc.start()
+    next(search(domain, actionIndex, strategy), None)
+    result["peakAllocated"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def scaling(sizes, values):
+    """
+    Fits values ~ c * sizes^exponent by a least squares fit in log-log space.
+
+    :return: a tuple (exponent, nonlinearFrom), where nonlinearFrom is the first size at which the exponent between
+        two consecutive sizes exceeds NONLINEAR_EXPONENT (None if the growth stays linear)
+    """
+    points = [(size, value) for size, value in zip(sizes, values) if size > 0 and value > 0]
+    if len(points) < 2:
+        return None, None
+    logSizes = np.log([size for size, _ in points])
+    logValues = np.log([value for _, value in points])
+    exponent = float(np.polyfit(logSizes, logValues, 1)[0])
+    nonlinearFrom = None
+    for i in range(1, len(points)):
+        if (logValues[i] - logValues[i - 1]) / (logSizes[i] - logSizes[i - 1]) > NONLINEAR_EXPONENT:
+            nonlinearFrom = points[i][0]
+            break
+    return exponent, nonlinearFrom
+
+
+def _plot(results, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figure, axes = plt.subplots(1, len(results), figsize=(5 * len(results), 4), squeeze=False)
+    for ax, (family, familyResults) in zip(axes[0], results.items()):
+        sizes = [measurement["actions"] for measurement in familyResults["measurements"]]
+        for metric in ["searchTime"] + SEARCH_PHASES:
+            ax.loglog(sizes, [measurement[metric] for measurement in familyResults["measurements"]], marker="o",
+                      label=metric)
+        ax.set_title(family)
+        ax.set_xlabel("number of actions")
+        ax.set_ylabel("seconds")
+        ax.legend(fontsize="small")
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def run(families=tuple(FAMILIES), strategy="bfs", repetitions=3, sizes=None, output=None, plot=None):
+    """
+    Runs the micro-benchmarks of the search hot path in process: for every domain family and size, the compiled
+    domain is generated in memory and measured (see measure). Afterwards, the growth of the search time, of every
+    phase, and of the peak allocations with the number of actions is fitted (see scaling).
+
+    :param families: domain families (see FAMILIES)
+    :param strategy: "dfs" or "bfs"
+    :param repetitions: number of repetitions, of which the fastest is reported
+    :param sizes: sizes of the domains (the argument of the generator), by default the sizes of FAMILIES
+    :param output: path of a JSON file the results are written to
+    :param plot: path of an image the scaling curves are plotted to (requires matplotlib)
+    :return: a dict mapping every family to its measurements and fitted exponents
+    """
+    if isinstance(families, str):
+        families = families.split(",")
+    if strategy not in ["dfs", "bfs"]:
+        raise ValueError(f"The micro-benchmarks only support the strategies dfs and bfs, not \"{strategy}\"")
+
+    results = {}
+    for family in families:
+        (modelFunction, defaultSizes) = FAMILIES[family]
+        measurements = []
+        for size in (defaultSizes if sizes is None else sizes):
+            measurement = measure(modelFunction(size), strategy, repetitions)
+            measurement["size"] = size
+            measurements.append(measurement)
+            print(f"{family:<36}{size:>7}{measurement['actions']:>8} actions{measurement['expanded']:>9} expanded "
+                  f"{measurement['searchTime']:>10.6f} sec. (" +
+                  ", ".join(f"{phase}: {measurement[phase]:.6f}" for phase in SEARCH_PHASES) +
+                  f"), peak {measurement['peakAllocated'] / 1024:.0f} KB", flush=True)
+
+        actions = [measurement["actions"] for measurement in measurements]
+        fits = {}
+        for metric in ["searchTime", "peakAllocated"] + SEARCH_PHASES:
+            (exponent, nonlinearFrom) = scaling(actions, [measurement[metric] for measurement in measurements])
+            fits[metric] = {"exponent": exponent, "nonlinearFrom": nonlinearFrom}
+        results[family] = {"measurements": measurements, "fits": fits}
+
+        print(f"{family}: " + ", ".join(
+            f"{metric} ~ actions^{fit['exponent']:.2f}" +
+            (f" (superlinear from {fit['nonlinearFrom']} actions)" if fit["nonlinearFrom"] is not None else "")
+            for metric, fit in fits.items() if fit["exponent"] is not None))
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {output}")
+    if plot is not None:
+        _plot(results, plot)
+        print(f"Scaling curves plotted to {plot}")
+    return results
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import json
+import re
+import time
+
+import benchmark
+import processRunner
+import scheduler
+from domainCache import DEFAULT_CACHE_DIR, loadCachedDomain
+from reversible import STRATEGIES, SearchStats, search
+
+DEFAULT_APPROACHES = ("dfs", "bfs", "asp_simple", "asp_general", "qasp")
+
+
+def _satisfiable(output):
+    return re.search(r"^SATISFIABLE", output, re.MULTILINE) is not None
+
+
+def _runApproach(approach, domainPath, reversibleActionName, horizon, timeoutLimit, domain, closedList, memoryLimit,
+                 preprocess, start):
+    if approach in STRATEGIES:
+        stats = SearchStats()
+        state = next(search(domain, domain.actionIndex(reversibleActionName), approach, maxPathLimit=horizon,
+                            stats=stats, closedList=closedList, memoryLimit=memoryLimit, preprocess=preprocess), None)
+        reversible = state is not None
+        # a search that ends without a reverse plan only proves that the action is not reversible if it has neither
+        # been limited by a horizon or the memory budget nor used a compact closed list, which may prune unexplored
+        # states (preprocessing preserves whether the action is reversible)
+        definitive = reversible or (horizon == -1 and closedList == "exact" and not stats.budgetExhausted)
+        planLength = -1 if state is None else state.depth
+    else:
+        (command, successCodes, memoryCodes, _) = benchmark.processCommand(approach, domainPath, reversibleActionName,
+                                                                            horizon)
+        result = processRunner.runProcess(command, max(0, start + timeoutLimit - time.perf_counter()),
+                                          successCodes=successCodes, memoryCodes=memoryCodes)
+        # the ASP approaches only decide whether there is a reverse plan up to the horizon, hence only a satisfiable
+        # result is definitive
+        reversible = result.status == "success" and _satisfiable(result.output)
+        definitive = reversible
+        planLength = -1
+
+    return {
+        "reversible": reversible,
+        "definitive": definitive,
+        "planLength": planLength,
+        "runtime": time.perf_counter() - start
+    }
+
+
+def portfolio(domainPath, reversibleActionName, approaches=DEFAULT_APPROACHES, horizon=-1, timeoutLimit=120,
+              cacheDir=DEFAULT_CACHE_DIR, closedList="exact", memoryLimit=-1, preprocess=False, killGracePeriod=5):
+    """
+    Races several approaches on the same domain and action in parallel processes and returns the first definitive
+    answer, i.e. a reverse plan or, for the search strategies without horizon and with an exact closed list, the
+    proof that there is none. All other approaches are killed as soon as it is found. As no single approach wins on
+    every domain family, this turns the variance between the approaches into lower latency.
+
+    The ASP approaches need a horizon and only answer whether there is a reverse plan up to the horizon, hence
+    they are left out if no horizon is given, and only their satisfiable results are definitive.
+
+    :param domainPath: Path to the PDDL domain file
+    :param reversibleActionName: name of the action to be reversed
+    :param approaches: search strategies of reversible.search and ASP approaches (asp_simple, asp_general, qasp)
+    :param horizon: maximal length of a reverse plan, -1 for no limit
+    :param timeoutLimit: timeout in seconds
+    :param cacheDir: folder of the compiled domain cache (see domainCache.loadCachedDomain), None to disable it
+    :param closedList: closed list of the search strategies (see reversible.search)
+    :param memoryLimit: memory limit of every search strategy in MB, -1 for no limit
+    :param preprocess: whether the search strategies remove irrelevant and unreachable actions first
+    :param killGracePeriod: seconds after the timeout until the approaches are killed together with their children
+    :return: a dict with the fields domainPath, reversibleActionName, winner (None if no approach answered
+        definitively), reversible (None if unknown), planLength (-1 if unknown or found by an ASP approach), runtime
+        (seconds until the answer or until the last approach finished), and approaches, which maps every approach
+        to its status ("won", "finished" without a definitive answer, "killed", "error", or "skipped") and runtime
+        (for killed approaches the time they ran until they were killed)
+    """
+    if isinstance(approaches, str):
+        approaches = approaches.split(",")
+    start = time.perf_counter()
+    result = {
+        "domainPath": domainPath,
+        "reversibleActionName": reversibleActionName,
+        "winner": None,
+        "reversible": None,
+        "planLength": -1,
+        "runtime": -1,
+        "approaches": {}
+    }
+
+    raced = []
+    for approach in approaches:
+        if approach not in STRATEGIES and approach not in benchmark.TRANSLATED_APPROACHES:
+            raise ValueError(f"The provided approach \"{approach}\" is not valid.")
+        if approach in benchmark.TRANSLATED_APPROACHES and horizon == -1:
+            print(f"Skipping {approach}, as it requires a horizon")
+            result["approaches"][approach] = {"status": "skipped", "runtime": -1}
+        else:
+            raced.append(approach)
+
+    # the domain is loaded once before the search strategies are forked
+    domain = None
+    if any(approach in STRATEGIES for approach in raced):
+        domain = loadCachedDomain(domainPath, cacheDir=cacheDir)
+        if domain.actionIndex(reversibleActionName) == -1:
+            raise ValueError(f"Could not find action \"{reversibleActionName}\" in domain {domainPath}")
+
+    jobs = [scheduler.Job((approach, domainPath, reversibleActionName, horizon, timeoutLimit, domain, closedList,
+                           memoryLimit, preprocess, start)) for approach in raced]
+    outcomes = scheduler.runJobs(jobs, _runApproach, lambda outcome: not outcome["definitive"],
+                                 concurrency=len(jobs), hardTimeout=timeoutLimit + killGracePeriod)
+    for job, status, outcome in outcomes:
+        approach = job.args[0]
+        runtime = time.perf_counter() - start
+        if status == "done" and outcome["definitive"]:
+            result.update({
+                "winner": approach,
+                "reversible": outcome["reversible"],
+                "planLength": outcome["planLength"],
+                "runtime": outcome["runtime"]
+            })
+            result["approaches"][approach] = {"status": "won", "runtime": outcome["runtime"]}
+            break
+        elif status == "done":
+            result["approaches"][approach] = {"status": "finished", "runtime": outcome["runtime"]}
+        else:
+            result["approaches"][approach] = {"status": "error" if status == "error" else "killed", "runtime": runtime}
+    # kills the approaches that are still running
+    outcomes.close()
+
+    killed = time.perf_counter() - start
+    for approach in raced:
+        result["approaches"].setdefault(approach, {"status": "killed", "runtime": killed})
+    if result["winner"] is None:
+        result["runtime"] = killed
+        print(f"No approach answered definitively within {result['runtime']:.6f} sec.")
+    else:
+        print(f"{result['winner']} won after {result['runtime']:.6f} sec.: the action is "
+              f"{'' if result['reversible'] else 'not '}reversible")
+        for approach, outcome in result["approaches"].items():
+            if outcome["status"] == "killed":
+                print(f"  {approach} was still running and killed after {outcome['runtime']:.6f} sec.")
+            elif outcome["status"] == "finished":
+                print(f"  {approach} finished without a definitive answer after {outcome['runtime']:.6f} sec.")
+    print(json.dumps(result))
+    return result
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire(portfolio)
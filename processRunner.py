@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import math
+import os
+import resource
+import select
+import signal
+import subprocess
+import tempfile
+import time
+
+from scheduler import killProcessTree
+
+# exit codes of clingo: 10 satisfiable, 20 unsatisfiable, 30 search space exhausted (added to 10 or 20), 33 memory
+# error; 0 means that the satisfiability is unknown
+CLINGO_SUCCESS_CODES = (0, 10, 20, 30)
+CLINGO_MEMORY_CODES = (33,)
+
+# markers in the output of processes that ran out of memory (Python, C++, and the JVM)
+MEMORY_ERROR_MARKERS = (b"MemoryError", b"std::bad_alloc", b"OutOfMemoryError", b"Cannot allocate memory")
+
+_MEMORY_SCAN_SIZE = 64 * 1024
+
+
+class RunResult:
+    """
+    Outcome of runProcess: status is one of "success", "timeout" (wall clock or CPU time limit), "memoryOut" and
+    "crash" (any other exit code or signal). Times are in seconds, maxRss is the peak RSS in kbytes.
+    """
+
+    def __init__(self, status, returncode, wallTime, userTime, systemTime, maxRss, output, outputPath):
+        self.status = status
+        self.returncode = returncode
+        self.wallTime = wallTime
+        self.userTime = userTime
+        self.systemTime = systemTime
+        self.maxRss = maxRss
+        # output of the process (stdout and stderr), None if it has been streamed to outputPath
+        self.output = output
+        self.outputPath = outputPath
+
+    def toDict(self):
+        return dict(self.__dict__)
+
+
+def _limitResources(memoryLimit, cpuTimeLimit):
+    # runs in the child between fork and exec: own process group, such that it can be killed with all its children
+    os.setsid()
+    if memoryLimit != -1:
+        limit = memoryLimit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpuTimeLimit != -1:
+        # SIGXCPU at the soft limit, SIGKILL one second later
+        limit = math.ceil(cpuTimeLimit)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+
+
+def _waitUntil(pid, pidfd, deadline):
+    """Waits until the process exits or the deadline passes, returns (status, rusage) or None on timeout."""
+    while True:
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if remaining is not None and remaining <= 0:
+            return None
+        if pidfd is not None:
+            ready, _, _ = select.select([pidfd], [], [], remaining)
+            if not ready:
+                return None
+        else:
+            time.sleep(0.005 if remaining is None else min(0.005, remaining))
+        waitedPid, status, rusage = os.wait4(pid, os.WNOHANG)
+        if waitedPid == pid:
+            return status, rusage
+
+
+def _exceededCpuTime(status, rusage, cpuTimeLimit):
+    if cpuTimeLimit == -1 or not os.WIFSIGNALED(status):
+        return False
+    signalNumber = os.WTERMSIG(status)
+    return signalNumber == signal.SIGXCPU or (signalNumber == signal.SIGKILL and
+                                              rusage.ru_utime + rusage.ru_stime >= math.ceil(cpuTimeLimit))
+
+
+def _hasMemoryErrorMarker(outputFile):
+    outputFile.seek(0, os.SEEK_END)
+    outputFile.seek(max(0, outputFile.tell() - _MEMORY_SCAN_SIZE))
+    tail = outputFile.read()
+    return any(marker in tail for marker in MEMORY_ERROR_MARKERS)
+
+
+def runProcess(command, timeout=None, memoryLimit=-1, cpuTimeLimit=-1, killGracePeriod=5, outputPath=None,
+               successCodes=(0,), memoryCodes=()):
+    """
+    Runs a command in a process group of its own and measures it through the rusage reported by os.wait4, i.e.
+    without relying on /usr/bin/time. Once the timeout is reached, the process group receives SIGTERM and, if it
+    has not exited after killGracePeriod seconds, the process and all its descendants are killed with SIGKILL.
+
+    The memory limit caps the address space (RLIMIT_AS) of the process and of every child it starts, such that a
+    runaway process fails to allocate memory instead of pushing the machine into swap. Note that the JVM reserves
+    much more address space than it uses, hence it needs a generous limit (or -Xmx) to start at all.
+
+    :param command: the command as list of arguments (no shell is involved)
+    :param timeout: wall clock timeout in seconds, None for no timeout
+    :param memoryLimit: address space limit in MB, -1 for no limit
+    :param cpuTimeLimit: CPU time limit in seconds (RLIMIT_CPU), -1 for no limit
+    :param killGracePeriod: seconds between SIGTERM and SIGKILL on timeouts
+    :param outputPath: file stdout and stderr are streamed to, None to buffer them in memory (RunResult.output)
+    :param successCodes: exit codes of a successful run
+    :param memoryCodes: exit codes indicating that the process ran out of memory
+    :return: a RunResult
+    """
+    if outputPath is None:
+        outputFile = tempfile.TemporaryFile()
+    else:
+        outputFile = open(outputPath, "w+b")
+
+    with outputFile:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=outputFile, stderr=subprocess.STDOUT,
+                                   preexec_fn=lambda: _limitResources(memoryLimit, cpuTimeLimit))
+        pidfd = os.pidfd_open(process.pid) if hasattr(os, "pidfd_open") else None
+        try:
+            deadline = None if timeout is None else start + timeout
+            waited = _waitUntil(process.pid, pidfd, deadline)
+            timedOut = waited is None
+            if timedOut:
+                try:
+                    os.killpg(process.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+                waited = _waitUntil(process.pid, pidfd, time.perf_counter() + killGracePeriod)
+                if waited is None:
+                    killProcessTree(process.pid)
+                    waited = _waitUntil(process.pid, pidfd, None)
+                # children that survived the SIGTERM of their already exited parent
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+        wallTime = time.perf_counter() - start
+        (status, rusage) = waited
+        # the process has been reaped by os.wait4, Popen must not wait for it again
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if timedOut or _exceededCpuTime(status, rusage, cpuTimeLimit):
+            runStatus = "timeout"
+        elif os.WIFEXITED(status) and process.returncode in successCodes:
+            runStatus = "success"
+        elif process.returncode in memoryCodes or (memoryLimit != -1 and _hasMemoryErrorMarker(outputFile)):
+            runStatus = "memoryOut"
+        else:
+            runStatus = "crash"
+
+        output = None
+        if outputPath is None:
+            outputFile.seek(0)
+            output = outputFile.read().decode("utf-8", "replace")
+
+    return RunResult(runStatus, process.returncode, wallTime, rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss,
+                     output, outputPath)
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
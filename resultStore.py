@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from domainCache import contentHash
+
+DEFAULT_STORE_PATH = "./experiments/results.sqlite"
+
+# search statistics (see reversible.SearchStats) appended to every csv row, empty for the ASP approaches, followed by
+# the translation time of the ASP approaches (see translationCache.translate) and their ground and solve time if
+# measured with the clingo Python API (see benchmark.benchmarkClingoApi)
+STATS_COLUMNS = {
+    "expanded": "expanded",
+    "generated": "generated",
+    "duplicatePruned": "duplicate_pruned",
+    "noopPruned": "noop_pruned",
+    "depthLimitPruned": "depth_limit_pruned",
+    "peakFrontier": "peak_frontier",
+    "peakClosed": "peak_closed",
+    "removedActions": "removed_actions",
+    "parseTime": "parse_time_seconds",
+    "compileTime": "compile_time_seconds",
+    "searchTime": "search_time_seconds",
+    "decodeTime": "decode_time_seconds",
+    "translateTime": "translate_time_seconds",
+    "groundTime": "ground_time_seconds",
+    "solveTime": "solve_time_seconds",
+}
+
+_STATS_HEADER = ",".join(STATS_COLUMNS.values())
+
+CSV_HEADERS = {
+    "standard": f"approach,domain_type,horizon,i,path,runtime_seconds,set_size_mb,{_STATS_HEADER}\n",
+    "generalized": f"approach,domain_type,horizon,num_plans_success,length_plans_success,length_plans_dead_end,num_plans_dead_end,domain_size,path,runtime_seconds,set_size_mb,{_STATS_HEADER}\n",
+    "barabasiAlbert": f"approach,domain_type,horizon,m,n,node_a,node_b,domain_size,path,runtime_seconds,set_size_mb,{_STATS_HEADER}\n",
+}
+
+
+def settingsHash(settings):
+    """Returns a short hash of the settings (a JSON serializable dict) a result has been measured with."""
+    return hashlib.sha256(json.dumps(settings or {}, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def csvHeader(domain_type):
+    if domain_type == "singlePath" or domain_type == "multiplePaths" or domain_type == "multiplePathsDeadEnds":
+        return CSV_HEADERS["standard"]
+    elif domain_type == "generalized":
+        return CSV_HEADERS["generalized"]
+    elif "barabasiAlbertLongestShortestPath" in domain_type or domain_type == "barabasiAlbertDegree":
+        return CSV_HEADERS["barabasiAlbert"]
+
+
+def csvRow(approach, domain_type, horizon, path, runtime_seconds, set_size_mb, stats=None):
+    csv_generator_arguments = ",".join(path.split(".pddl")[0].split("-")[2:])
+    csv_stats = ",".join(str((stats or {}).get(field, "")) for field in STATS_COLUMNS)
+    return f"{approach},{domain_type},{horizon},{csv_generator_arguments},{path},{runtime_seconds},{set_size_mb},{csv_stats}\n"
+
+
+class ResultStore:
+    """
+    Persistent, indexed store of experiment results backed by SQLite.
+
+    Results are keyed by the content hash of the domain file, the approach, the horizon, the timeout, and the hash
+    of the settings they have been measured with (see settingsHash), such that a result stays valid as long as the
+    domain file has the same content, no matter under which name it has been generated, and is not reused by a run
+    with other settings. Every result is committed as soon as it is added, so an interrupted experiment run can be
+    resumed.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # results of stores created before the settings were part of the key cannot be told apart, hence they are
+        # dropped
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(results)")]
+        if columns and "settings_hash" not in columns:
+            print(f"Dropping the results in {path}, as they have been stored without their settings")
+            self.connection.execute("DROP TABLE results")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS domains (
+                path TEXT PRIMARY KEY,
+                domain_hash TEXT NOT NULL,
+                domain_type TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS domains_hash ON domains (domain_hash);
+            CREATE TABLE IF NOT EXISTS results (
+                domain_hash TEXT NOT NULL,
+                approach TEXT NOT NULL,
+                horizon INTEGER NOT NULL,
+                timeout REAL NOT NULL,
+                settings_hash TEXT NOT NULL,
+                domain_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                runtime_seconds REAL NOT NULL,
+                set_size_mb REAL NOT NULL,
+                finished REAL NOT NULL,
+                stats TEXT,
+                settings TEXT,
+                PRIMARY KEY (domain_hash, approach, horizon, timeout, settings_hash)
+            );
+        """)
+        self.connection.commit()
+        self.hashes = {}
+
+    def close(self):
+        self.connection.close()
+
+    def domainHash(self, path):
+        """Returns the (memoized) content hash of the given domain file."""
+        if path not in self.hashes:
+            self.hashes[path] = contentHash(path)
+        return self.hashes[path]
+
+    def registerDomains(self, paths, domainTypeOf):
+        """
+        Registers the given domain files (replacing all previously registered ones) with their content hashes.
+
+        :param paths: paths of the domain files
+        :param domainTypeOf: function returning the domain type of a domain file name
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM domains")
+            self.connection.executemany(
+                "INSERT INTO domains (path, domain_hash, domain_type) VALUES (?, ?, ?)",
+                [(str(path), self.domainHash(str(path)), domainTypeOf(str(path))) for path in paths]
+            )
+
+    def knowsDomains(self, paths):
+        """Returns whether the given domain files are exactly the registered ones, with unchanged content."""
+        registered = dict(self.connection.execute("SELECT path, domain_hash FROM domains"))
+        paths = [str(path) for path in paths]
+        if not paths or len(paths) != len(registered):
+            return False
+        return all(registered.get(path) == self.domainHash(path) for path in paths)
+
+    def result(self, path, approach, horizon, timeout, settings=None):
+        """
+        Returns the stored (status, runtime_seconds, set_size_mb, stats) of a job, or None if it has not been
+        completed with the given settings (a JSON serializable dict, see settingsHash). Jobs whose worker crashed
+        ("error") or was killed ("killed", see scheduler.runJobs) are not completed, such that they are run again.
+        """
+        row = self.connection.execute(
+            "SELECT status, runtime_seconds, set_size_mb, stats FROM results "
+            "WHERE domain_hash = ? AND approach = ? AND horizon = ? AND timeout = ? AND settings_hash = ? "
+            "AND status = 'done'",
+            (self.domainHash(path), approach, horizon, timeout, settingsHash(settings))
+        ).fetchone()
+        if row is None:
+            return None
+        return row[:3] + (json.loads(row[3]) if row[3] else {},)
+
+    def addResult(self, path, approach, horizon, timeout, domain_type, status, runtime_seconds, set_size_mb, stats=None,
+                  settings=None):
+        """Stores (or replaces) the result of a job measured with the given settings and commits it immediately."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results "
+                "(domain_hash, approach, horizon, timeout, settings_hash, domain_type, status, runtime_seconds, "
+                "set_size_mb, finished, stats, settings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.domainHash(path), approach, horizon, timeout, settingsHash(settings), domain_type, status,
+                 runtime_seconds, set_size_mb, time.time(), json.dumps(stats) if stats else None,
+                 json.dumps(settings or {}, sort_keys=True))
+            )
+
+    def exportCsv(self, folder="./experiments", suffix=None, settings=None):
+        """
+        Writes the results of all registered domains into one csv file per domain type and approach, following the
+        format of the csv files written by experiments.py so far.
+
+        :param folder: folder the csv files are written to
+        :param suffix: suffix of the file names, the current timestamp if None
+        :param settings: only export the results measured with these settings (see settingsHash), None for all
+        :return: the paths of the written files
+        """
+        if suffix is None:
+            suffix = time.time()
+        Path(folder).mkdir(parents=True, exist_ok=True)
+
+        query = ("SELECT r.approach, d.domain_type, r.horizon, d.path, r.runtime_seconds, r.set_size_mb, r.stats "
+                 "FROM results r JOIN domains d ON r.domain_hash = d.domain_hash ")
+        parameters = ()
+        if settings is not None:
+            query += "WHERE r.settings_hash = ? "
+            parameters = (settingsHash(settings),)
+        rows = self.connection.execute(
+            query + "ORDER BY d.domain_type, r.approach, d.path, r.timeout, r.horizon", parameters
+        ).fetchall()
+
+        files = {}
+        for approach, domain_type, horizon, path, runtime_seconds, set_size_mb, stats in rows:
+            filename = f"{folder}/{domain_type}-{approach}-{suffix}.csv"
+            if filename not in files:
+                files[filename] = [csvHeader(domain_type)]
+            files[filename].append(csvRow(approach, domain_type, horizon, path, runtime_seconds, set_size_mb,
+                                          json.loads(stats) if stats else None))
+
+        for filename, lines in files.items():
+            with open(filename, "w") as f:
+                f.writelines(lines)
+        return list(files.keys())
+
+
+def exportCsv(storePath=DEFAULT_STORE_PATH, folder="./experiments", suffix=None, settings=None):
+    """
+    Exports the results of an experiment result store into one csv file per domain type and approach.
+
+    :param storePath: path of the SQLite result store
+    :param folder: folder the csv files are written to
+    :param suffix: suffix of the file names, the current timestamp if None
+    :param settings: only export the results measured with these settings (a dict, see settingsHash), None for all
+    """
+    store = ResultStore(storePath)
+    try:
+        for filename in store.exportCsv(folder, suffix, settings):
+            print(f"Exported {filename}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()
@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
 
+import heapq
+import json
 import sys
-sys.path.append("../tools/")
+import time
+from collections import deque
 
-from action import Action
-from PDDL import PDDL_Parser
+from domainCompiler import bitIndices, compileDomain, popCount, pre_a, del_a, add_a
+from domainCache import DEFAULT_CACHE_DIR, loadCachedDomain
+from searchMemory import MemoryBudget, fingerprint, newClosedList
+
+
+# uninformed strategies ("dfs", "bfs", "bidirectional") and heuristic strategies ("gbfs", "astar"), see search
+STRATEGIES = ["dfs", "bfs", "gbfs", "astar", "bidirectional"]
+HEURISTIC_STRATEGIES = ["gbfs", "astar"]
+# phases of the "dfs" and "bfs" search loop timed by search with timePhases
+SEARCH_PHASES = ["goalCheck", "successorGeneration", "duplicateDetection", "enqueue"]
 
 
 class State:
@@ -27,6 +38,12 @@ class State:
             return False
         return True
 
+    def key(self):
+        """Canonical, hashable (Fplus, Fminus, F0) triple of this state.
+        Two states have the same key if and only if they are equivalent according to isEquiv.
+        """
+        return (frozenset(self.Fplus), frozenset(self.Fminus), frozenset(self.F0))
+
     def print(self):
         print(f"F0: {', '.join([str(elem[0]) for elem in self.F0])}")
         print(f"Fplus: {', '.join([str(elem[0]) for elem in self.Fplus])}")
@@ -35,129 +52,784 @@ class State:
         print(f"Path length: {str(len(self.pi))}")
 
 
-def pre_a(action):
-    # return action.negative_preconditions.union(action.positive_preconditions)
-    return action.positive_preconditions
-
-
-def del_a(action):
-    return action.del_effects
-
-
-def add_a(action):
-    return action.add_effects
-
+class CompiledState:
+    """Bitset counterpart of State as it is used during the search, see domainCompiler.CompiledDomain.
+    Instead of a copy of the whole path pi, a compiled state only stores its predecessor, the index of the
+    action applied to reach it, and the length of its path. The path is rebuilt on demand by plan.
+    Once a state is expanded, applicable holds the mask of all actions applicable in it.
+    """
+    __slots__ = ("Fplus", "Fminus", "F0", "parent", "actionIndex", "depth", "applicable")
 
-def algorithm(action, actions, strategy, maxPathLimit=-1):
+    def __init__(self, Fplus, Fminus, F0, parent=None, actionIndex=-1):
+        self.Fplus = Fplus
+        self.Fminus = Fminus
+        self.F0 = F0
+        self.parent = parent
+        self.actionIndex = actionIndex
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.applicable = None
+
+    def key(self):
+        return (self.Fplus, self.Fminus, self.F0)
+
+    def plan(self):
+        """Returns the path pi leading to this state as a list of action indices."""
+        pi = []
+        state = self
+        while state.parent is not None:
+            pi.append(state.actionIndex)
+            state = state.parent
+        pi.reverse()
+        return pi
+
+    def decode(self, domain):
+        """Translates this state back into a State over the fluents and actions of the given domain."""
+        return State(
+            Fplus=domain.decode(self.Fplus),
+            Fminus=domain.decode(self.Fminus),
+            F0=domain.decode(self.F0),
+            pi=[domain.action(i) for i in self.plan()]
+        )
+
+
+class CompiledSuffix:
+    """Node of the backward search of the "bidirectional" strategy (see search), which represents a suffix of a
+    reverse plan by its combined effect on a state (Fplus, Fminus, F0) it is applied to:
+
+    - Fplus becomes (Fplus - plusDel) | plusAdd, Fminus becomes (Fminus - minusDel) | minusAdd
+    - F0 becomes F0 | (requiredPlus - Fplus)
+    - the suffix is applicable if and only if requiredMinus does not intersect Fminus
+
+    Like CompiledState, a suffix only stores its first action and the remaining suffix (child).
+    """
+    __slots__ = ("plusAdd", "plusDel", "minusAdd", "minusDel", "requiredPlus", "requiredMinus", "child",
+                 "actionIndex", "depth")
+
+    def __init__(self, plusAdd, plusDel, minusAdd, minusDel, requiredPlus, requiredMinus, child=None, actionIndex=-1):
+        self.plusAdd = plusAdd
+        self.plusDel = plusDel
+        self.minusAdd = minusAdd
+        self.minusDel = minusDel
+        self.requiredPlus = requiredPlus
+        self.requiredMinus = requiredMinus
+        self.child = child
+        self.actionIndex = actionIndex
+        self.depth = 0 if child is None else child.depth + 1
+
+    def key(self):
+        return (self.plusAdd, self.plusDel, self.minusAdd, self.minusDel, self.requiredPlus, self.requiredMinus)
+
+    def plan(self):
+        """Returns the suffix as a list of action indices."""
+        pi = []
+        suffix = self
+        while suffix.child is not None:
+            pi.append(suffix.actionIndex)
+            suffix = suffix.child
+        return pi
+
+
+class SearchStats:
+    """Counters and phase timings collected by search and its callers.
+
+    expanded: number of states whose successors have been generated
+    generated: number of new states that have been added to ongoing
+    duplicatePruned: number of successors that have been discarded, because they have been explored before
+    noopPruned: number of successors that have been discarded, because the action did not modify the state
+    depthLimitPruned: number of states that have not been expanded (or added to ongoing) due to the maxPathLimit
+    peakFrontier: maximal number of open states (including outdated entries of the priority queue)
+    peakClosed: maximal number of entries of the closed list
+    budgetExhausted: whether the search has been aborted because its memory limit has been reached
+    removedActions: number of actions removed by preprocessActions before the search
+    provenIrreversible: whether preprocessActions has already shown that the action is not reversible, such that
+        no search has been run
+    parseTime: seconds spent on loading the domain (including its compilation if it is loaded by domainLoader
+        or domainCache)
+    compileTime: seconds spent on compiling parsed actions (see domainCompiler.compileDomain)
+    searchTime: seconds spent within search (excluding the time the caller spends between two yielded states)
+    decodeTime: seconds spent on decoding the yielded states
+    phaseTimes: seconds spent in every phase of the search loop (see SEARCH_PHASES), only if search times its phases
+    phaseCounts: number of times every phase of the search loop has been timed
     """
-    This function follows the definition of Algorithm 1 from the paper
-    
-    M. Morak, L. Chrpa, W. Faber, and D. Fiser,
-    "On the reversibility of actions in planning"
-    in Proceedings of the 17th International Conference on
-    Principles of Knowledge Representation and Reasoning, KR 2020,
-    Rhodes, Greece, September 12-18, 2020,
-    D. Calvanese, E. Erdem, and M. Thielscher, Eds.,
-    2020, pp. 652–661.
 
-    :param action: the to be reversed action
-    :param actions: all actions present in the domain
-    :param strategy: "dfs" for depth-first search or "bfs" for breadth-first search
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicatePruned = 0
+        self.noopPruned = 0
+        self.depthLimitPruned = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.budgetExhausted = False
+        self.removedActions = 0
+        self.provenIrreversible = False
+        self.parseTime = 0.0
+        self.compileTime = 0.0
+        self.searchTime = 0.0
+        self.decodeTime = 0.0
+        self.phaseTimes = {}
+        self.phaseCounts = {}
+
+    def toDict(self):
+        return dict(vars(self))
+
+    def toJson(self):
+        """Returns the statistics as a single JSON line."""
+        return json.dumps(self.toDict())
+
+
+def preprocessActions(domain, actionIndex):
+    """
+    Determines the actions that have to be considered by the search for a reverse plan of an action.
+
+    Reachability: an action is only applicable once none of its preconditions is in Fminus. Initially, Fminus
+    consists of del_a(action) and a fluent only leaves Fminus if it is added by an applied action. Starting from
+    the actions whose preconditions are disjoint from del_a(action), the actions whose preconditions can be removed
+    from Fminus by the add effects of reachable actions are added until a fixpoint is reached. All other actions
+    are never applicable. If a fluent of pre_a(action) that is missing from the initial Fplus is not added by any
+    reachable action, the action cannot be reversed at all.
+
+    Relevance: starting from pre_a(action), the reachable actions adding a relevant fluent are relevant and
+    their preconditions become relevant as well. Removing all irrelevant actions from a reverse plan leaves a
+    reverse plan that is at most as long (they do not add any fluent that is required by the goal condition or a
+    relevant action), hence the existence and the length of a shortest reverse plan are preserved. Only reverse
+    plans consisting of irrelevant actions are not enumerated anymore.
+
+    :param domain: the compiled domain, see domainCompiler.compileDomain
+    :param actionIndex: index of the to be reversed action in the compiled domain
+    :return: a pair of the mask of all reachable and relevant actions and whether pre_a(action) can be restored
+    """
+    preMasks = domain.preMasks
+    addMasks = domain.addMasks
+
+    pre = preMasks[actionIndex]
+    Fminus = domain.delMasks[actionIndex]
+    # fluents of pre_a(action) missing from the initial Fplus
+    missing = pre & Fminus & ~addMasks[actionIndex]
+
+    reachable = domain.allActionsMask & ~domain.blockedActions(Fminus)
+    added = 0
+    newReachable = reachable
+    while newReachable:
+        newAdded = 0
+        for aa in bitIndices(newReachable):
+            newAdded |= addMasks[aa]
+        # only actions with a precondition that has just been removed from Fminus can become reachable
+        restored = newAdded & Fminus & ~added
+        added |= newAdded
+        newReachable = 0
+        for aa in bitIndices(domain.blockedActions(restored) & ~reachable):
+            if preMasks[aa] & Fminus & ~added == 0:
+                newReachable |= 1 << aa
+        reachable |= newReachable
+
+    if missing & ~added:
+        return (0, False)
+
+    relevant = 0
+    relevantFluents = pre
+    newFluents = pre
+    while newFluents:
+        newRelevant = domain.achievingActions(newFluents) & reachable & ~relevant
+        relevant |= newRelevant
+        newFluents = 0
+        for aa in bitIndices(newRelevant):
+            newFluents |= preMasks[aa]
+        newFluents &= ~relevantFluents
+        relevantFluents |= newFluents
+    return (relevant, True)
+
+
+def search(domain, actionIndex, strategy, maxPathLimit=-1, stats=None, closedList="exact", memoryLimit=-1,
+           callback=None, callbackInterval=1000, preprocess=False, timePhases=False):
+    """
+    Bitset implementation of Algorithm 1 (see algorithm) on a compiled domain.
+
+    Besides the uninformed strategies, two heuristic strategies are supported, which are driven by a priority
+    queue. Both are based on the number of open goal fluents of a state, i.e. the fluents of pre_a(action) still
+    missing from Fplus together with the fluents of F0 that are still in Fminus. As only add effects can close such
+    a fluent, this number divided by the maximal number of add effects of an action is a lower bound of the
+    remaining plan length:
+
+    - "gbfs" (greedy best-first search) expands the state with the fewest open goal fluents first
+    - "astar" (A*) expands the state with the lowest path length plus lower bound first, such that the first
+      yielded state resembles a shortest reverse plan (like "bfs")
+
+    With a maxPathLimit, both heuristic strategies also prune all states whose lower bound already exceeds it.
+    The lower bound is weak on domains whose goal fluents are deleted again on the way, such as multiplePaths: there,
+    "astar" expands as many states as "bfs" and is slower due to the priority queue.
+
+    The "bidirectional" strategy combines a forward breadth-first search with a backward regression from the goal
+    condition and joins both at a common frontier (see _bidirectionalSearch). On path-like domains, both sides only
+    have to cover about half of the reverse plan.
+
+    To bound the memory of the search, the closed list can be compacted (see searchMemory.CLOSED_LISTS): "fingerprint"
+    only keeps 64 bit fingerprints of the explored states, "bloom" (only for "dfs" and "bfs") a Bloom filter sized
+    for an expected number of states and false positive rate. Both trade completeness for memory, as a collision of
+    fingerprints or a false positive of the Bloom filter prunes a state that has not been explored. Hence, with
+    these closed lists a search that ends without a reverse plan does not prove that there is none. With a
+    memoryLimit, the search stops once the memory usage of the process reaches the limit and sets
+    stats.budgetExhausted instead of being killed.
+
+    All counters of the search and the time spent within it are collected in stats. To sample the search while
+    it is running, a callback can be passed, which is called every callbackInterval expansions with the stats and
+    an iterable over the currently open states (which must not be modified).
+
+    With preprocess, only the reachable and relevant actions (see preprocessActions) are considered, which
+    preserves whether the action is reversible and the length of a shortest reverse plan. If preprocessing shows
+    that pre_a(action) can never be restored, the search ends immediately and sets stats.provenIrreversible.
+
+    :param domain: the compiled domain, see domainCompiler.compileDomain
+    :param actionIndex: index of the to be reversed action in the compiled domain
+    :param strategy: "dfs" for depth-first search, "bfs" for breadth-first search, "gbfs" for greedy best-first
+        search, "astar" for A* search, or "bidirectional" for bidirectional search
     :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
-    :return: a generator, which yields states that resemble valid reverse plans.
+    :param stats: optional SearchStats object, which is updated during the search
+    :param closedList: "exact", "fingerprint", or "bloom"
+    :param memoryLimit: -1 for no limit, otherwise the search is aborted once the process uses this many MB
+    :param callback: optional function, which is called as callback(stats, openStates) during the search
+    :param callbackInterval: number of expansions between two calls of the callback
+    :param preprocess: whether the search is restricted to the actions determined by preprocessActions
+    :param timePhases: whether the time spent in every phase of the search loop is collected in stats.phaseTimes
+        (only for "dfs" and "bfs"): the goal check of every popped state, the generation of the successors of every
+        expanded state, their duplicate detection against the closed list, and the enqueueing of the new states
+    :return: a generator, which yields compiled states that resemble valid reverse plans.
     """
-    ongoing = []
-    visited = []
+    if stats is None:
+        stats = SearchStats()
+
+    generator = _search(domain, actionIndex, strategy, maxPathLimit, stats, closedList, memoryLimit, callback,
+                        callbackInterval, preprocess, timePhases)
+    while True:
+        start = time.perf_counter()
+        state = next(generator, None)
+        stats.searchTime += time.perf_counter() - start
+        if state is None:
+            return
+        yield state
+
+
+def _search(domain, actionIndex, strategy, maxPathLimit, stats, closedList, memoryLimit, callback, callbackInterval,
+            preprocess, timePhases):
+    """Search loop of search for the strategies "dfs" and "bfs", dispatching to the other strategies."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy \"{strategy}\", expected one of {', '.join(STRATEGIES)}")
+    if closedList == "bloom" and strategy not in ["dfs", "bfs"]:
+        raise ValueError(f"The strategy \"{strategy}\" does not support a Bloom filter as closed list")
+    if closedList != "exact" and strategy == "bidirectional":
+        raise ValueError(f"The strategy \"{strategy}\" only supports an exact closed list")
+    if timePhases and strategy not in ["dfs", "bfs"]:
+        raise ValueError(f"The strategy \"{strategy}\" does not support timing its phases")
+    budget = MemoryBudget(memoryLimit)
+
+    allowedActions = domain.allActionsMask
+    if preprocess:
+        allowedActions, restorable = preprocessActions(domain, actionIndex)
+        stats.removedActions = popCount(domain.allActionsMask & ~allowedActions)
+        if not restorable:
+            stats.provenIrreversible = True
+            return
+
+    preMasks = domain.preMasks
+    addMasks = domain.addMasks
+    delMasks = domain.delMasks
+
+    def applicableActions(state):
+        """Computes the mask of all actions whose preconditions do not intersect Fminus of the given state.
+        Instead of testing every action, the mask of the parent is updated for the fluents that entered or left
+        Fminus, using the fluent -> actions index of the domain.
+        """
+        parent = state.parent
+        if parent is None:
+            applicable = allowedActions & ~domain.blockedActions(state.Fminus)
+        else:
+            applicable = parent.applicable
+            entering = state.Fminus & ~parent.Fminus
+            leaving = parent.Fminus & ~state.Fminus
+            if entering:
+                applicable &= ~domain.blockedActions(entering)
+            if leaving:
+                for aa in bitIndices(domain.blockedActions(leaving) & allowedActions & ~applicable):
+                    if preMasks[aa] & state.Fminus == 0:
+                        applicable |= 1 << aa
+        state.applicable = applicable
+        return applicable
+
+    pre = preMasks[actionIndex]
+    Fplus = (pre & ~delMasks[actionIndex]) | addMasks[actionIndex]
+    Fminus = delMasks[actionIndex]
+    F0 = 0
+    initState = CompiledState(Fplus, Fminus, F0)
+
+    if strategy in HEURISTIC_STRATEGIES:
+        yield from _heuristicSearch(domain, initState, pre, strategy, maxPathLimit, stats, applicableActions,
+                                    allowedActions, closedList, budget, callback, callbackInterval)
+        return
+    if strategy == "bidirectional":
+        yield from _bidirectionalSearch(domain, initState, pre, maxPathLimit, stats, applicableActions,
+                                        allowedActions, budget, callback, callbackInterval)
+        return
+
+    ongoing = deque()
+    # hash index over the keys (or their fingerprints) of all states that have ever been added to ongoing,
+    # i.e. the states that are still open as well as the already visited (closed) ones
+    explored, compact = newClosedList(closedList)
 
-    Fplus = (pre_a(action).difference(del_a(action))).union(add_a(action))
-    Fminus = del_a(action)
-    F0 = set()
-    pi = []
-    initState = State(Fplus, Fminus, F0, pi)
     ongoing.append(initState)
+    explored.add(fingerprint(initState.key()) if compact else initState.key())
+
+    # the phases are timed once per expanded state rather than per successor, which keeps the overhead low
+    clock = time.perf_counter if timePhases else None
+    phaseTimes = stats.phaseTimes
+    phaseCounts = stats.phaseCounts
+    if timePhases:
+        phaseTimes.update({phase: 0.0 for phase in SEARCH_PHASES})
+        phaseCounts.update({phase: 0 for phase in SEARCH_PHASES})
 
     while ongoing:
+        if budget.exhausted():
+            stats.budgetExhausted = True
+            return
+
         if strategy == "bfs":
-            state = ongoing.pop(0)
-        elif strategy == "dfs":
+            state = ongoing.popleft()
+        else:
             state = ongoing.pop()
 
-        state = state  # type: State
-
-        visited.append(state)
+        state = state  # type: CompiledState
 
-        if pre_a(action).issubset(state.Fplus) and len(state.F0.intersection(state.Fminus)) == 0:
+        if clock is not None:
+            start = clock()
+        isGoal = pre & ~state.Fplus == 0 and state.F0 & state.Fminus == 0
+        if clock is not None:
+            goalChecked = clock()
+            phaseTimes["goalCheck"] += goalChecked - start
+            phaseCounts["goalCheck"] += 1
+        if isGoal:
             yield state
             continue
 
-        possibleActions = []
-        for aa in actions:
-            aa = aa  # type: Action
-            if len(pre_a(aa).intersection(state.Fminus)) == 0:
-                possibleActions.append(aa)
+        # do not explore paths exceeding the provided maxPathLimit
+        if maxPathLimit != -1 and state.depth >= maxPathLimit:
+            stats.depthLimitPruned += 1
+            continue
 
-        for aa in possibleActions:
+        Fplus = state.Fplus
+        Fminus = state.Fminus
+        F0 = state.F0
 
-            newState = State(
-                Fplus=(state.Fplus.difference(del_a(aa))).union(add_a(aa)),
-                Fminus=(state.Fminus.difference(add_a(aa))).union(del_a(aa)),
-                F0=state.F0.union(pre_a(aa).difference(state.Fplus)),
-                pi=(state.pi + [aa])
-            )
+        stats.expanded += 1
+        successors = []
+        for aa in bitIndices(applicableActions(state)):
+            newFplus = (Fplus & ~delMasks[aa]) | addMasks[aa]
+            newFminus = (Fminus & ~addMasks[aa]) | delMasks[aa]
+            newF0 = F0 | (preMasks[aa] & ~Fplus)
 
             # do not consider actions that do not modify the current state
-            if newState.F0 == state.F0 and newState.Fplus == state.Fplus and newState.Fminus == state.Fminus:
+            if newF0 == F0 and newFplus == Fplus and newFminus == Fminus:
+                stats.noopPruned += 1
                 continue
+            successors.append((newFplus, newFminus, newF0, aa))
+        if clock is not None:
+            generatedSuccessors = clock()
+            phaseTimes["successorGeneration"] += generatedSuccessors - goalChecked
+            phaseCounts["successorGeneration"] += 1
+
+        # only add a new state if it has not been explored so far
+        fresh = []
+        for successor in successors:
+            newKey = fingerprint(successor[:3]) if compact else successor[:3]
+            if newKey not in explored:
+                explored.add(newKey)
+                fresh.append(successor)
+        stats.duplicatePruned += len(successors) - len(fresh)
+        if clock is not None:
+            detectedDuplicates = clock()
+            phaseTimes["duplicateDetection"] += detectedDuplicates - generatedSuccessors
+            phaseCounts["duplicateDetection"] += 1
+
+        for (newFplus, newFminus, newF0, aa) in fresh:
+            ongoing.append(CompiledState(newFplus, newFminus, newF0, parent=state, actionIndex=aa))
+        stats.generated += len(fresh)
+        if clock is not None:
+            phaseTimes["enqueue"] += clock() - detectedDuplicates
+            phaseCounts["enqueue"] += 1
+
+        if len(ongoing) > stats.peakFrontier:
+            stats.peakFrontier = len(ongoing)
+        stats.peakClosed = len(explored)
+        if callback is not None and stats.expanded % callbackInterval == 0:
+            callback(stats, ongoing)
+
+
+def _heuristicSearch(domain, initState, pre, strategy, maxPathLimit, stats, applicableActions, allowedActions,
+                     closedList, budget, callback, callbackInterval):
+    """Priority queue driven variant of the search loop for the strategies in HEURISTIC_STRATEGIES, see search."""
+    preMasks = domain.preMasks
+    addMasks = domain.addMasks
+    delMasks = domain.delMasks
+    maxAddSize = max([popCount(addMasks[aa]) for aa in bitIndices(allowedActions)] + [1])
+
+    def openGoalFluents(Fplus, Fminus, F0):
+        return popCount((pre & ~Fplus) | (F0 & Fminus))
+
+    def priority(openGoals, depth):
+        if strategy == "gbfs":
+            return openGoals
+        return depth + -(-openGoals // maxAddSize)
+
+    # entries are (priority, insertion number, state), the insertion number breaks ties in FIFO order
+    ongoing = []
+    counter = 0
+    # path length of the shortest path found so far for every state (or fingerprint) ever added to ongoing; for
+    # "gbfs" a state is never added twice, for "astar" it is added again (and expanded once more) whenever a
+    # shorter path is found
+    compact = closedList == "fingerprint"
+    bestDepth = {fingerprint(initState.key()) if compact else initState.key(): 0}
+
+    heapq.heappush(ongoing, (priority(openGoalFluents(initState.Fplus, initState.Fminus, initState.F0), 0), counter, initState))
+
+    while ongoing:
+        if budget.exhausted():
+            stats.budgetExhausted = True
+            return
+
+        _, _, state = heapq.heappop(ongoing)
+
+        Fplus = state.Fplus
+        Fminus = state.Fminus
+        F0 = state.F0
+        depth = state.depth
 
-            # do not explore paths exceeding the provided maxPathLimit
-            if maxPathLimit != -1 and len(newState.pi) > maxPathLimit:
+        # skip outdated entries of states that have been reached by a shorter path in the meantime
+        key = (Fplus, Fminus, F0)
+        if bestDepth[fingerprint(key) if compact else key] < depth:
+            continue
+
+        if pre & ~Fplus == 0 and F0 & Fminus == 0:
+            yield state
+            continue
+
+        # do not explore paths exceeding the provided maxPathLimit
+        if maxPathLimit != -1 and depth >= maxPathLimit:
+            stats.depthLimitPruned += 1
+            continue
+
+        stats.expanded += 1
+        newDepth = depth + 1
+        for aa in bitIndices(applicableActions(state)):
+            newFplus = (Fplus & ~delMasks[aa]) | addMasks[aa]
+            newFminus = (Fminus & ~addMasks[aa]) | delMasks[aa]
+            newF0 = F0 | (preMasks[aa] & ~Fplus)
+
+            # do not consider actions that do not modify the current state
+            if newF0 == F0 and newFplus == Fplus and newFminus == Fminus:
+                stats.noopPruned += 1
                 continue
 
-            # only add a new state if it has not been explored so far
-            existsAlready = False
-            for s in ongoing + visited:
-                if s.isEquiv(newState):
-                    existsAlready = True
-                    break
-            if not existsAlready:
-                ongoing = ongoing + [newState]
+            newKey = (newFplus, newFminus, newF0)
+            if compact:
+                newKey = fingerprint(newKey)
+            knownDepth = bestDepth.get(newKey)
+            if knownDepth is not None and (strategy == "gbfs" or knownDepth <= newDepth):
+                stats.duplicatePruned += 1
+                continue
+
+            openGoals = openGoalFluents(newFplus, newFminus, newF0)
+            # admissible pruning: the lower bound of the remaining plan length already exceeds the maxPathLimit
+            if maxPathLimit != -1 and newDepth + -(-openGoals // maxAddSize) > maxPathLimit:
+                stats.depthLimitPruned += 1
+                continue
 
+            bestDepth[newKey] = newDepth
+            counter += 1
+            newState = CompiledState(newFplus, newFminus, newF0, parent=state, actionIndex=aa)
+            heapq.heappush(ongoing, (priority(openGoals, newDepth), counter, newState))
+            stats.generated += 1
 
-def find_rev(domainPathStr, reversibleActionName, strategy, maxPathLimit=-1, findSingleSolution=True):
+        if len(ongoing) > stats.peakFrontier:
+            stats.peakFrontier = len(ongoing)
+        stats.peakClosed = len(bestDepth)
+        if callback is not None and stats.expanded % callbackInterval == 0:
+            callback(stats, [entry[2] for entry in ongoing])
+
+
+def _bidirectionalSearch(domain, initState, pre, maxPathLimit, stats, applicableActions, allowedActions, budget,
+                         callback, callbackInterval):
+    """
+    Search loop of the "bidirectional" strategy, see search.
+
+    A breadth-first search over states runs forward from the initial state, while a breadth-first regression
+    over plan suffixes (see CompiledSuffix) runs backward from the empty suffix. The regression only prepends
+    actions that add a fluent the suffix still requires. Always the side with the smaller layer is expanded
+    next. Every new state is joined with all suffixes found so far and vice versa: a state and a suffix join if
+    the suffix is applicable in the state and leads to a state that satisfies the goal condition. As every goal
+    state joins with the empty suffix, the forward search on its own is exhaustive and the search is complete.
+    """
+    preMasks = domain.preMasks
+    addMasks = domain.addMasks
+    delMasks = domain.delMasks
+    allFluents = (1 << len(domain.fluents)) - 1
+
+    # a suffix is indexed by a single fluent that is necessary for a join: a fluent that has to be in Fplus of the
+    # state, otherwise a fluent that must not be in Fminus of the state (suffixes without any requirement are kept
+    # in a list). Accordingly, every state is indexed by all fluents in Fplus and all fluents not in Fminus.
+    statesByPlus = {}
+    statesByNotMinus = {}
+    allStates = []
+    suffixesByPlus = {}
+    suffixesByNotMinus = {}
+    unconditionalSuffixes = []
+
+    def joins(state, suffix):
+        if maxPathLimit != -1 and state.depth + suffix.depth > maxPathLimit:
+            return False
+        Fplus = state.Fplus
+        Fminus = state.Fminus
+        if suffix.requiredMinus & Fminus or pre & ~suffix.plusAdd & ~Fplus:
+            return False
+        F0 = state.F0 | (suffix.requiredPlus & ~Fplus)
+        return F0 & ((Fminus & ~suffix.minusDel) | suffix.minusAdd) == 0
+
+    def join(state, suffix):
+        """Applies the actions of the suffix to the state and returns the resulting (goal) state."""
+        for aa in suffix.plan():
+            state = CompiledState(
+                (state.Fplus & ~delMasks[aa]) | addMasks[aa],
+                (state.Fminus & ~addMasks[aa]) | delMasks[aa],
+                state.F0 | (preMasks[aa] & ~state.Fplus),
+                parent=state,
+                actionIndex=aa
+            )
+        return state
+
+    def addState(state):
+        """Indexes a new state and returns the goal states obtained by joining it with the known suffixes."""
+        allStates.append(state)
+        candidates = list(unconditionalSuffixes)
+        for f in bitIndices(state.Fplus):
+            statesByPlus.setdefault(f, []).append(state)
+            candidates += suffixesByPlus.get(f, ())
+        for f in bitIndices(allFluents & ~state.Fminus):
+            statesByNotMinus.setdefault(f, []).append(state)
+            candidates += suffixesByNotMinus.get(f, ())
+        return [join(state, suffix) for suffix in candidates if joins(state, suffix)]
+
+    def addSuffix(suffix):
+        """Indexes a new suffix and returns the goal states obtained by joining it with the known states."""
+        required = pre & ~suffix.plusAdd
+        if required:
+            f = required.bit_length() - 1
+            suffixesByPlus.setdefault(f, []).append(suffix)
+            candidates = statesByPlus.get(f, ())
+        elif suffix.requiredMinus:
+            f = suffix.requiredMinus.bit_length() - 1
+            suffixesByNotMinus.setdefault(f, []).append(suffix)
+            candidates = statesByNotMinus.get(f, ())
+        else:
+            unconditionalSuffixes.append(suffix)
+            candidates = allStates
+        return [join(state, suffix) for state in candidates if joins(state, suffix)]
+
+    def updatePeaks(remaining):
+        """Updates the peak statistics, given the number of states or suffixes of the current layer not expanded yet."""
+        frontier = remaining + len(stateLayer) + len(suffixLayer)
+        if frontier > stats.peakFrontier:
+            stats.peakFrontier = frontier
+        stats.peakClosed = len(explored) + len(exploredSuffixes)
+
+    emptySuffix = CompiledSuffix(0, 0, 0, 0, 0, 0)
+    explored = {initState.key()}
+    exploredSuffixes = {emptySuffix.key()}
+    stateLayer = [initState]
+    suffixLayer = [emptySuffix]
+    yield from addState(initState)
+    yield from addSuffix(emptySuffix)
+
+    while stateLayer:
+        if suffixLayer and len(suffixLayer) < len(stateLayer):
+            layer = suffixLayer
+            suffixLayer = []
+            for i, suffix in enumerate(layer):
+                suffix = suffix  # type: CompiledSuffix
+                if budget.exhausted():
+                    stats.budgetExhausted = True
+                    return
+                if maxPathLimit != -1 and suffix.depth >= maxPathLimit:
+                    stats.depthLimitPruned += 1
+                    continue
+
+                stats.expanded += 1
+                required = (pre & ~suffix.plusAdd) | suffix.requiredPlus
+                for aa in bitIndices(domain.achievingActions(required) & allowedActions):
+                    add = addMasks[aa]
+                    dele = delMasks[aa]
+                    # the deleted fluents would make the suffix inapplicable
+                    if dele & suffix.requiredMinus:
+                        continue
+                    plusDel = suffix.plusDel | (dele & ~add & ~suffix.plusAdd)
+                    # the suffix would delete a fluent of pre_a(action) for good
+                    if plusDel & pre:
+                        continue
+
+                    newSuffix = CompiledSuffix(
+                        suffix.plusAdd | (add & ~suffix.plusDel),
+                        plusDel,
+                        suffix.minusAdd | (dele & ~suffix.minusDel),
+                        suffix.minusDel | (add & ~dele & ~suffix.minusAdd),
+                        preMasks[aa] | (suffix.requiredPlus & ~add),
+                        preMasks[aa] | (suffix.requiredMinus & ~(add & ~dele)),
+                        child=suffix,
+                        actionIndex=aa
+                    )
+                    newKey = newSuffix.key()
+                    if newKey not in exploredSuffixes:
+                        exploredSuffixes.add(newKey)
+                        suffixLayer.append(newSuffix)
+                        stats.generated += 1
+                        yield from addSuffix(newSuffix)
+                    else:
+                        stats.duplicatePruned += 1
+
+                updatePeaks(len(layer) - i - 1)
+                if callback is not None and stats.expanded % callbackInterval == 0:
+                    callback(stats, stateLayer)
+        else:
+            layer = stateLayer
+            stateLayer = []
+            for i, state in enumerate(layer):
+                state = state  # type: CompiledState
+                if budget.exhausted():
+                    stats.budgetExhausted = True
+                    return
+                if maxPathLimit != -1 and state.depth >= maxPathLimit:
+                    stats.depthLimitPruned += 1
+                    continue
+
+                Fplus = state.Fplus
+                Fminus = state.Fminus
+                F0 = state.F0
+
+                stats.expanded += 1
+                for aa in bitIndices(applicableActions(state)):
+                    newFplus = (Fplus & ~delMasks[aa]) | addMasks[aa]
+                    newFminus = (Fminus & ~addMasks[aa]) | delMasks[aa]
+                    newF0 = F0 | (preMasks[aa] & ~Fplus)
+
+                    # do not consider actions that do not modify the current state
+                    if newF0 == F0 and newFplus == Fplus and newFminus == Fminus:
+                        stats.noopPruned += 1
+                        continue
+
+                    newKey = (newFplus, newFminus, newF0)
+                    if newKey not in explored:
+                        explored.add(newKey)
+                        newState = CompiledState(newFplus, newFminus, newF0, parent=state, actionIndex=aa)
+                        stateLayer.append(newState)
+                        stats.generated += 1
+                        yield from addState(newState)
+                    else:
+                        stats.duplicatePruned += 1
+
+                updatePeaks(len(layer) - i - 1)
+                if callback is not None and stats.expanded % callbackInterval == 0:
+                    callback(stats, layer[i + 1:] + stateLayer)
+
+
+def algorithm(action, actions, strategy, maxPathLimit=-1, stats=None):
+    """
+    This function follows the definition of Algorithm 1 from the paper
+    
+    M. Morak, L. Chrpa, W. Faber, and D. Fiser,
+    "On the reversibility of actions in planning"
+    in Proceedings of the 17th International Conference on
+    Principles of Knowledge Representation and Reasoning, KR 2020,
+    Rhodes, Greece, September 12-18, 2020,
+    D. Calvanese, E. Erdem, and M. Thielscher, Eds.,
+    2020, pp. 652–661.
+
+    The domain is compiled into a bitset representation first (see domainCompiler.compileDomain) and the
+    search itself is carried out by the search function. States are only decoded once they are yielded.
+
+    :param action: the to be reversed action
+    :param actions: all actions present in the domain
+    :param strategy: "dfs" for depth-first search, "bfs" for breadth-first search, one of the heuristic
+        strategies "gbfs" and "astar", or "bidirectional" (see search)
+    :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
+    :param stats: optional SearchStats object, which is updated during the compilation, search and decoding
+    :return: a generator, which yields states that resemble valid reverse plans.
+    """
+    if stats is None:
+        stats = SearchStats()
+
+    start = time.perf_counter()
+    domain = compileDomain(actions)
+    stats.compileTime += time.perf_counter() - start
+    actionIndex = [i for i, aa in enumerate(actions) if aa is action][0]
+
+    for state in search(domain, actionIndex, strategy, maxPathLimit=maxPathLimit, stats=stats):
+        start = time.perf_counter()
+        decoded = state.decode(domain)
+        stats.decodeTime += time.perf_counter() - start
+        yield decoded
+
+
+def find_rev(domainPathStr, reversibleActionName, strategy, maxPathLimit=-1, findSingleSolution=True,
+             cacheDir=DEFAULT_CACHE_DIR, closedList="exact", memoryLimit=-1, printStats=False, preprocess=False):
     """
     Wrapper for the above algorithm function for computing the reversibility.
+    The domain is loaded by domainCache.loadCachedDomain, which directly provides the compiled domain used by search.
 
     :param domainPathStr: Path to the PDDL domain file
-    :param strategy: "dfs" for depth-first search or "bfs" for breadth-first search
+    :param strategy: "dfs", "bfs", "gbfs", "astar", or "bidirectional" (see search)
     :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
     :param reversibleActionName: name of the action to be reversed
     :param findSingleSolution: whether a single solution or all solutions should be computed
+    :param cacheDir: folder of the compiled domain cache (see domainCache.loadCachedDomain), None to disable it
+    :param closedList: "exact", "fingerprint", or "bloom" (see search)
+    :param memoryLimit: -1 for no limit, otherwise the search is aborted once the process uses this many MB
+    :param printStats: whether the statistics of the search (see SearchStats) are printed as a JSON line at the end
+    :param preprocess: whether irrelevant and unreachable actions are removed before the search (see preprocessActions),
+        such that reverse plans containing them are not enumerated anymore
     """
-    parser = PDDL_Parser()
+    actionFound = False
+    stats = SearchStats()
 
     try:
-        parser.parse_domain(domainPathStr)
+        start = time.perf_counter()
+        domain = loadCachedDomain(domainPathStr, cacheDir=cacheDir)
+        stats.parseTime = time.perf_counter() - start
 
-        actionFound = False
-        for action in parser.actions:
-            if action.name != reversibleActionName:
-                continue
+        actionIndex = domain.actionIndex(reversibleActionName)
+        if actionIndex != -1:
             actionFound = True
             print(f"Computing a reverse plan for action \"{reversibleActionName}\" ... ", end="")
 
-            generator = algorithm(
-                action,
-                parser.actions,
+            generator = search(
+                domain,
+                actionIndex,
                 strategy,
-                maxPathLimit=maxPathLimit
+                maxPathLimit=maxPathLimit,
+                stats=stats,
+                closedList=closedList,
+                memoryLimit=memoryLimit,
+                preprocess=preprocess
             )
             print("I have found the following solutions:")
             for state in generator:
-                state.print()
+                start = time.perf_counter()
+                decoded = state.decode(domain)
+                stats.decodeTime += time.perf_counter() - start
+                decoded.print()
                 print()
                 if findSingleSolution:
                     print("I wont look for further solutions, because \"findSingleSolution\" is enabled")
                     break
+            if stats.provenIrreversible:
+                print("The action is not reversible, as no reachable action restores its preconditions")
+            if stats.budgetExhausted:
+                print(f"Search aborted, because the memory budget of {memoryLimit} MB is exhausted "
+                      f"(expanded: {stats.expanded}, generated: {stats.generated})")
     except Exception as e:
         print(
             f"Computation aborted due to problems encountered while parsing domain {domainPathStr}!")
@@ -167,8 +839,138 @@ def find_rev(domainPathStr, reversibleActionName, strategy, maxPathLimit=-1, fin
     if not actionFound:
         print(
             f"Could not find action \"\{reversibleActionName}\" in domain {domainPathStr}")
+    elif printStats:
+        print(stats.toJson())
+
+
+def reverseAction(domain, actionIndex, strategy, maxPathLimit=-1, closedList="exact", memoryLimit=-1, preprocess=False):
+    """
+    Searches for a single reverse plan of an action of a compiled domain.
+
+    :param domain: the compiled domain, see domainCompiler.compileDomain
+    :param actionIndex: index of the to be reversed action in the compiled domain
+    :param strategy: "dfs", "bfs", "gbfs", "astar", or "bidirectional" (see search)
+    :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
+    :param closedList: "exact", "fingerprint", or "bloom" (see search)
+    :param memoryLimit: -1 for no limit, otherwise the search is aborted once the process uses this many MB
+    :param preprocess: whether irrelevant and unreachable actions are removed before the search (see preprocessActions)
+    :return: a result record (dict) stating whether a reverse plan has been found and, if so, the plan itself
+        (reversible is None if no plan has been found, but the memory budget has been exhausted before, in which case
+        budgetExhausted is set, or a compact closed list may have pruned it)
+    """
+    stats = SearchStats()
+    state = next(search(domain, actionIndex, strategy, maxPathLimit=maxPathLimit, stats=stats,
+                        closedList=closedList, memoryLimit=memoryLimit, preprocess=preprocess), None)
+    unknown = state is None and (stats.budgetExhausted or closedList != "exact")
+    record = {
+        "action": domain.actionNames[actionIndex],
+        "strategy": strategy,
+        "maxPathLimit": maxPathLimit,
+        "reversible": None if unknown else state is not None,
+        "planLength": -1,
+        "plan": [],
+        "budgetExhausted": stats.budgetExhausted,
+        "stats": stats.toDict()
+    }
+    if state is not None:
+        plan = state.plan()
+        record["planLength"] = len(plan)
+        record["plan"] = [domain.actionNames[i] for i in plan]
+    return record
+
+
+# compiled domain shared (read-only) by the worker processes of reverseAll
+_sharedDomain = None
+
+
+def _initWorker(domain):
+    global _sharedDomain
+    _sharedDomain = domain
+
+
+def _reverseActionWorker(args):
+    actionIndex, strategy, maxPathLimit, closedList, memoryLimit, preprocess = args
+    return reverseAction(_sharedDomain, actionIndex, strategy, maxPathLimit=maxPathLimit, closedList=closedList,
+                         memoryLimit=memoryLimit, preprocess=preprocess)
+
+
+def reverseAll(domain, strategy, actionIndices=None, maxPathLimit=-1, processes=1, closedList="exact", memoryLimit=-1,
+               preprocess=False):
+    """
+    Checks the reversibility of several actions of the same compiled domain.
+    All runs share the compiled domain and its precomputed indices.
+
+    :param domain: the compiled domain, see domainCompiler.compileDomain
+    :param strategy: "dfs", "bfs", "gbfs", "astar", or "bidirectional" (see search)
+    :param actionIndices: indices of the to be reversed actions, None for all actions of the domain
+    :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
+    :param processes: number of worker processes, 1 runs all searches in the current process
+    :param closedList: "exact", "fingerprint", or "bloom" (see search)
+    :param memoryLimit: -1 for no limit, otherwise every search is aborted once its process uses this many MB
+    :param preprocess: whether irrelevant and unreachable actions are removed before every search
+    :return: a generator, which yields one result record (see reverseAction) per action in the given order
+    """
+    if actionIndices is None:
+        actionIndices = range(len(domain.actionNames))
+
+    if processes <= 1:
+        for actionIndex in actionIndices:
+            yield reverseAction(domain, actionIndex, strategy, maxPathLimit=maxPathLimit, closedList=closedList,
+                                memoryLimit=memoryLimit, preprocess=preprocess)
+        return
+
+    import multiprocessing
+    with multiprocessing.Pool(processes, initializer=_initWorker, initargs=(domain,)) as pool:
+        jobs = [(actionIndex, strategy, maxPathLimit, closedList, memoryLimit, preprocess) for actionIndex in actionIndices]
+        for record in pool.imap(_reverseActionWorker, jobs):
+            yield record
+
+
+def find_rev_all(domainPathStr, strategy, actionNames=None, maxPathLimit=-1, processes=1, cacheDir=DEFAULT_CACHE_DIR,
+                 closedList="exact", memoryLimit=-1, preprocess=False):
+    """
+    Batch variant of find_rev: the domain is loaded only once and the reversibility of all
+    actions (or of the given ones) is computed. One result record is printed per action as a JSON line.
+
+    :param domainPathStr: Path to the PDDL domain file
+    :param strategy: "dfs", "bfs", "gbfs", "astar", or "bidirectional" (see search)
+    :param actionNames: names of the actions to be reversed (list or comma separated string), None for all actions
+    :param maxPathLimit: -1 for no limit, otherwise the algorithm wont explore paths exceeding this limit
+    :param processes: number of worker processes used to spread the actions across cores
+    :param cacheDir: folder of the compiled domain cache (see domainCache.loadCachedDomain), None to disable it
+    :param closedList: "exact", "fingerprint", or "bloom" (see search)
+    :param memoryLimit: -1 for no limit, otherwise every search is aborted once its process uses this many MB
+    :param preprocess: whether irrelevant and unreachable actions are removed before every search
+    """
+    try:
+        domain = loadCachedDomain(domainPathStr, cacheDir=cacheDir)
+    except Exception as e:
+        print(
+            f"Computation aborted due to problems encountered while parsing domain {domainPathStr}!")
+        print(e)
+        return
+
+    if actionNames is None:
+        actionIndices = list(range(len(domain.actionNames)))
+    else:
+        if isinstance(actionNames, str):
+            actionNames = actionNames.split(",")
+        actionIndices = []
+        for actionName in actionNames:
+            actionIndex = domain.actionIndex(actionName)
+            if actionIndex == -1:
+                print(f"Could not find action \"{actionName}\" in domain {domainPathStr}")
+                continue
+            actionIndices.append(actionIndex)
+
+    for record in reverseAll(domain, strategy, actionIndices, maxPathLimit=maxPathLimit, processes=processes,
+                             closedList=closedList, memoryLimit=memoryLimit, preprocess=preprocess):
+        print(json.dumps(record), flush=True)
 
 
 if __name__ == "__main__":
     import fire
-    fire.Fire(find_rev)
+    if len(sys.argv) > 1 and sys.argv[1] == "find_rev_all":
+        fire.Fire(find_rev_all, command=sys.argv[2:])
+    else:
+        fire.Fire(find_rev)
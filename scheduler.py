@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sys
+import time
+from collections import deque
+
+
+class Job:
+    """
+    A single unit of work for runJobs.
+
+    Jobs sharing the same series are expected to become more difficult in the order in which they are passed to
+    runJobs. If stopSeriesOnFailure is set, the first failing job of a series causes all later jobs of the same
+    series to be skipped, no matter in which order the jobs actually finish.
+    """
+
+    def __init__(self, args, series=None, stopSeriesOnFailure=False, cachedResult=None):
+        """
+        :param args: tuple of arguments passed to the worker function
+        :param series: hashable identifier of the series the job belongs to, None if the job is independent
+        :param stopSeriesOnFailure: whether a failure of this job skips all later jobs of its series
+        :param cachedResult: result of a previous run of this job, if given the job is not run again
+        """
+        self.args = args
+        self.series = series
+        self.stopSeriesOnFailure = stopSeriesOnFailure
+        self.cachedResult = cachedResult
+        self.index = -1
+
+
+def _descendants(pid):
+    """Returns the pids of all (transitive) child processes of the given process (Linux only)."""
+    result = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            tids = os.listdir(f"/proc/{current}/task")
+        except (FileNotFoundError, PermissionError):
+            continue
+        for tid in tids:
+            try:
+                with open(f"/proc/{current}/task/{tid}/children") as f:
+                    children = [int(child) for child in f.read().split()]
+            except (FileNotFoundError, PermissionError):
+                continue
+            result += children
+            stack += children
+    return result
+
+
+def killProcessTree(pid):
+    """
+    Kills the process group of the given process as well as the process groups of all its descendants, which
+    covers children that moved into process groups or sessions of their own (e.g. via os.setsid).
+    """
+    ownGroup = os.getpgid(0)
+    for p in _descendants(pid) + [pid]:
+        try:
+            group = os.getpgid(p)
+            if group == ownGroup:
+                # the process has not moved into a process group of its own (yet)
+                os.kill(p, signal.SIGKILL)
+            else:
+                os.killpg(group, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def _runInChild(worker, args, cpu, conn):
+    # every job gets its own process group, such that it can be killed together with its children
+    os.setsid()
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    try:
+        conn.send(("done", worker(*args)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def runJobs(jobs, worker, isFailure, concurrency=1, hardTimeout=None, pinCpus=False):
+    """
+    Runs worker(*job.args) for all given jobs in a pool of worker processes.
+
+    Every job runs in a forked process of its own process group. Jobs exceeding hardTimeout seconds are killed
+    together with all their child processes. If pinCpus is set, every running job is pinned to a dedicated CPU,
+    such that concurrent jobs do not distort each other's timings (the concurrency is limited to the number of
+    available CPUs in that case).
+
+    Results are yielded as soon as possible, but within a series always in the order of the given jobs. Once a job
+    of a series with stopSeriesOnFailure fails, all later jobs of this series are skipped: pending ones are not
+    started, running ones are killed, and finished ones are discarded. Once the generator is closed, all running jobs
+    are killed.
+
+    :param jobs: list of Job objects
+    :param worker: function executed for every job (module level function, it is not pickled)
+    :param isFailure: function deciding whether the result of the worker is a failure
+    :param concurrency: maximal number of jobs running at the same time
+    :param hardTimeout: number of seconds after which a job is killed, None for no limit
+    :param pinCpus: whether every job is pinned to a dedicated CPU
+    :return: a generator, which yields (job, status, result) triples, where status is one of "done" (result holds
+        the return value of the worker), "cached" (result holds the cachedResult of the job, which has not been run
+        again), "error" (result describes the exception raised by the worker or the crash of the process), "killed"
+        (hard timeout) and "skipped" (result is None for the last two)
+    """
+    context = multiprocessing.get_context("fork")
+
+    freeCpus = None
+    if pinCpus:
+        freeCpus = sorted(os.sched_getaffinity(0))
+        concurrency = min(concurrency, len(freeCpus))
+    concurrency = max(1, concurrency)
+
+    # per series: number of jobs, index of the next job to be yielded, buffered outcomes,
+    # and the index of the first failed job (cutoff)
+    seriesSize = {}
+    for job in jobs:
+        job.index = seriesSize.get(job.series, 0)
+        seriesSize[job.series] = job.index + 1
+    nextIndex = {series: 0 for series in seriesSize}
+    buffered = {series: {} for series in seriesSize}
+    cutoff = {series: size for series, size in seriesSize.items()}
+
+    pending = deque(jobs)
+    running = {}
+
+    def cancelled(job):
+        return job.series is not None and job.index > cutoff[job.series]
+
+    def finish(job, status, result):
+        """Buffers the outcome of a job and yields all outcomes of its series that are ready."""
+        if job.series is None:
+            yield (job, status, result)
+            return
+
+        failed = status in ("error", "killed") or (status in ("done", "cached") and isFailure(result))
+        if job.stopSeriesOnFailure and failed and job.index < cutoff[job.series]:
+            cutoff[job.series] = job.index
+            for j in [j for j in buffered[job.series] if j > job.index]:
+                buffered[job.series][j] = (buffered[job.series][j][0], "skipped", None)
+            for runningJob, process, _, _ in running.values():
+                if runningJob.series == job.series and runningJob.index > job.index:
+                    killProcessTree(process.pid)
+
+        if job.index > cutoff[job.series]:
+            (status, result) = ("skipped", None)
+        buffered[job.series][job.index] = (job, status, result)
+        while nextIndex[job.series] in buffered[job.series]:
+            yield buffered[job.series].pop(nextIndex[job.series])
+            nextIndex[job.series] += 1
+
+    try:
+        while pending or running:
+            while pending and len(running) < concurrency:
+                job = pending.popleft()
+                if cancelled(job):
+                    yield from finish(job, "skipped", None)
+                    continue
+                if job.cachedResult is not None:
+                    yield from finish(job, "cached", job.cachedResult)
+                    continue
+                cpu = freeCpus.pop(0) if freeCpus is not None else None
+                parentConn, childConn = context.Pipe(duplex=False)
+                process = context.Process(target=_runInChild, args=(worker, job.args, cpu, childConn))
+                # do not let the child inherit (and print again) buffered output of this process
+                sys.stdout.flush()
+                sys.stderr.flush()
+                process.start()
+                childConn.close()
+                deadline = None if hardTimeout is None else time.monotonic() + hardTimeout
+                running[parentConn] = (job, process, cpu, deadline)
+            if not running:
+                # all remaining jobs have been skipped or were cached
+                continue
+
+            deadlines = [deadline for (_, _, _, deadline) in running.values() if deadline is not None]
+            waitTimeout = None if not deadlines else max(0, min(deadlines) - time.monotonic())
+            ready = multiprocessing.connection.wait(list(running.keys()), timeout=waitTimeout)
+
+            now = time.monotonic()
+            for conn in list(running.keys()):
+                job, process, cpu, deadline = running[conn]
+                if conn in ready:
+                    try:
+                        status, result = conn.recv()
+                    except EOFError:
+                        status, result = ("error", "process exited without a result")
+                elif deadline is not None and now >= deadline:
+                    killProcessTree(process.pid)
+                    status, result = ("killed", None)
+                else:
+                    continue
+
+                del running[conn]
+                conn.close()
+                process.join()
+                if cpu is not None:
+                    freeCpus.append(cpu)
+                    freeCpus.sort()
+                yield from finish(job, status, result)
+    finally:
+        # the consumer stopped early (e.g. closed the generator), running jobs are not needed anymore
+        for conn, (job, process, cpu, deadline) in running.items():
+            killProcessTree(process.pid)
+            process.join()
+            conn.close()
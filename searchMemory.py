@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import hashlib
+import math
+import os
+import resource
+import sys
+from array import array
+
+# kinds of closed lists supported by reversible.search:
+#   exact:       the full (Fplus, Fminus, F0) keys of all explored states
+#   fingerprint: 64 bit fingerprints of the keys only (hash compaction), a collision wrongly prunes a state
+#   bloom:       a Bloom filter over the fingerprints, a false positive wrongly prunes a state
+# as both compact closed lists may prune unexplored states, only the exact one proves that there is no reverse plan
+CLOSED_LISTS = ["exact", "fingerprint", "bloom"]
+
+# number of states and false positive rate the Bloom filter is sized for, it grows once more states are added
+DEFAULT_EXPECTED_STATES = 1 << 20
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+_BITS = [1 << i for i in range(64)]
+
+
+def _wordMask(h):
+    """Returns the six bits of a 64 bit word selected by the lower 36 bits of h (see BloomFilter)."""
+    return _BITS[h & 63] | _BITS[h >> 6 & 63] | _BITS[h >> 12 & 63] | _BITS[h >> 18 & 63] | _BITS[h >> 24 & 63] | \
+        _BITS[h >> 30 & 63]
+
+
+def fingerprint(key):
+    """
+    Returns a 64 bit fingerprint of the given state key, i.e. a tuple of fluent masks (like (Fplus, Fminus, F0)).
+    The fingerprint is a blake2b digest of the masks, as the built-in hash of an int is only computed modulo
+    2^61 - 1, such that masks differing in the fluents i and i + 61 would always collide.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for mask in key:
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        # the length separates the masks, e.g. (1, 0) from (0, 1)
+        digest.update(len(data).to_bytes(4, "little"))
+        digest.update(data)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class BloomFilter:
+    """
+    Blocked Bloom filter over 64 bit fingerprints, providing the add and "in" operations of a set. All six bits of
+    a fingerprint lie in the same 64 bit word, which is selected by its lower bits, while its next 36 bits select
+    the six bits within the word. Hence, a lookup costs a single word access instead of one per bit.
+
+    The filter is sized for an expected number of states and a false positive rate. Once it holds more states, a
+    further filter of twice the capacity and half the false positive rate is added (scalable Bloom filter), such
+    that the false positive rate of all filters together stays at about twice the given one.
+    """
+
+    def __init__(self, expectedStates=DEFAULT_EXPECTED_STATES, falsePositiveRate=DEFAULT_FALSE_POSITIVE_RATE):
+        """
+        :param expectedStates: number of states the first filter is sized for
+        :param falsePositiveRate: targeted false positive rate of the first filter
+        """
+        # the filter states are added to (words, index mask, number of index bits) and the full earlier ones
+        self.words = None
+        self.indexMask = 0
+        self.indexBits = 0
+        self.fullFilters = []
+        self.count = 0
+        self.capacity = 0
+        self.falsePositiveRate = falsePositiveRate
+        self.nextCapacity = max(1, expectedStates)
+        self._addFilter()
+        # bit mask of the last fingerprint in the current filter, as a lookup is usually followed by adding it
+        self.lastFingerprint = None
+        self.lastMask = 0
+
+    def _addFilter(self):
+        if self.words is not None:
+            self.fullFilters.append((self.words, self.indexMask, self.indexBits))
+        rate = self.falsePositiveRate / 2 ** len(self.fullFilters)
+        numBits = -self.nextCapacity * math.log(rate) / math.log(2) ** 2
+        # a power of two of words, such that the word index is a bit mask of the fingerprint
+        self.indexBits = min(28, max(0, math.ceil(math.log2(numBits / 64))))
+        self.indexMask = (1 << self.indexBits) - 1
+        self.words = array("Q", bytes(8 << self.indexBits))
+        self.capacity += self.nextCapacity
+        self.nextCapacity *= 2
+        self.lastFingerprint = None
+
+    def __contains__(self, fp):
+        mask = _wordMask(fp >> self.indexBits)
+        if self.words[fp & self.indexMask] & mask == mask:
+            return True
+        for words, indexMask, indexBits in self.fullFilters:
+            fullMask = _wordMask(fp >> indexBits)
+            if words[fp & indexMask] & fullMask == fullMask:
+                return True
+        self.lastFingerprint = fp
+        self.lastMask = mask
+        return False
+
+    def add(self, fp):
+        mask = self.lastMask if fp == self.lastFingerprint else _wordMask(fp >> self.indexBits)
+        self.words[fp & self.indexMask] |= mask
+        self.count += 1
+        if self.count >= self.capacity:
+            self._addFilter()
+
+    def __len__(self):
+        return self.count
+
+
+def newClosedList(kind, expectedStates=DEFAULT_EXPECTED_STATES, falsePositiveRate=DEFAULT_FALSE_POSITIVE_RATE):
+    """
+    Creates an empty closed list of the given kind.
+
+    :param kind: one of CLOSED_LISTS
+    :param expectedStates: number of states a Bloom filter is sized for (see BloomFilter)
+    :param falsePositiveRate: targeted false positive rate of a Bloom filter
+    :return: a pair of the closed list (supporting add and "in") and whether keys have to be fingerprinted first
+    """
+    if kind == "exact":
+        return (set(), False)
+    if kind == "fingerprint":
+        return (set(), True)
+    if kind == "bloom":
+        return (BloomFilter(expectedStates, falsePositiveRate), True)
+    raise ValueError(f"Unknown closed list \"{kind}\", expected one of {', '.join(CLOSED_LISTS)}")
+
+
+def memoryUsage():
+    """Returns the current resident set size of the process in MB (the peak resident set size if the current one
+    is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            residentPages = int(f.read().split()[1])
+        return residentPages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kbytes on Linux, bytes on macOS
+        return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class MemoryBudget:
+    """
+    Memory ceiling of a search. As querying the memory usage is comparatively expensive, it is only
+    checked every checkInterval calls of exhausted.
+    """
+
+    def __init__(self, memoryLimit=-1, checkInterval=1024):
+        """
+        :param memoryLimit: memory limit in MB, -1 for no limit
+        :param checkInterval: number of calls of exhausted between two checks of the memory usage
+        """
+        self.memoryLimit = memoryLimit
+        self.checkInterval = checkInterval
+        self.calls = 0
+
+    def exhausted(self):
+        """Returns whether the memory usage of the process has reached the memory limit."""
+        if self.memoryLimit == -1:
+            return False
+        self.calls += 1
+        if self.calls < self.checkInterval:
+            return False
+        self.calls = 0
+        return memoryUsage() >= self.memoryLimit
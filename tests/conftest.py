@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the modules of the repository are not installed, but imported from its root folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,27 @@
+import random
+
+import domainGenerator
+from domainCompiler import CompiledAction, compileDomain
+
+
+def randomModel(seed, numFluents=6, numActions=10):
+    """A random STRIPS domain, whose actions enter and leave Fminus in arbitrary combinations."""
+    rng = random.Random(seed)
+    fluents = [(f"f{j}",) for j in range(numFluents)]
+
+    def sample():
+        return frozenset(rng.sample(fluents, rng.randint(0, 3)))
+
+    return compileDomain([CompiledAction(f"a{i}", sample(), sample(), sample()) for i in range(numActions)])
+
+
+def searchCases(numRandomDomains):
+    """Pairs of a domain and an action to be reversed: del-all of small generator models, and every action of
+    numRandomDomains random domains (see randomModel)."""
+    generated = [domainGenerator.singlePathModel(8), domainGenerator.multiplePathsModel(5),
+                 domainGenerator.multiplePathsDeadEndsModel(5), domainGenerator.generalizedModel(2, 3, 4, 3),
+                 domainGenerator.barabasiAlbertLongestShortestPathModel(40, 1)[1]]
+    cases = [(domain, domain.actionIndex("del-all")) for domain in generated]
+    cases += [(domain, actionIndex) for domain in map(randomModel, range(numRandomDomains))
+              for actionIndex in range(len(domain.actionNames))]
+    return cases
@@ -0,0 +1,24 @@
+import pytest
+
+import domainGenerator
+from models import randomModel
+from reversible import search
+
+MODELS = [domainGenerator.singlePathModel(6), domainGenerator.multiplePathsModel(4),
+          domainGenerator.multiplePathsDeadEndsModel(4), domainGenerator.generalizedModel(2, 3, 2, 3)]
+MODELS += [randomModel(seed) for seed in range(20)]
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+def test_applicable_actions_match_a_scan_of_all_preconditions(strategy):
+    for domain in MODELS:
+        def check(stats, openStates):
+            # the last open state is a successor of the state expanded last, whose applicable actions are computed
+            if openStates:
+                parent = openStates[-1].parent
+                scanned = sum(1 << a for a, preMask in enumerate(domain.preMasks) if preMask & parent.Fminus == 0)
+                assert parent.applicable == scanned
+
+        for actionIndex in range(len(domain.actionNames)):
+            for _ in search(domain, actionIndex, strategy, callback=check, callbackInterval=1):
+                pass
@@ -0,0 +1,61 @@
+import pytest
+
+clingo = pytest.importorskip("clingo")
+
+from aspBackend import ClingoSession
+
+# a counter that has to reach the goal, i.e. the minimal horizon equals the goal
+INCREMENTAL_ENCODING = """
+#program base.
+at(0, 0).
+#program step(t).
+{ inc(t) }.
+at(t, X + 1) :- at(t - 1, X), inc(t).
+at(t, X) :- at(t - 1, X), not inc(t).
+#program check(t).
+#external query(t).
+:- query(t), goal(G), not at(t, G).
+"""
+
+FIXED_HORIZON_ENCODING = """
+time(1..horizon).
+at(0, 0).
+{ inc(T) } :- time(T).
+at(T, X + 1) :- at(T - 1, X), inc(T).
+at(T, X) :- at(T - 1, X), time(T), not inc(T).
+:- goal(G), not at(horizon, G).
+"""
+
+
+def _session(tmp_path, encoding):
+    encodingPath = tmp_path / "encoding.lp"
+    encodingPath.write_text(encoding)
+    instancePath = tmp_path / "instance.lp"
+    instancePath.write_text("goal(3).")
+    return ClingoSession(str(encodingPath), str(instancePath))
+
+
+def test_incremental_encoding_is_grounded_step_by_step(tmp_path):
+    session = _session(tmp_path, INCREMENTAL_ENCODING)
+    assert session.incremental
+
+    satisfiable = [session.solve(horizon)[0] for horizon in range(1, 5)]
+    assert satisfiable == [False, False, True, True]
+    assert session.groundedHorizon == 4
+
+    # the control of the first horizon has been reused for all further horizons
+    control = session.control
+    session.solve(5)
+    assert session.control is control
+    with pytest.raises(ValueError):
+        session.solve(2)
+
+
+def test_fixed_horizon_encoding_is_solved_from_scratch(tmp_path):
+    session = _session(tmp_path, FIXED_HORIZON_ENCODING)
+    assert not session.incremental
+
+    assert session.solve(2)[0] is False
+    control = session.control
+    assert session.solve(3)[0] is True
+    assert session.control is not control
@@ -0,0 +1,47 @@
+import json
+import random
+
+import pytest
+
+from benchmarkSuite import compare, holm, run
+
+
+def _write(path, measurements):
+    with open(path, "w") as f:
+        json.dump({"revision": None, "measurements": {
+            key: {"path": key, "approach": "bfs", "failures": failures, "runtimes": runtimes}
+            for key, (runtimes, failures) in measurements.items()
+        }}, f)
+    return str(path)
+
+
+def test_holm():
+    assert holm([0.01, 0.04, 0.03]) == pytest.approx([0.03, 0.06, 0.06])
+    assert holm([0.5, 0.9]) == pytest.approx([1.0, 1.0])
+
+
+def test_noise_is_not_flagged_across_many_comparisons(tmp_path):
+    rng = random.Random(0)
+    baseline = {f"domain{i}": ([rng.gauss(1, 0.1) for _ in range(5)], 0) for i in range(200)}
+    current = {f"domain{i}": ([rng.gauss(1, 0.1) for _ in range(5)], 0) for i in range(200)}
+    # a real slowdown
+    baseline["slow"] = ([1.0 + i / 100 for i in range(20)], 0)
+    current["slow"] = ([2.0 + i / 100 for i in range(20)], 0)
+
+    comparisons = compare(_write(tmp_path / "baseline.json", baseline), _write(tmp_path / "current.json", current))
+    verdicts = {comparison["path"]: comparison["verdict"] for comparison in comparisons}
+    assert verdicts.pop("slow") == "slowdown"
+    assert set(verdicts.values()) == {"unchanged"}
+
+
+def test_new_failures_are_regressions(tmp_path):
+    baseline = {"timeout": ([1.0] * 5, 0), "failing": ([1.0] * 5, 0), "stillFailing": ([], 5)}
+    current = {"timeout": ([1.0] * 4, 1), "failing": ([], 5), "stillFailing": ([], 5)}
+    comparisons = compare(_write(tmp_path / "baseline.json", baseline), _write(tmp_path / "current.json", current))
+    verdicts = {comparison["path"]: comparison["verdict"] for comparison in comparisons}
+    assert verdicts == {"timeout": "newFailures", "failing": "newFailures", "stillFailing": "failed"}
+
+
+def test_run_requires_a_repetition(tmp_path):
+    with pytest.raises(ValueError):
+        run(domainsFolder=str(tmp_path), warmup=0, repetitions=0, output=str(tmp_path / "suite.json"))
@@ -0,0 +1,39 @@
+import itertools
+
+import pytest
+
+from models import searchCases
+from reversible import search
+
+CASES = searchCases(150)
+
+
+def replay(domain, actionIndex, plan):
+    """Applies the plan to the initial state of the search with the forward semantics of Algorithm 1."""
+    pre = domain.preMasks[actionIndex]
+    Fplus = (pre & ~domain.delMasks[actionIndex]) | domain.addMasks[actionIndex]
+    Fminus = domain.delMasks[actionIndex]
+    F0 = 0
+    for aa in plan:
+        assert domain.preMasks[aa] & Fminus == 0, f"{domain.actionNames[aa]} is not applicable"
+        (Fplus, Fminus, F0) = ((Fplus & ~domain.delMasks[aa]) | domain.addMasks[aa],
+                               (Fminus & ~domain.addMasks[aa]) | domain.delMasks[aa],
+                               F0 | (domain.preMasks[aa] & ~Fplus))
+    return (Fplus, Fminus, F0)
+
+
+@pytest.mark.parametrize("maxPathLimit", [-1, 2, 4])
+def test_joined_plans_are_valid_reverse_plans(maxPathLimit):
+    for domain, actionIndex in CASES:
+        pre = domain.preMasks[actionIndex]
+        states = list(itertools.islice(search(domain, actionIndex, "bidirectional", maxPathLimit), 5))
+        for state in states:
+            plan = state.plan()
+            (Fplus, Fminus, F0) = replay(domain, actionIndex, plan)
+            assert pre & ~Fplus == 0 and F0 & Fminus == 0
+            assert (Fplus, Fminus, F0) == state.key()
+            assert maxPathLimit == -1 or len(plan) <= maxPathLimit
+
+        # a plan is found whenever bfs finds one within the maxPathLimit
+        bfsState = next(search(domain, actionIndex, "bfs", maxPathLimit), None)
+        assert bool(states) == (bfsState is not None)
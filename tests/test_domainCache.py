@@ -0,0 +1,72 @@
+import os
+
+import domainCache
+from domainCache import cachePath, loadCachedDomain
+
+DOMAIN = """(define (domain singlePath-2)
+(:requirements :strips)
+(:predicates (f0) (f1) (f2))
+(:action del-all
+:precondition (and (f0) (f1) (f2))
+:effect (and (not (f0)) (not (f1)) (not (f2))))
+(:action add-f0
+:effect (f0))
+(:action add-f1
+:precondition (f0)
+:effect (f1))
+(:action add-f2
+:precondition (f1)
+:effect (f2)))
+"""
+
+
+def _domainPath(tmp_path):
+    path = tmp_path / "0001-singlePath-2.pddl"
+    path.write_text(DOMAIN)
+    return str(path)
+
+
+def test_domain_is_cached(tmp_path):
+    path = _domainPath(tmp_path)
+    cacheDir = str(tmp_path / "cache")
+    domain = loadCachedDomain(path, cacheDir=cacheDir)
+    assert os.path.exists(cachePath(path, cacheDir))
+
+    cached = loadCachedDomain(path, cacheDir=cacheDir)
+    assert cached.actionNames == domain.actionNames
+    assert (cached.preMasks, cached.addMasks, cached.delMasks) == (domain.preMasks, domain.addMasks, domain.delMasks)
+
+
+def test_unwritable_cache_still_loads_the_domain(tmp_path, capsys):
+    path = _domainPath(tmp_path)
+    # a file in place of a folder, as permissions are not enforced for root
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")
+    domain = loadCachedDomain(path, cacheDir=str(blocked / "domains"))
+    assert domain.actionIndex("del-all") != -1
+    assert "Warning" in capsys.readouterr().err
+
+
+def test_cache_key_depends_on_the_compiler(tmp_path, monkeypatch):
+    path = _domainPath(tmp_path)
+    before = cachePath(path, str(tmp_path))
+    domainCache.compilerHash.cache_clear()
+    monkeypatch.setattr(domainCache, "_VERSION", domainCache._VERSION + 1)
+    try:
+        assert cachePath(path, str(tmp_path)) != before
+    finally:
+        domainCache.compilerHash.cache_clear()
+
+
+def test_evict_keeps_recently_used_files(tmp_path):
+    cacheDir = tmp_path / "cache"
+    cacheDir.mkdir()
+    old = cacheDir / "old.lp"
+    recent = cacheDir / "recent.lp"
+    for path in (old, recent):
+        path.write_bytes(b"x" * 100)
+    os.utime(old, (0, 0))
+
+    domainCache.evict(str(cacheDir), 50, -1, (".lp",), minCacheAge=3600)
+    assert not old.exists()
+    assert recent.exists()
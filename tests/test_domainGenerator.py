@@ -0,0 +1,100 @@
+import filecmp
+import os
+import random
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+import domainGenerator
+from domainLoader import loadDomain
+
+# domains written by the original generator, which built every domain as a single string, for the sweep below
+BASELINE_FOLDER = Path(__file__).resolve().parent / "data" / "domains"
+
+
+def _assertBaselineDomains(folder):
+    names = sorted(os.listdir(BASELINE_FOLDER))
+    assert sorted(os.listdir(folder)) == names
+    (_, mismatch, errors) = filecmp.cmpfiles(BASELINE_FOLDER, folder, names, shallow=False)
+    assert mismatch == [] and errors == []
+
+
+def test_generated_domains_match_the_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(domainGenerator, "domain_id", 0)
+    for domain in ["singlePath", "multiplePaths", "multiplePathsDeadEnds"]:
+        domainGenerator.generateStandardDomains(str(tmp_path), 1, 5, 2, domain)
+    domainGenerator.generateGeneralizedDomain(str(tmp_path), 2, 3, 2, 3)
+    domainGenerator.generateBarabasiAlbertDomains(str(tmp_path), 30, 1, "barabasiAlbertLongestShortestPath")
+    domainGenerator.generateBarabasiAlbertDomains(str(tmp_path), 30, 1, "barabasiAlbertDegree")
+    _assertBaselineDomains(tmp_path)
+
+
+
+def test_parallel_generation_matches_the_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(domainGenerator, "domain_id", 0)
+    planner = domainGenerator.DomainPlanner(str(tmp_path))
+    for domain in ["singlePath", "multiplePaths", "multiplePathsDeadEnds"]:
+        planner.standardDomains(1, 5, 2, domain)
+    planner.generalizedDomain(2, 3, 2, 3)
+    planner.barabasiAlbertDomains(30, 1, "barabasiAlbertLongestShortestPath")
+    planner.barabasiAlbertDomains(30, 1, "barabasiAlbertDegree")
+    # the ids are planned up front, hence the names do not depend on the order in which the workers finish
+    planner.run(processes=3)
+    _assertBaselineDomains(tmp_path)
+
+
+def _baselineGraph(n, m):
+    random.seed(246)
+    return nx.to_directed(nx.barabasi_albert_graph(m=m, n=n, seed=None))
+
+
+@pytest.mark.parametrize("n, m", [(30, 1), (100, 2), (250, 3)])
+def test_barabasi_albert_nodes_match_the_baseline(n, m):
+    # longest shortest path from node 0 along the edges u->v with u < v, one shortest path search per domain
+    G = _baselineGraph(n, m).copy()
+    G.remove_edges_from([(u, v) for (u, v) in G.edges if u > v])
+    longest = sorted(nx.single_source_shortest_path(G, 0).values(), key=len, reverse=True)[0]
+    (_, node_a, node_b, path_length) = domainGenerator.barabasiAlbertLongestShortestPathNodes(n, m)
+    assert (node_a, node_b, path_length) == (0, longest[-1], len(longest) - 1)
+
+    # the most connected node and up to ten of the next most connected nodes that are not its neighbours
+    G = _baselineGraph(n, m)
+    sortedNodes = sorted(G.degree, key=lambda x: x[1], reverse=True)
+    nodePairs = []
+    for (node_b, _) in sortedNodes[1:]:
+        pathLength = nx.shortest_path_length(G, sortedNodes[0][0], node_b)
+        if pathLength > 1 and len(nodePairs) < 10:
+            nodePairs.append((sortedNodes[0][0], node_b, pathLength))
+    (graph, node_pairs) = domainGenerator.barabasiAlbertDegreeNodePairs(n, m)
+    assert node_pairs == nodePairs
+
+    # the shared graph has not been modified by any of the domains
+    assert sorted(graph.edges) == sorted(nx.Graph(_baselineGraph(n, m)).edges)
+
+
+def _models():
+    models = {}
+    for i in range(1, 6, 2):
+        models[f"singlePath-{i}"] = domainGenerator.singlePathModel(i)
+        models[f"multiplePaths-{i}"] = domainGenerator.multiplePathsModel(i)
+        models[f"multiplePathsDeadEnds-{i}"] = domainGenerator.multiplePathsDeadEndsModel(i)
+    models["generalized-2-3-2-3-3"] = domainGenerator.generalizedModel(2, 3, 2, 3)
+    models.update([domainGenerator.barabasiAlbertLongestShortestPathModel(30, 1)])
+    models.update(domainGenerator.barabasiAlbertDegreeModels(30, 1))
+    return models
+
+
+def test_models_match_the_loaded_domains():
+    models = _models()
+    names = sorted(os.listdir(BASELINE_FOLDER))
+    # the names of the models lack the domain id
+    assert sorted(models) == sorted(name[len("0001-"):-len(".pddl")] for name in names)
+
+    for name in names:
+        domain = loadDomain(str(BASELINE_FOLDER / name))
+        model = models[name[len("0001-"):-len(".pddl")]]
+        assert model.actionNames == domain.actionNames, name
+        for masks, modelMasks in [(domain.preMasks, model.preMasks), (domain.addMasks, model.addMasks),
+                                  (domain.delMasks, model.delMasks)]:
+            assert [model.decode(mask) for mask in modelMasks] == [domain.decode(mask) for mask in masks], name
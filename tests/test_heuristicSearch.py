@@ -0,0 +1,26 @@
+import pytest
+
+from models import searchCases
+from reversible import search
+
+CASES = searchCases(60)
+
+
+def _planLength(domain, actionIndex, strategy, maxPathLimit=-1):
+    state = next(search(domain, actionIndex, strategy, maxPathLimit), None)
+    return None if state is None else len(state.plan())
+
+
+def test_astar_finds_shortest_plans():
+    for domain, actionIndex in CASES:
+        assert _planLength(domain, actionIndex, "astar") == _planLength(domain, actionIndex, "bfs")
+
+
+@pytest.mark.parametrize("strategy", ["gbfs", "astar"])
+@pytest.mark.parametrize("maxPathLimit", [0, 1, 3, 6])
+def test_heuristic_strategies_respect_the_max_path_limit(strategy, maxPathLimit):
+    for domain, actionIndex in CASES:
+        plans = [state.plan() for state in search(domain, actionIndex, strategy, maxPathLimit)]
+        assert all(len(plan) <= maxPathLimit for plan in plans)
+        # a plan within the limit is found whenever bfs finds one
+        assert bool(plans) == (_planLength(domain, actionIndex, "bfs", maxPathLimit) is not None)
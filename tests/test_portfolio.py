@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+import domainGenerator
+from portfolio import _runApproach
+
+
+def _run(domain, closedList, preprocess=False, horizon=-1):
+    return _runApproach("bfs", None, "del-all", horizon, 60, domain, closedList, -1, preprocess, time.perf_counter())
+
+
+def test_exhausted_search_with_exact_closed_list_is_definitive():
+    # without a successful plan, del-all cannot be reversed
+    domain = domainGenerator.generalizedModel(0, 4, 10, 4)
+    outcome = _run(domain, "exact")
+    assert outcome["reversible"] is False
+    assert outcome["definitive"] is True
+    # preprocessing proves the same without a search
+    assert _run(domain, "exact", preprocess=True)["definitive"] is True
+
+
+@pytest.mark.parametrize("closedList", ["fingerprint", "bloom"])
+def test_exhausted_search_with_compact_closed_list_is_not_definitive(closedList):
+    outcome = _run(domainGenerator.generalizedModel(0, 4, 10, 4), closedList)
+    assert outcome["reversible"] is False
+    assert outcome["definitive"] is False
+
+
+def test_exhausted_search_with_horizon_is_not_definitive():
+    assert _run(domainGenerator.generalizedModel(1, 4, 10, 4), "exact", horizon=2)["definitive"] is False
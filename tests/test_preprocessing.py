@@ -0,0 +1,31 @@
+import domainGenerator
+from models import searchCases
+from reversible import SearchStats, search
+
+CASES = searchCases(150)
+
+
+def _bfs(domain, actionIndex, preprocess):
+    stats = SearchStats()
+    state = next(search(domain, actionIndex, "bfs", stats=stats, preprocess=preprocess), None)
+    return (None if state is None else len(state.plan())), stats
+
+
+def test_preprocessing_preserves_reversibility_and_shortest_plans():
+    provenIrreversible = 0
+    for domain, actionIndex in CASES:
+        (planLength, _) = _bfs(domain, actionIndex, False)
+        (preprocessedPlanLength, stats) = _bfs(domain, actionIndex, True)
+        assert preprocessedPlanLength == planLength
+        # preprocessing only proves irreversibility if bfs finds no plan
+        if stats.provenIrreversible:
+            provenIrreversible += 1
+            assert planLength is None
+    assert provenIrreversible > 0
+
+
+def test_preprocessing_is_off_by_default():
+    domain = domainGenerator.multiplePathsDeadEndsModel(3)
+    stats = SearchStats()
+    next(search(domain, domain.actionIndex("del-all"), "bfs", stats=stats), None)
+    assert stats.removedActions == 0
@@ -0,0 +1,74 @@
+import sys
+import time
+
+from processRunner import runProcess
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def _isRunning(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # zombies have been killed, but not been reaped yet
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_successful_run_is_measured():
+    result = runProcess(_python("print('reversible'); x = bytearray(50 * 1024 * 1024)"), timeout=30)
+    assert (result.status, result.returncode) == ("success", 0)
+    assert result.output.strip() == "reversible"
+    assert result.wallTime > 0
+    # the peak RSS of the child in kbytes, not the one of this process
+    assert result.maxRss >= 50 * 1024
+
+
+def test_exit_code_is_reported_as_crash():
+    result = runProcess(_python("import sys; sys.exit(3)"), timeout=30)
+    assert (result.status, result.returncode) == ("crash", 3)
+    assert runProcess(_python("import sys; sys.exit(3)"), timeout=30, successCodes=(0, 3)).status == "success"
+
+
+def test_timeout_terminates_the_process():
+    start = time.perf_counter()
+    result = runProcess(["sleep", "30"], timeout=0.5)
+    assert result.status == "timeout"
+    assert time.perf_counter() - start < 5
+
+
+def test_timeout_kills_the_process_group_after_the_grace_period(tmp_path):
+    # the child ignores SIGTERM and starts a grandchild in the same process group
+    pidPath = tmp_path / "grandchild.pid"
+    code = ("import signal, subprocess, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+            f"child = subprocess.Popen(['sleep', '30']); open({str(pidPath)!r}, 'w').write(str(child.pid)); "
+            "time.sleep(30)")
+    start = time.perf_counter()
+    result = runProcess(_python(code), timeout=1, killGracePeriod=0.5)
+    assert result.status == "timeout"
+    assert time.perf_counter() - start < 10
+
+    grandchild = int(pidPath.read_text())
+    for _ in range(100):
+        if not _isRunning(grandchild):
+            break
+        time.sleep(0.05)
+    assert not _isRunning(grandchild)
+
+
+def test_memory_limit_is_reported_as_memory_out():
+    result = runProcess(_python("x = bytearray(1024 * 1024 * 1024)"), timeout=30, memoryLimit=200)
+    assert result.status == "memoryOut"
+    assert "MemoryError" in result.output
+
+    assert runProcess(_python("import sys; sys.exit(33)"), timeout=30, memoryCodes=(33,)).status == "memoryOut"
+
+
+def test_output_is_streamed_to_a_file(tmp_path):
+    outputPath = str(tmp_path / "output.txt")
+    result = runProcess(_python("print('streamed')"), timeout=30, outputPath=outputPath)
+    assert result.output is None and result.outputPath == outputPath
+    with open(outputPath) as f:
+        assert f.read().strip() == "streamed"
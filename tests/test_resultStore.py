@@ -0,0 +1,55 @@
+import sqlite3
+
+from resultStore import ResultStore
+
+SETTINGS = {"closedList": "exact", "memoryLimit": -1, "preprocess": True}
+
+
+def _store(tmp_path):
+    domainPath = tmp_path / "0001-singlePath-5.pddl"
+    domainPath.write_text("(define (domain singlePath))")
+    return ResultStore(str(tmp_path / "results.sqlite")), str(domainPath)
+
+
+def test_results_are_only_reused_with_the_same_settings(tmp_path):
+    store, path = _store(tmp_path)
+    store.addResult(path, "bfs", -1, 120, "singlePath", "done", 1.5, 10.0, {"expanded": 3}, SETTINGS)
+
+    assert store.result(path, "bfs", -1, 120, dict(SETTINGS)) == ("done", 1.5, 10.0, {"expanded": 3})
+    assert store.result(path, "bfs", -1, 120, {**SETTINGS, "closedList": "fingerprint"}) is None
+    assert store.result(path, "bfs", -1, 120, {**SETTINGS, "preprocess": False}) is None
+
+    # both results are kept side by side
+    store.addResult(path, "bfs", -1, 120, "singlePath", "done", 2.5, 5.0, None, {**SETTINGS, "memoryLimit": 100})
+    assert store.result(path, "bfs", -1, 120, SETTINGS)[1] == 1.5
+    assert store.result(path, "bfs", -1, 120, {**SETTINGS, "memoryLimit": 100})[1] == 2.5
+    store.close()
+
+
+def test_results_stored_without_settings_are_dropped(tmp_path):
+    storePath = str(tmp_path / "results.sqlite")
+    connection = sqlite3.connect(storePath)
+    connection.execute("CREATE TABLE results (domain_hash TEXT NOT NULL, approach TEXT NOT NULL, horizon INTEGER NOT "
+                       "NULL, timeout REAL NOT NULL, domain_type TEXT NOT NULL, status TEXT NOT NULL, runtime_seconds "
+                       "REAL NOT NULL, set_size_mb REAL NOT NULL, finished REAL NOT NULL, stats TEXT, "
+                       "PRIMARY KEY (domain_hash, approach, horizon, timeout))")
+    connection.execute("INSERT INTO results VALUES ('hash', 'bfs', -1, 120, 'singlePath', 'done', 1.0, 1.0, 0, NULL)")
+    connection.commit()
+    connection.close()
+
+    store = ResultStore(storePath)
+    assert store.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+    store.close()
+
+
+def test_failed_jobs_are_not_reused(tmp_path):
+    store, path = _store(tmp_path)
+    store.addResult(path, "asp_simple", 5, 120, "singlePath", "error", -1, -1 / 1024, None, SETTINGS)
+    store.addResult(path, "qasp", 5, 120, "singlePath", "killed", -1, -1 / 1024, None, SETTINGS)
+    assert store.result(path, "asp_simple", 5, 120, SETTINGS) is None
+    assert store.result(path, "qasp", 5, 120, SETTINGS) is None
+
+    # once the job completes, its result replaces the failed one
+    store.addResult(path, "asp_simple", 5, 120, "singlePath", "done", 0.5, 4.0, None, SETTINGS)
+    assert store.result(path, "asp_simple", 5, 120, SETTINGS) == ("done", 0.5, 4.0, {})
+    store.close()
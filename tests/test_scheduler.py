@@ -0,0 +1,83 @@
+import os
+import subprocess
+import time
+
+from scheduler import Job, runJobs
+
+
+def _sleepAndReturn(seconds, result):
+    time.sleep(seconds)
+    return result
+
+
+def _raise():
+    raise RuntimeError("plasp not found")
+
+
+def _exitWithoutResult():
+    os._exit(1)
+
+
+def _startChildAndSleep(pidPath):
+    # a child in a session of its own, which is not reached by killing the process group of the job alone
+    child = subprocess.Popen(["sleep", "30"], start_new_session=True)
+    with open(pidPath, "w") as f:
+        f.write(str(child.pid))
+    time.sleep(30)
+
+
+def _isRunning(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # zombies have been killed, but not been reaped yet
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _outcomes(results):
+    return [(job.args[1], status, result) for job, status, result in results]
+
+
+def test_series_stop_after_the_first_failure_in_series_order():
+    # the failing job finishes first, the job before it last
+    jobs = [Job((0.6, 1), "a", True), Job((0.0, -1), "a", True), Job((0.0, 3), "a", True), Job((5.0, 4), "a", True),
+            Job((0.0, 5), "b", True)]
+    start = time.monotonic()
+    results = _outcomes(runJobs(jobs, _sleepAndReturn, lambda result: result == -1, concurrency=4))
+    assert time.monotonic() - start < 4, "the running job of the cut off series has not been killed"
+
+    assert [outcome for outcome in results if outcome[0] != 5] == \
+        [(1, "done", 1), (-1, "done", -1), (3, "skipped", None), (4, "skipped", None)]
+    assert (5, "done", 5) in results
+
+
+def test_cached_jobs_keep_their_position_in_the_series():
+    jobs = [Job((0.2, 1), "a", True), Job((0.0, 2), "a", True, cachedResult=2), Job((0.0, 3), "a", True),
+            Job((0.0, -1), "a", True, cachedResult=-1), Job((0.0, 5), "a", True)]
+    results = _outcomes(runJobs(jobs, _sleepAndReturn, lambda result: result == -1, concurrency=2))
+    assert results == [(1, "done", 1), (2, "cached", 2), (3, "done", 3), (-1, "cached", -1), (5, "skipped", None)]
+
+
+def test_failing_workers_are_reported_as_errors():
+    results = list(runJobs([Job(()), Job(())], _raise, lambda result: False))
+    assert [(status, result) for _, status, result in results] == [("error", "RuntimeError: plasp not found")] * 2
+
+    [(_, status, result)] = runJobs([Job(())], _exitWithoutResult, lambda result: False)
+    assert (status, result) == ("error", "process exited without a result")
+
+
+def test_hard_timeout_kills_the_whole_process_tree(tmp_path):
+    pidPath = str(tmp_path / "child.pid")
+    start = time.monotonic()
+    [(_, status, result)] = runJobs([Job((pidPath,))], _startChildAndSleep, lambda result: False, hardTimeout=1)
+    assert (status, result) == ("killed", None)
+    assert time.monotonic() - start < 10
+
+    with open(pidPath) as f:
+        childPid = int(f.read())
+    for _ in range(100):
+        if not _isRunning(childPid):
+            break
+        time.sleep(0.05)
+    assert not _isRunning(childPid)
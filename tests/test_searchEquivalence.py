@@ -0,0 +1,96 @@
+import itertools
+import sys
+from pathlib import Path
+
+import pytest
+
+import domainGenerator
+from domainCompiler import compileDomain
+from domainLoader import loadDomain
+from reversible import State, add_a, algorithm, del_a, pre_a
+
+# the PDDL_Parser of pddl-parser is expected next to the repository, as in the docker container
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent / "tools"))
+PDDL = pytest.importorskip("PDDL")
+
+# number of solutions compared per domain
+SOLUTIONS = 8
+
+
+def baselineAlgorithm(action, actions, strategy, maxPathLimit=-1):
+    """The search of the original implementation: a list frontier and a linear State.isEquiv scan."""
+    ongoing = []
+    visited = []
+
+    Fplus = (pre_a(action).difference(del_a(action))).union(add_a(action))
+    ongoing.append(State(Fplus, del_a(action), set(), []))
+
+    while ongoing:
+        state = ongoing.pop(0) if strategy == "bfs" else ongoing.pop()
+        visited.append(state)
+
+        if pre_a(action).issubset(state.Fplus) and len(state.F0.intersection(state.Fminus)) == 0:
+            yield state
+            continue
+
+        possibleActions = [aa for aa in actions if len(pre_a(aa).intersection(state.Fminus)) == 0]
+        for aa in possibleActions:
+            newState = State(
+                Fplus=(state.Fplus.difference(del_a(aa))).union(add_a(aa)),
+                Fminus=(state.Fminus.difference(add_a(aa))).union(del_a(aa)),
+                F0=state.F0.union(pre_a(aa).difference(state.Fplus)),
+                pi=(state.pi + [aa])
+            )
+            if newState.F0 == state.F0 and newState.Fplus == state.Fplus and newState.Fminus == state.Fminus:
+                continue
+            if maxPathLimit != -1 and len(newState.pi) > maxPathLimit:
+                continue
+            if not any(s.isEquiv(newState) for s in ongoing + visited):
+                ongoing = ongoing + [newState]
+
+
+def _names(pi):
+    return [aa.name for aa in pi]
+
+
+def _domainPaths(tmp_path):
+    domains = []
+    for family in (domainGenerator.singlePath, domainGenerator.multiplePaths, domainGenerator.multiplePathsDeadEnds):
+        for i in range(1, 6):
+            domains.append((f"{family.__name__}-{i}", family(i)))
+    domains.append(("generalized-2-3-2-3", domainGenerator.generalized(2, 3, 2, 3)))
+    domains.append(("generalized-1-4-3-4", domainGenerator.generalized(1, 4, 3, 4)))
+    domains.append(domainGenerator.barabasiAlbertLongestShortestPath(30, 1, "0001"))
+    domains += itertools.islice(domainGenerator.barabasiAlbertDegree(30, 1, ["0002", "0003"]), 2)
+
+    for name, domain in domains:
+        path = tmp_path / f"{name}.pddl"
+        domainGenerator.writeDomain(path, domain)
+        yield str(path)
+
+
+@pytest.mark.parametrize("maxPathLimit", [-1, 3])
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+def test_search_yields_the_solutions_of_the_baseline(tmp_path, strategy, maxPathLimit):
+    for path in _domainPaths(tmp_path):
+        parser = PDDL.PDDL_Parser()
+        parser.parse_domain(path)
+        action = next(aa for aa in parser.actions if aa.name == "del-all")
+        expected = list(itertools.islice(baselineAlgorithm(action, parser.actions, strategy, maxPathLimit), SOLUTIONS))
+        states = list(itertools.islice(algorithm(action, parser.actions, strategy, maxPathLimit), SOLUTIONS))
+
+        assert [_names(state.pi) for state in states] == [_names(state.pi) for state in expected], path
+        assert all(state.isEquiv(expectedState) for state, expectedState in zip(states, expected))
+
+
+def test_compiled_domains_match_the_parsed_actions(tmp_path):
+    for path in _domainPaths(tmp_path):
+        parser = PDDL.PDDL_Parser()
+        parser.parse_domain(path)
+        for domain in (compileDomain(parser.actions), loadDomain(path)):
+            assert domain.actionNames == [aa.name for aa in parser.actions], path
+            for i, aa in enumerate(parser.actions):
+                assert domain.decode(domain.preMasks[i]) == pre_a(aa), (path, aa.name)
+                assert domain.decode(domain.addMasks[i]) == add_a(aa), (path, aa.name)
+                assert domain.decode(domain.delMasks[i]) == del_a(aa), (path, aa.name)
+
@@ -0,0 +1,40 @@
+import pytest
+
+import domainGenerator
+from reversible import search
+from searchMemory import BloomFilter, fingerprint
+
+
+def test_fingerprint_distinguishes_fluents_61_apart():
+    # the built-in hash of an int is computed modulo 2^61 - 1, hence hash(1 << 61) == hash(1)
+    assert fingerprint((1 << 61, 0, 0)) != fingerprint((1, 0, 0))
+    assert fingerprint((1, 0, 0)) != fingerprint((0, 1, 0))
+    assert fingerprint((5, 0, 0)) == fingerprint((5, 0, 0))
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+@pytest.mark.parametrize("closedList", ["fingerprint", "bloom"])
+def test_compact_closed_lists_agree_with_exact(strategy, closedList):
+    # more than 61 fluents, such that fluents i and i + 61 exist
+    domain = domainGenerator.generalizedModel(1, 4, 200, 4)
+    assert len(domain.fluents) > 61
+    actionIndex = domain.actionIndex("del-all")
+
+    exact = next(search(domain, actionIndex, strategy), None)
+    compact = next(search(domain, actionIndex, strategy, closedList=closedList), None)
+    assert exact is not None
+    assert compact is not None
+    assert compact.depth == exact.depth
+
+
+def test_bloom_filter_grows_beyond_expected_states():
+    bloomFilter = BloomFilter(expectedStates=1000, falsePositiveRate=0.01)
+    added = [fingerprint((i, 0, 0)) for i in range(10000)]
+    for fp in added:
+        if fp not in bloomFilter:
+            bloomFilter.add(fp)
+    assert all(fp in bloomFilter for fp in added)
+    assert len(bloomFilter.fullFilters) > 0
+
+    falsePositives = sum(fingerprint((0, i, 0)) in bloomFilter for i in range(1, 10001))
+    assert falsePositives < 10000 * 0.05
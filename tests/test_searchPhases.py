@@ -0,0 +1,37 @@
+import pytest
+
+import domainGenerator
+import microBenchmark
+from reversible import SEARCH_PHASES, SearchStats, search
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+@pytest.mark.parametrize("domain", [domainGenerator.singlePathModel(20), domainGenerator.multiplePathsModel(5),
+                                    domainGenerator.generalizedModel(1, 4, 20, 4)])
+def test_phase_counts_match_expanded_states(strategy, domain):
+    actionIndex = domain.actionIndex("del-all")
+    stats = SearchStats()
+    state = next(search(domain, actionIndex, strategy, stats=stats), None)
+    timedStats = SearchStats()
+    timedState = next(search(domain, actionIndex, strategy, stats=timedStats, timePhases=True), None)
+
+    # timing the phases does not change the search
+    assert timedState.plan() == state.plan()
+    assert (timedStats.expanded, timedStats.generated) == (stats.expanded, stats.generated)
+    assert stats.phaseTimes == {}
+
+    # every popped state is checked for the goal, the expanded ones pass through the other phases
+    assert timedStats.phaseCounts["goalCheck"] == stats.expanded + 1
+    for phase in SEARCH_PHASES[1:]:
+        assert timedStats.phaseCounts[phase] == stats.expanded
+    assert all(timedStats.phaseTimes[phase] >= 0 for phase in SEARCH_PHASES)
+
+
+def test_micro_benchmark_measures_the_search():
+    domain = domainGenerator.multiplePathsModel(5)
+    stats = SearchStats()
+    next(search(domain, domain.actionIndex("del-all"), "bfs", stats=stats), None)
+
+    measurement = microBenchmark.measure(domain, "bfs", repetitions=1)
+    assert (measurement["expanded"], measurement["generated"]) == (stats.expanded, stats.generated)
+    assert all(measurement[phase] >= 0 for phase in SEARCH_PHASES)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import tempfile
+import time
+
+from domainCache import contentHash, evict
+
+DEFAULT_CACHE_DIR = "./cache/translations"
+DEFAULT_MAX_CACHE_SIZE = 1024 * 1024 * 1024  # bytes
+# translations used within this period are never evicted, as a parallel run may still be about to read them; it
+# has to exceed the longest run of an ASP approach
+DEFAULT_MIN_CACHE_AGE = 24 * 60 * 60  # seconds
+
+# translators of PDDL domains into the inputs of the ASP approaches: command line and file name suffix of the output,
+# plasp does not depend on the horizon and its output is shared by asp_simple and asp_general
+TRANSLATORS = {
+    "plasp": (lambda domainPath, horizon: f"/tools/plasp translate {domainPath}", ".lp"),
+    "qasp": (lambda domainPath, horizon: f"python3 /tools/run-pddl-horizon.py {domainPath} {horizon}", ".qasp"),
+}
+_HORIZON_DEPENDENT = {"qasp"}
+
+
+def translationPath(domainPath, translator, horizon=None, cacheDir=DEFAULT_CACHE_DIR):
+    """
+    Returns the path of the cached translation of a domain, which is keyed by the content hash of the domain file,
+    the translator and the horizon (only for translators whose output depends on it).
+    """
+    (_, suffix) = TRANSLATORS[translator]
+    key = f"{contentHash(domainPath)}-{translator}"
+    if translator in _HORIZON_DEPENDENT:
+        key += f"-{horizon}"
+    return os.path.join(cacheDir, key + suffix)
+
+
+def translate(domainPath, translator, horizon=None, cacheDir=DEFAULT_CACHE_DIR, maxCacheSize=DEFAULT_MAX_CACHE_SIZE,
+              minCacheAge=DEFAULT_MIN_CACHE_AGE):
+    """
+    Translates a PDDL domain with plasp or run-pddl-horizon.py (qasp), unless the translation is already cached.
+    The translation is written to a temporary file first and then moved into place, such that parallel runs never
+    see (or clobber) a partially written translation. Failed translations are not cached.
+
+    :param domainPath: Path to the PDDL domain file
+    :param translator: "plasp" or "qasp"
+    :param horizon: horizon of the translation, only used by qasp
+    :param cacheDir: folder of the cache
+    :param maxCacheSize: maximal total size of the cache in bytes, -1 for no limit; the least recently used
+        translations are removed once it is exceeded
+    :param minCacheAge: seconds since their last lookup during which translations are not removed, such that they
+        are not deleted underneath a parallel run that has just looked them up
+    :return: a tuple (path, translateTime, cached) of the path of the translation, the seconds spent on looking it up
+        and translating, and whether the translation has been cached already
+    """
+    if translator not in TRANSLATORS:
+        raise ValueError(f"The provided translator \"{translator}\" is not valid.")
+
+    start = time.perf_counter()
+    path = translationPath(domainPath, translator, horizon, cacheDir)
+    try:
+        # the modification time is used as last access time for the eviction
+        os.utime(path)
+        return path, time.perf_counter() - start, True
+    except FileNotFoundError:
+        pass
+
+    (command, suffix) = TRANSLATORS[translator]
+    os.makedirs(cacheDir, exist_ok=True)
+    fd, tempPath = tempfile.mkstemp(dir=cacheDir, suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            process = subprocess.run(command(domainPath, horizon), stdout=f, stderr=subprocess.PIPE, shell=True)
+        if process.returncode != 0:
+            raise RuntimeError(f"Translating {domainPath} with {translator} failed: "
+                               f"{process.stderr.decode('utf-8', 'replace').strip()}")
+        # evicted before the new translation is moved into place, such that it is never evicted itself
+        evict(cacheDir, maxCacheSize, -1, tuple(suffix for (_, suffix) in TRANSLATORS.values()), minCacheAge)
+        os.replace(tempPath, path)
+    except BaseException:
+        os.unlink(tempPath)
+        raise
+    return path, time.perf_counter() - start, False
+
+
+if __name__ == "__main__":
+    import fire
+    fire.Fire()